@@ -4,7 +4,12 @@ import logging
 import CoT_Trackserver
 
 
-async def main():
+async def main(rate_events: float = None, rate_bytes: float = None,
+		burst_events: float = None, burst_bytes: float = None, destinations: list = None,
+		accounts: list = None, max_concurrent_polls: int = None, api_url: str = None, poll_interval: int = None,
+		metrics_port: int = None, trace: bool = False, fix_time: bool = False, fix_timezone: str = None,
+		snapshot_dir: str = None, history_dir: str = None, record: str = None,
+		udp_pack: bool = False, udp_mtu: int = None):
 	_logger = logging.getLogger(__name__)
 	if not _logger.handlers:
 		_logger.setLevel(CoT_Trackserver.constants.LOG_LEVEL)
@@ -15,19 +20,54 @@ async def main():
 		_logger.propagate = False
 	logging.getLogger("asyncio").setLevel(CoT_Trackserver.constants.LOG_LEVEL)
 
-	tx_queue: asyncio.Queue = asyncio.Queue()
-	rx_queue: asyncio.Queue = asyncio.Queue()
-	reader, writer = await asyncio.open_connection(CoT_Trackserver.constants.DEFAULT_COT_IP, CoT_Trackserver.constants.DEFAULT_COT_PORT)
-	write_worker = CoT_Trackserver.EventTransmitter(tx_queue, writer)
-	read_worker = CoT_Trackserver.EventReceiver(rx_queue, reader)
-	message_worker = CoT_Trackserver.classes.TrackerReceiverWorker(tx_queue)
+	tx_queue: asyncio.Queue = CoT_Trackserver.CoalescingQueue()
+	rx_queue: asyncio.Queue = CoT_Trackserver.CoalescingQueue(CoT_Trackserver.constants.DEFAULT_RX_QUEUE)
+	serialize = CoT_Trackserver.get_serializer()
+	tracer = CoT_Trackserver.LatencyTracer() if trace else None
+	recorder = CoT_Trackserver.Recorder(record) if record else None
+	sinks = []
+	for host, port, *protocol in destinations or [(CoT_Trackserver.constants.DEFAULT_COT_IP, CoT_Trackserver.constants.DEFAULT_COT_PORT)]:
+		if protocol and protocol[0] == "udp":
+			connection = CoT_Trackserver.CoTDatagram(host, port, mtu=udp_mtu, pack=udp_pack)
+		else:
+			connection = CoT_Trackserver.CoTConnection(host, port, hello=lambda: serialize(CoT_Trackserver.hello_event()))
+		await connection.connect()
+		scheduler = CoT_Trackserver.RateScheduler(rate_events, rate_bytes, burst_events, burst_bytes)
+		sinks.append(CoT_Trackserver.EventTransmitter(
+			CoT_Trackserver.CoalescingQueue(CoT_Trackserver.constants.DEFAULT_SINK_QUEUE), connection,
+			batch=True, scheduler=scheduler, tracer=tracer, recorder=recorder))
+	write_worker = CoT_Trackserver.FanOut(tx_queue, sinks)
+	# Every TCP destination is read, so no server backs up on unread traffic or closes unnoticed.
+	read_workers = [CoT_Trackserver.EventReceiver(rx_queue, sink.writer) for sink in sinks
+					if isinstance(sink.writer, CoT_Trackserver.CoTConnection)]
+	history = CoT_Trackserver.TrackHistory(history_dir) if history_dir else None
+	message_worker = CoT_Trackserver.MultiAccountPoller(
+		tx_queue, accounts, max_concurrent_polls, poll_interval=poll_interval, stream=True, api_url=api_url,
+		tracer=tracer, fix_time=fix_time, fix_timezone=fix_timezone, snapshot_dir=snapshot_dir,
+		history=history, recorder=recorder)
 
 	_logger.info('Sending Hello')
 	await tx_queue.put(CoT_Trackserver.hello_event())
 
-	done, pending = await asyncio.wait(
-		{message_worker.run(), read_worker.run(), write_worker.run()},
-		return_when=asyncio.FIRST_COMPLETED)
+	tasks = {asyncio.create_task(message_worker.run()), asyncio.create_task(write_worker.run())}
+	tasks.update(asyncio.create_task(read_worker.run()) for read_worker in read_workers)
+	if metrics_port is not None:
+		tasks.add(asyncio.create_task(CoT_Trackserver.MetricsServer(port=metrics_port).run()))
+
+	try:
+		done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+	finally:
+		# The pollers stop before the files they write are closed, also when main is cancelled.
+		for task in tasks:
+			task.cancel()
+		await asyncio.gather(*tasks, return_exceptions=True)
+		for worker in message_worker.workers:
+			if worker.snapshot is not None:
+				worker.snapshot.close()
+		if history is not None:
+			history.close()
+		if recorder is not None:
+			recorder.close()
 
 	for task in done:
 		print(f"Task completed: {task}")
@@ -2,10 +2,25 @@
 from .constants import (LOG_LEVEL, LOG_FORMAT, DEFAULT_COT_IP, DEFAULT_COT_PORT,  # NOQA
                         DEFAULT_INTERVAL, DEFAULT_SLEEP, accountRef, accountPass)
 from .defcot import Event
+from .functions import json_to_cot, hello_event, get_logger  # NOQA
+from .serializer import SERIALIZERS, get_serializer, serialize_devices  # NOQA
+from .metrics import REGISTRY, Counter, Gauge, Histogram, MetricsServer  # NOQA
 
-from .functions import json_to_cot, hello_event  # NOQA
+from .httpclient import HTTPClient, HTTPResponse  # NOQA
+from .session import Session  # NOQA
+from .state import DeviceStateTable  # NOQA
+from .snapshot import DeviceSnapshot  # NOQA
+from .history import TrackHistory, Position  # NOQA
+from .reckoning import DeadReckoner  # NOQA
+from .scheduler import RateScheduler, TokenBucket  # NOQA
+from .queues import CoalescingQueue, event_uid  # NOQA
+from .connection import CoTConnection, CoTDatagram, ReplayBuffer  # NOQA
+from .stream import CoTStreamParser  # NOQA
+from .tracing import LatencyTracer  # NOQA
+from .recording import Recorder, Replayer  # NOQA
+from .jsonstream import JSONArrayParser  # NOQA
 
-from .classes import (TrackerReceiverWorker,  # NOQA
-                      EventTransmitter, EventReceiver)
+from .classes import (TrackerReceiverWorker, MultiAccountPoller,  # NOQA
+                      EventTransmitter, EventReceiver, FanOut)
 
 
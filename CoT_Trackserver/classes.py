@@ -1,9 +1,11 @@
 import asyncio
 import json
+import os
 import random
+import time
 
-import urllib.request
 import urllib.error
+import urllib.parse
 
 import logging
 
@@ -14,14 +16,7 @@ class Worker:  # pylint: disable=too-few-public-methods
 
     """Meta class for all other Worker Classes."""
 
-    _logger = logging.getLogger(__name__)
-    if not _logger.handlers:
-        _logger.setLevel(CoT_Trackserver.constants.LOG_LEVEL)
-        _console_handler = logging.StreamHandler()
-        _console_handler.setLevel(CoT_Trackserver.constants.LOG_LEVEL)
-        _console_handler.setFormatter(CoT_Trackserver.constants.LOG_FORMAT)
-        _logger.addHandler(_console_handler)
-        _logger.propagate = False
+    _logger = CoT_Trackserver.functions.get_logger(__name__)
     logging.getLogger("asyncio").setLevel(CoT_Trackserver.constants.LOG_LEVEL)
 
     def __init__(self, event_queue: asyncio.Queue) -> None:
@@ -35,55 +30,381 @@ class Worker:  # pylint: disable=too-few-public-methods
 class TrackerReceiverWorker(Worker):
 
     def __init__(self, event_queue: asyncio.Queue,
-                 cot_stale: int = None, poll_interval: int = None):
+                 cot_stale: int = None, poll_interval: int = None,
+                 http_client: CoT_Trackserver.HTTPClient = None,
+                 session: CoT_Trackserver.Session = None, session_ttl: int = None,
+                 account_ref: str = None, account_pass: str = None,
+                 limiter: asyncio.Semaphore = None, start_delay: float = 0,
+                 poll_min: int = None, poll_max: int = None,
+                 moving_interval: float = None, stationary_interval: float = None,
+                 extrapolate_interval: float = None, stream: bool = False, api_url: str = None,
+                 tracer: CoT_Trackserver.LatencyTracer = None, fix_time: bool = False, fix_timezone: str = None,
+                 snapshot: CoT_Trackserver.DeviceSnapshot = None, history: CoT_Trackserver.TrackHistory = None,
+                 recorder: CoT_Trackserver.Recorder = None):
         super().__init__(event_queue)
+        self.http_client = http_client or CoT_Trackserver.HTTPClient()
+        self.api_url: str = api_url or CoT_Trackserver.constants.DEFAULT_API_URL
+        self.session = session or CoT_Trackserver.Session(self.http_client, session_ttl,
+                                                          account_ref, account_pass, self.api_url)
+        self.limiter = limiter
+        self.stream: bool = stream
+        self.start_delay: float = float(start_delay)
+        self.polls: int = 0
+        self.failures: int = 0
+        self.invalid: int = 0
+        self.latency_last: float = 0.0
+        self.latency_max: float = 0.0
+        self.latency_total: float = 0.0
+        self.payload_bytes: int = 0
+        self._fetch_seconds = CoT_Trackserver.metrics.FETCH_SECONDS.labels(self.session.account_ref)
+        self._fetch_bytes = CoT_Trackserver.metrics.FETCH_BYTES.labels(self.session.account_ref)
+        self._devices = CoT_Trackserver.metrics.DEVICES.labels(self.session.account_ref)
+        self._failures = CoT_Trackserver.metrics.POLL_FAILURES.labels(self.session.account_ref)
+        self._invalid = CoT_Trackserver.metrics.INVALID_DEVICES.labels(self.session.account_ref)
         self.cot_stale: int = int(cot_stale or
-                                  CoT_Trackserver.constants.DEFAULT_INTERVAL)
+                                  CoT_Trackserver.constants.DEFAULT_COT_STALE)
         self.poll_interval: int = int(poll_interval or
                                       CoT_Trackserver.constants.DEFAULT_INTERVAL)
+        # An explicit poll_interval without bounds keeps the interval fixed.
+        fixed = poll_interval and poll_min is None and poll_max is None
+        self.poll_min: int = int(self.poll_interval if fixed else
+                                 poll_min or CoT_Trackserver.constants.DEFAULT_POLL_MIN)
+        self.poll_max: int = int(self.poll_interval if fixed else
+                                 poll_max or CoT_Trackserver.constants.DEFAULT_POLL_MAX)
+        self.fix_time: bool = fix_time
+        self.fix_timezone: str = fix_timezone or CoT_Trackserver.constants.DEFAULT_FIX_TIMEZONE
+        self.tracer = tracer
+        self.snapshot = snapshot
+        self.history = history
+        self.recorder = recorder
+        self._source = recorder.source(self.session.account_ref) if recorder is not None else None
+        self.device_state = CoT_Trackserver.DeviceStateTable(self.cot_stale, moving_interval=moving_interval,
+                                                             stationary_interval=stationary_interval,
+                                                             fix_time=fix_time)
+        self.reckoner = (CoT_Trackserver.DeadReckoner(extrapolate_interval)
+                         if extrapolate_interval else None)
         self.accountID = ""
         self.sessionID = ""
 
-    async def handle_message(self, devices: list) -> None:
+    async def handle_message(self, devices: list, fetched: float = None) -> None:
         self._logger.info("handling message")
         if not devices:
             self._logger.warning("Empty device list")
             return None
-        n = 1
+        n = await self._emit(devices, fetched)
+        self._logger.info("Added "+str(n)+" of "+str(len(devices))+" devices to que")
+        self._log_queue()
+
+    async def _emit(self, devices: list, fetched: float = None) -> int:
+        """
+        Puts the events due for devices on the queue, returns how many. New
+        fixes are traced from fetched, the wall clock time they arrived.
+        """
+        n = 0
+        fetched = time.time() if fetched is None else fetched
         for device in devices:
-            event = CoT_Trackserver.functions.json_to_cot(device, self.cot_stale)
+            trace = None
+            if self.device_state.changed(device):
+                if self.history is not None:
+                    # Every new fix is kept, whether or not it is emitted now.
+                    self.history.append_device(device, self.fix_timezone)
+                if not self.device_state.due(device, self.poll_interval):
+                    continue
+                moving = CoT_Trackserver.functions.is_moving(device)
+                stale = self.device_state.stale(moving, self.poll_interval)
+                started = time.perf_counter()
+                try:
+                    event = CoT_Trackserver.functions.json_to_cot(device, stale, self.fix_time, self.fix_timezone)
+                except (KeyError, TypeError, ValueError) as error:
+                    # One malformed device must not cost the rest of the poll.
+                    self.invalid += 1
+                    self._invalid.inc()
+                    self._logger.warning("Skipping device %s, it cannot be converted: %r", device.get("Name"), error)
+                    continue
+                CoT_Trackserver.metrics.CONVERT_SECONDS.observe(time.perf_counter() - started)
+                if self.tracer is not None:
+                    trace = self._trace(device, event, fetched)
+                self.device_state.store(device, event)
+                if self.snapshot is not None:
+                    now = time.time()
+                    self.snapshot.save(device, now, now + stale)
+                if self.reckoner is not None:
+                    self.reckoner.update(event, moving)
+            elif self.reckoner is not None and device["Name"] in self.reckoner:
+                # Projected positions keep moving devices alive until their next fix.
+                continue
+            else:
+                event = self.device_state.refresh(device["Name"], self.poll_interval)
+                if event is None:
+                    continue
+                if self.snapshot is not None:
+                    now = time.time()
+                    self.snapshot.touch(device["Name"], now, now + self.device_state.stale(
+                        self.device_state.devices[device["Name"]].moving, self.poll_interval))
             await self.event_queue.put(event)
-            self._logger.info("Added "+str(n)+" of "+str(len(devices))+" devices to que")
+            if trace is not None:
+                trace.enqueued = time.time()
             n = n+1
+            self._logger.debug("Added " + str(device["Name"]) + " to que")
+        return n
 
-    async def _get_devices(self):
-        self._logger.info("Getting devices")
+    def _trace(self, device: dict, event: CoT_Trackserver.Event, fetched: float):
+        """Starts tracing event, None when the device has no usable fix time."""
+        try:
+            fix = CoT_Trackserver.functions.parse_fix(device, self.fix_timezone).timestamp()
+        except ValueError:
+            self._logger.debug("Not tracing %s, LastGPSFix %r", event.uid, device.get("LastGPSFix"))
+            return None
+        return self.tracer.start(event.uid, fix, fetched, time.time())
+
+    def _log_queue(self) -> None:
+        if isinstance(self.event_queue, CoT_Trackserver.CoalescingQueue):
+            self._logger.info("Queue pending=%(pending)s coalesced=%(coalesced)s dropped=%(dropped)s",
+                              self.event_queue.stats())
+
+    def _device_url(self) -> str:
+        return (self.api_url + 'GetDeviceData?SessionID=' + self.sessionID +
+                '&AccountID=' + str(self.accountID) + '&PullAll=true')
+
+    async def _fetch_devices(self) -> list:
+        self.sessionID, self.accountID = await self.session.get()
         try:
-            r = urllib.request.urlopen(
-                'http://mobile.trackserver.co.uk/api/api/MobileApp/GetDeviceData?SessionID=' + self.sessionID + '&AccountID=' + str(
-                    self.accountID) + '&PullAll=true')
+            json_data = await self.http_client.get(self._device_url())
         except urllib.error.HTTPError:
-            self.sessionID, self.accountID = CoT_Trackserver.functions.login()
-            r = urllib.request.urlopen(
-                'http://mobile.trackserver.co.uk/api/api/MobileApp/GetDeviceData?SessionID=' + self.sessionID + '&AccountID=' + str(
-                    self.accountID) + '&PullAll=true')
-        json_data = r.read()
+            self._logger.info("Session rejected, logging in again")
+            self.sessionID, self.accountID = await self.session.renew(self.sessionID)
+            json_data = await self.http_client.get(self._device_url())
+        self.payload_bytes = len(json_data)
+        if self.recorder is not None:
+            self.recorder.response(self._source, json_data)
+            self.recorder.response_end(self._source)
         parsed_json = (json.loads(json_data))
-        devices = parsed_json["Devices"]
-        self._logger.info("Retrieved %s devices", len(devices))
-        await self.handle_message(devices)
+        return parsed_json["Devices"]
+
+    async def _open_devices(self) -> CoT_Trackserver.HTTPResponse:
+        self.sessionID, self.accountID = await self.session.get()
+        response = await self.http_client.request(self._device_url())
+        if response.status >= 400:
+            await response.read()
+            self._logger.info("Session rejected, logging in again")
+            self.sessionID, self.accountID = await self.session.renew(self.sessionID)
+            response = await self.http_client.request(self._device_url())
+            if response.status >= 400:
+                await response.read()
+                raise urllib.error.HTTPError(response.url, response.status, response.reason, response.headers, None)
+        return response
+
+    async def _stream_devices(self) -> tuple:
+        """
+        Converts the devices of a GetDeviceData response while it downloads,
+        returns the (devices, moving, emitted) counts. Like a whole poll, each
+        chunk is emitted with the interval adapted to the devices seen so far.
+        """
+        response = await self._open_devices()
+        parser = CoT_Trackserver.JSONArrayParser("Devices")
+        moving = emitted = 0
+        self.payload_bytes = 0
+        chunks = response.iter_chunks()
+        complete = False
+        try:
+            async for chunk in chunks:
+                self.payload_bytes += len(chunk)
+                fetched = time.time()
+                if self.recorder is not None:
+                    self.recorder.response(self._source, chunk)
+                devices = parser.feed(chunk)
+                if not devices:
+                    continue
+                moving += sum(1 for device in devices if CoT_Trackserver.functions.is_moving(device))
+                self.poll_interval = self._interval(moving, parser.items)
+                emitted += await self._emit(devices, fetched)
+            complete = True
+        finally:
+            await chunks.aclose()
+            if self.recorder is not None:
+                # A response that stopped part way is closed too, replay drops its remains.
+                if complete:
+                    self.recorder.response_end(self._source)
+                else:
+                    self.recorder.response_abort(self._source)
+        parser.close()
+        return parser.items, moving, emitted
+
+    async def _get_devices(self):
+        self._logger.info("Getting devices for %s", self.session.account_ref)
+        if self.limiter is None:
+            await self._poll_devices()
+        else:
+            async with self.limiter:
+                await self._poll_devices()
+        if self.snapshot is not None:
+            self.snapshot.flush()
+        if self.history is not None:
+            self.history.flush()
+        if self.recorder is not None:
+            self.recorder.flush()
+
+    async def _poll_devices(self):
+        started = time.monotonic()
+        if self.stream:
+            total, moving, emitted = await self._stream_devices()
+            latency = self._record_latency(started)
+            self._devices.observe(total)
+            self._logger.info("Streamed %s devices in %.3fs, added %s to que", total, latency, emitted)
+            self.poll_interval = self._adapt_interval(moving, total)
+            self._log_queue()
+            return
+        devices = await self._fetch_devices()
+        fetched = time.time()
+        latency = self._record_latency(started)
+        self._devices.observe(len(devices))
+        self._logger.info("Retrieved %s devices in %.3fs", len(devices), latency)
+        self.poll_interval = self.adapt_interval(devices)
+        await self.handle_message(devices, fetched)
+
+    def _record_latency(self, started: float) -> float:
+        latency = time.monotonic() - started
+        self.polls += 1
+        self.latency_last = latency
+        self.latency_max = max(self.latency_max, latency)
+        self.latency_total += latency
+        self._fetch_seconds.observe(latency)
+        self._fetch_bytes.observe(self.payload_bytes)
+        return latency
+
+    def adapt_interval(self, devices: list) -> int:
+        """Poll interval between poll_max with no moving devices and poll_min with all devices moving."""
+        return self._adapt_interval(sum(1 for device in devices if CoT_Trackserver.functions.is_moving(device)),
+                                    len(devices))
+
+    def _interval(self, moving: int, total: int) -> int:
+        if not total:
+            return self.poll_max
+        return round(self.poll_max - (self.poll_max - self.poll_min) * moving / total)
+
+    def _adapt_interval(self, moving: int, total: int) -> int:
+        interval = self._interval(moving, total)
+        if not total:
+            return interval
+        self._logger.info("%s of %s devices moving, polling every %ss", moving, total, interval)
+        return interval
+
+    def stats(self) -> dict:
+        return {"account": self.session.account_ref, "polls": self.polls, "failures": self.failures,
+                "invalid": self.invalid,
+                "latency_last": self.latency_last, "latency_max": self.latency_max,
+                "latency_mean": self.latency_total / self.polls if self.polls else 0.0}
+
+    async def _extrapolate(self):
+        while 1:
+            await asyncio.sleep(self.reckoner.interval)
+            events = self.reckoner.project()
+            for event in events:
+                await self.event_queue.put(event)
+            self._logger.debug("Projected %s moving devices", len(events))
+
+    async def _restore(self) -> None:
+        """Sends the still valid events of the snapshot and seeds the device state with them."""
+        now = time.time()
+        monotonic = time.monotonic()
+        n = 0
+        for device, emitted, expires in self.snapshot.load():
+            if expires <= now:
+                continue
+            event = CoT_Trackserver.functions.json_to_cot(device, expires - now, self.fix_time, self.fix_timezone)
+            # Keeps the emit cadence of the previous run, due devices are refreshed on the first poll.
+            self.device_state.restore(device, event, monotonic - (now - emitted))
+            if self.reckoner is not None:
+                self.reckoner.update(event, CoT_Trackserver.functions.is_moving(device), monotonic - (now - emitted))
+            await self.event_queue.put(event)
+            n = n+1
+        self._logger.info("Restored %s of %s devices from %s", n, len(self.snapshot), self.snapshot.path)
 
     async def run(self):
         """Runs this Thread, Reads from Pollers."""
         self._logger.info("Running TrackerReceiverWorker")
+        if self.snapshot is not None:
+            await self._restore()
+        if self.start_delay:
+            await asyncio.sleep(self.start_delay)
+        if self.reckoner is not None:
+            await asyncio.gather(self._poll(), self._extrapolate())
+        else:
+            await self._poll()
+
+    async def _poll(self):
         while 1:
-            self._logger.info("Logging in")
-            self.sessionID, self.accountID = CoT_Trackserver.functions.login()
-            self._logger.info("Retreived sessinID=" + str(self.sessionID) + " and accountID=" + str(self.accountID))
-            await self._get_devices()
+            try:
+                await self._get_devices()
+            except Exception as error:  # pylint: disable=broad-except
+                # One failing account must not stop the other pollers.
+                self.failures += 1
+                self._failures.inc()
+                self._logger.warning("Polling %s failed: %r", self.session.account_ref, error)
+            self._logger.info("Session logins=%(logins)s avoided=%(logins_avoided)s", self.session.stats())
+            self._logger.info("Account %(account)s polls=%(polls)s failures=%(failures)s "
+                              "latency mean=%(latency_mean).3fs max=%(latency_max).3fs", self.stats())
             await asyncio.sleep(self.poll_interval)
 
 
+class MultiAccountPoller(Worker):  # pylint: disable=too-few-public-methods
+
+    """
+    Polls several Trackserver accounts concurrently into one event queue.
+
+    Each account gets its own TrackerReceiverWorker, session and interval.
+    Accounts are given as (accountRef, accountPass) or (accountRef,
+    accountPass, poll_interval) tuples, accounts without an interval of their
+    own adapt it between poll_min and poll_max. At most max_concurrent API
+    requests are in flight at once, the HTTP client made here pools as many
+    connections, and the first polls are spread evenly over the poll
+    interval. With a snapshot_dir every account keeps a DeviceSnapshot there
+    and starts from it. A history is shared by all accounts, and so is a
+    recorder.
+
+    Device Names must be unique across the accounts. The Name is the CoT
+    uid, so devices of the same Name in two accounts replace each other in
+    the coalescing queue, in the history and on the TAK map.
+    """
+
+    def __init__(self, event_queue: asyncio.Queue, accounts: list = None,
+                 max_concurrent: int = None, cot_stale: int = None, poll_interval: int = None,
+                 http_client: CoT_Trackserver.HTTPClient = None, session_ttl: int = None,
+                 poll_min: int = None, poll_max: int = None, stream: bool = False, api_url: str = None,
+                 tracer: CoT_Trackserver.LatencyTracer = None, fix_time: bool = False, fix_timezone: str = None,
+                 snapshot_dir: str = None, history: CoT_Trackserver.TrackHistory = None,
+                 recorder: CoT_Trackserver.Recorder = None):
+        super().__init__(event_queue)
+        accounts = CoT_Trackserver.constants.accounts if accounts is None else accounts
+        max_concurrent = int(max_concurrent or CoT_Trackserver.constants.DEFAULT_POLL_CONCURRENCY)
+        # All accounts poll the same host, the pool must allow every concurrent poll a connection.
+        self.http_client = http_client or CoT_Trackserver.HTTPClient(max_connections=max_concurrent)
+        if self.http_client.max_connections < max_concurrent:
+            self._logger.warning("HTTP client pools %s connections, at most that many of %s polls run at once",
+                                 self.http_client.max_connections, max_concurrent)
+        self.limiter = asyncio.Semaphore(max_concurrent)
+        self.workers = []
+        for index, (account_ref, account_pass, *interval) in enumerate(accounts):
+            worker = TrackerReceiverWorker(
+                event_queue, cot_stale, interval[0] if interval else poll_interval, self.http_client,
+                session_ttl=session_ttl, account_ref=account_ref, account_pass=account_pass,
+                limiter=self.limiter, poll_min=None if interval else poll_min,
+                poll_max=None if interval else poll_max, stream=stream, api_url=api_url,
+                tracer=tracer, fix_time=fix_time, fix_timezone=fix_timezone,
+                snapshot=CoT_Trackserver.DeviceSnapshot(os.path.join(
+                    snapshot_dir, urllib.parse.quote(account_ref, safe="") + ".snapshot")) if snapshot_dir else None,
+                history=history, recorder=recorder)
+            worker.start_delay = worker.poll_interval * index / len(accounts)
+            self.workers.append(worker)
+
+    def stats(self) -> list:
+        return [worker.stats() for worker in self.workers]
+
+    async def run(self):
+        self._logger.info("Polling %s accounts", len(self.workers))
+        await asyncio.gather(*(worker.run() for worker in self.workers))
+
+
 class EventTransmitter(Worker):  # pylint: disable=too-few-public-methods
 
     """
@@ -92,40 +413,301 @@ class EventTransmitter(Worker):  # pylint: disable=too-few-public-methods
 
     """
 
-    def __init__(self, tx_queue: asyncio.Queue, writer) -> None:
+    def __init__(self, tx_queue: asyncio.Queue, writer, serializer: str = None,
+                 batch: bool = False, batch_events: int = None, batch_bytes: int = None,
+                 batch_linger: float = None, scheduler: CoT_Trackserver.RateScheduler = None,
+                 tracer: CoT_Trackserver.LatencyTracer = None, recorder: CoT_Trackserver.Recorder = None) -> None:
         super().__init__(tx_queue)
         self.writer = writer
+        self.serialize = CoT_Trackserver.get_serializer(serializer)
+        self.scheduler = scheduler
+        self.tracer = tracer
+        self.recorder = recorder
+        self.batch: bool = batch
+        self.batch_events: int = int(batch_events or CoT_Trackserver.constants.DEFAULT_BATCH_EVENTS)
+        self.batch_bytes: int = int(batch_bytes or CoT_Trackserver.constants.DEFAULT_BATCH_BYTES)
+        self.batch_linger: float = float(CoT_Trackserver.constants.DEFAULT_BATCH_LINGER
+                                         if batch_linger is None else batch_linger)
+        self.batches: int = 0
+        self.events_sent: int = 0
+        self.bytes_sent: int = 0
+        self.max_batch: int = 0
+        self.flush_time: float = 0.0
+        destination = CoT_Trackserver.metrics.destination(writer)
+        self._source = recorder.source(destination) if recorder is not None else None
+        self._write_seconds = CoT_Trackserver.metrics.WRITE_SECONDS.labels(destination)
+        self._drain_seconds = CoT_Trackserver.metrics.DRAIN_SECONDS.labels(destination)
+        self._events_sent = CoT_Trackserver.metrics.EVENTS_SENT.labels(destination)
+        self._bytes_sent = CoT_Trackserver.metrics.BYTES_SENT.labels(destination)
+
+    def _encode(self, tx_event) -> bytes:
+        if isinstance(tx_event, CoT_Trackserver.Event):
+            started = time.perf_counter()
+            data = self.serialize(tx_event)
+            CoT_Trackserver.metrics.SERIALIZE_SECONDS.observe(time.perf_counter() - started)
+            return data
+        return tx_event
+
+    async def _next_batch(self) -> list:
+        """Waits for one event, then takes whatever follows within the linger time and batch limits."""
+        loop = asyncio.get_running_loop()
+        max_events = self.batch_events
+        max_bytes = self.batch_bytes
+        if self.scheduler is not None:
+            # Never build a batch larger than the scheduler allows in one burst.
+            max_events = max(int(min(max_events, self.scheduler.burst_events)), 1)
+            max_bytes = min(max_bytes, self.scheduler.burst_bytes)
+        chunks = []
+        size = 0
+        tx_event = await self.event_queue.get()
+        deadline = loop.time() + self.batch_linger
+        while 1:
+            if tx_event:
+                _event = self._encode(tx_event)
+                chunks.append(_event)
+                size += len(_event)
+            if len(chunks) >= max_events or size >= max_bytes:
+                break
+            try:
+                tx_event = self.event_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    tx_event = await self._get_within(timeout)
+                except asyncio.TimeoutError:
+                    break
+        return chunks
+
+    async def _get_within(self, timeout: float):
+        """
+        Returns the next event within timeout seconds, raises asyncio.TimeoutError
+        otherwise. Unlike wait_for on Python 3.11, an event that arrives just as
+        the timeout fires is never lost: a cancelled Queue.get leaves it queued
+        and a get that already finished keeps it.
+        """
+        getter = asyncio.ensure_future(self.event_queue.get())
+        try:
+            await asyncio.wait((getter,), timeout=timeout)
+        finally:
+            if not getter.done():
+                getter.cancel()
+                await asyncio.wait((getter,))
+        if getter.cancelled():
+            raise asyncio.TimeoutError
+        return getter.result()
+
+    def _transport_sent(self):
+        """(events, bytes) a datagram transport actually sent, None for transports that send every write."""
+        if isinstance(self.writer, CoT_Trackserver.CoTDatagram):
+            return self.writer.events_sent, self.writer.bytes_sent
+        return None
+
+    def _sent(self, chunks: list, before) -> tuple:
+        """Events and bytes of chunks that went out, leaving out the datagrams dropped or failed since before."""
+        if before is None:
+            return len(chunks), sum(map(len, chunks))
+        events, size = self._transport_sent()
+        return events - before[0], size - before[1]
+
+    async def _flush(self, chunks: list) -> None:
+        if self.scheduler is not None:
+            await self.scheduler.acquire(len(chunks), sum(map(len, chunks)))
+        before = self._transport_sent()
+        started = time.monotonic()
+        # Transports join writelines() into one buffer, so the batch costs a single write and drain.
+        self.writer.writelines(chunks)
+        written = time.monotonic()
+        await self.writer.drain()
+        elapsed = time.monotonic() - started
+        events, size = self._sent(chunks, before)
+        self._write_seconds.observe(written - started)
+        self._drain_seconds.observe(elapsed - (written - started))
+        self._events_sent.inc(events)
+        self._bytes_sent.inc(size)
+        if self.tracer is not None:
+            self.tracer.written(chunks)
+        if self.recorder is not None:
+            self.recorder.sent(self._source, chunks)
+        self.batches += 1
+        self.events_sent += events
+        self.bytes_sent += size
+        self.max_batch = max(self.max_batch, len(chunks))
+        self.flush_time += elapsed
+        self._logger.debug("Flushed %s events in %.1f ms", len(chunks), elapsed * 1000)
+
+    def stats(self) -> dict:
+        return {"queued": self.event_queue.qsize(),
+                "batches": self.batches, "events": self.events_sent, "bytes": self.bytes_sent,
+                "avg_batch": self.events_sent / self.batches if self.batches else 0.0,
+                "max_batch": self.max_batch,
+                "avg_flush_ms": self.flush_time * 1000 / self.batches if self.batches else 0.0,
+                **self._transport_stats()}
+
+    def _transport_stats(self) -> dict:
+        if isinstance(self.writer, CoT_Trackserver.CoTDatagram):
+            return {"send_errors": self.writer.errors, "mtu_dropped": self.writer.dropped}
+        return {}
 
     async def run(self):
         """Runs this Thread, reads in Message Queue & sends out CoT."""
         self._logger.info('Running EventTransmitter')
+        if self.batch:
+            await self._run_batched()
         while 1:
             tx_event = await self.event_queue.get()
             self._logger.info('Got event from tx_queue')
             if not tx_event:
                 continue
 
-            if isinstance(tx_event, CoT_Trackserver.Event):
-                _event = tx_event.generate_cot()
-            else:
-                _event = tx_event
+            _event = self._encode(tx_event)
+            if self.scheduler is not None:
+                await self.scheduler.acquire(1, len(_event))
             self._logger.info("Sending event to server " + CoT_Trackserver.DEFAULT_COT_IP + ":" + str(CoT_Trackserver.DEFAULT_COT_PORT))
+            before = self._transport_sent()
+            started = time.monotonic()
             self.writer.write(_event)
+            written = time.monotonic()
             self._logger.info("Event send to server")
             await self.writer.drain()
+            self._write_seconds.observe(written - started)
+            self._drain_seconds.observe(time.monotonic() - written)
+            events, size = self._sent([_event], before)
+            self._events_sent.inc(events)
+            self._bytes_sent.inc(size)
+            if self.tracer is not None:
+                self.tracer.written([_event])
+            if self.recorder is not None:
+                self.recorder.sent(self._source, [_event])
+
+            if self.scheduler is None:
+                await asyncio.sleep(CoT_Trackserver.DEFAULT_SLEEP * random.random())
+
+    async def _run_batched(self):
+        while 1:
+            chunks = await self._next_batch()
+            if not chunks:
+                continue
+            await self._flush(chunks)
+            if self.event_queue.empty():
+                stats = self.stats()
+                self._logger.info("Sent %(events)s events in %(batches)s batches, "
+                                  "avg batch %(avg_batch).1f, avg flush %(avg_flush_ms).1f ms", stats)
+                if stats.get("send_errors") or stats.get("mtu_dropped"):
+                    self._logger.warning("%(send_errors)s datagram send errors, %(mtu_dropped)s events dropped "
+                                         "for exceeding the MTU", stats)
+                if self.scheduler is not None:
+                    self._logger.info("Rate %(events_per_second).1f events/s %(bytes_per_second).0f B/s, "
+                                      "backlog %(backlog_events)s events", self.scheduler.stats())
+                if self.tracer is not None and self.tracer.traced:
+                    latency = self.tracer.summary()["fix_to_write"]
+                    self._logger.info("Fix to wire p50 %.1fs p90 %.1fs p99 %.1fs, slowest %s",
+                                      latency["p50"], latency["p90"], latency["p99"],
+                                      ", ".join("%s %.1fs" % slow for slow in self.tracer.slowest(5)))
 
-            await asyncio.sleep(CoT_Trackserver.DEFAULT_SLEEP * random.random())
+
+class FanOut(Worker):
+
+    """
+    Serializes each Event from the queue once and hands the bytes to every
+    sink. Each sink is an EventTransmitter with its own bounded queue,
+    pacing and connection, a full sink queue drops its oldest event instead
+    of holding up the others. CoalescingQueue sinks apply their own overflow
+    policy and count the drops, see stats().
+    """
+
+    def __init__(self, event_queue: asyncio.Queue, sinks: list, serializer: str = None) -> None:
+        super().__init__(event_queue)
+        self.sinks: list = sinks
+        self.serialize = CoT_Trackserver.get_serializer(serializer)
+        CoT_Trackserver.metrics.QUEUE_DEPTH.labels("tx").track(event_queue.qsize)
+        for sink in sinks:
+            CoT_Trackserver.metrics.QUEUE_DEPTH.labels(
+                CoT_Trackserver.metrics.destination(sink.writer)).track(sink.event_queue.qsize)
+
+    def _deliver(self, data: bytes) -> None:
+        for sink in self.sinks:
+            queue = sink.event_queue
+            try:
+                queue.put_nowait(data)
+            except asyncio.QueueFull:
+                # A plain bounded asyncio.Queue, or a CoalescingQueue with the block policy.
+                queue.get_nowait()
+                queue.put_nowait(data)
+
+    async def _distribute(self) -> None:
+        while 1:
+            tx_event = await self.event_queue.get()
+            if not tx_event:
+                continue
+            if isinstance(tx_event, CoT_Trackserver.Event):
+                started = time.perf_counter()
+                tx_event = self.serialize(tx_event)
+                CoT_Trackserver.metrics.SERIALIZE_SECONDS.observe(time.perf_counter() - started)
+            self._deliver(tx_event)
+            # Queue.get() does not suspend while items are waiting, let the sinks run.
+            await asyncio.sleep(0)
+
+    async def run(self):
+        """Runs this Thread, distributes the queue over the sinks and runs them."""
+        self._logger.info("Running FanOut to %s sinks", len(self.sinks))
+        await asyncio.gather(self._distribute(), *(sink.run() for sink in self.sinks))
+
+    def stats(self) -> list:
+        """Stats of every sink, with the pending/coalesced/dropped counts of CoalescingQueue sinks."""
+        return [dict(sink.stats(), **sink.event_queue.stats())
+                if isinstance(sink.event_queue, CoT_Trackserver.CoalescingQueue) else sink.stats()
+                for sink in self.sinks]
 
 
 class EventReceiver(Worker):  # pylint: disable=too-few-public-methods
 
-    def __init__(self, rx_queue: asyncio.Queue, reader) -> None:
+    """
+    EventReceiver reads the CoT server connection in chunks, decodes the
+    <event> documents in it and puts them on rx_queue.
+
+    reader is an asyncio.StreamReader or a CoTConnection, in which case
+    reading resumes on the new connection after a reconnect.
+    """
+
+    def __init__(self, rx_queue: asyncio.Queue, reader, chunk_size: int = None) -> None:
         super().__init__(rx_queue)
         self.reader = reader
+        self.chunk_size: int = int(chunk_size or CoT_Trackserver.constants.DEFAULT_RX_CHUNK)
+        self.parser = CoT_Trackserver.CoTStreamParser()
+
+    async def _read(self) -> bytes:
+        if isinstance(self.reader, CoT_Trackserver.CoTConnection):
+            await self.reader.wait_connected()
+            reader = self.reader.reader
+        else:
+            reader = self.reader
+        try:
+            data = await reader.read(self.chunk_size)
+        except OSError:
+            data = b""
+        if not data and isinstance(self.reader, CoT_Trackserver.CoTConnection):
+            self.reader.lost("connection closed by server")
+            self.parser.reset()
+        return data
 
     async def run(self):
         self._logger.info('Running EventReceiver')
+        if self.reader is None:
+            self._logger.info("No stream to receive from")
+            await asyncio.get_running_loop().create_future()
         while 1:
-            rx_event = await self.event_queue.get()
-            self._logger.info("received data")
-            self._logger.info(rx_event)
+            data = await self._read()
+            if not data:
+                if not isinstance(self.reader, CoT_Trackserver.CoTConnection):
+                    self._logger.warning("CoT server closed the connection")
+                    return
+                continue
+            for rx_event in self.parser.feed(data):
+                self._logger.debug("Received %s %s", rx_event.type, rx_event.uid)
+                try:
+                    self.event_queue.put_nowait(rx_event)
+                except asyncio.QueueFull:
+                    self.event_queue.get_nowait()
+                    self.event_queue.put_nowait(rx_event)
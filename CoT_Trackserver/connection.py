@@ -0,0 +1,290 @@
+import asyncio
+import collections
+import ipaddress
+import itertools
+import random
+import socket
+
+import CoT_Trackserver
+
+
+class ReplayBuffer:
+
+    """
+    Serialized events kept while the CoT server is unreachable.
+
+    Only the latest event per uid is kept, and the oldest entries are dropped
+    once max_bytes is exceeded.
+    """
+
+    def __init__(self, max_bytes: int = None) -> None:
+        self.max_bytes: int = int(max_bytes or CoT_Trackserver.constants.DEFAULT_REPLAY_BYTES)
+        self.size: int = 0
+        self.replaced: int = 0
+        self.dropped: int = 0
+        self._events = collections.OrderedDict()
+        self._anonymous = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def add(self, data: bytes) -> None:
+        key = CoT_Trackserver.queues.event_uid(data)
+        if key is None:
+            key = next(self._anonymous)
+        old = self._events.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+            self.replaced += 1
+        self._events[key] = data
+        self.size += len(data)
+        while self.size > self.max_bytes and self._events:
+            _key, dropped = self._events.popitem(last=False)
+            self.size -= len(dropped)
+            self.dropped += 1
+
+    def pop(self) -> bytes:
+        _key, data = self._events.popitem(last=False)
+        self.size -= len(data)
+        return data
+
+
+class CoTConnection:
+
+    """
+    TCP connection to the CoT server with the StreamWriter write/drain interface.
+
+    When the connection drops, or the server is down when connect() is
+    called, writes are kept in a ReplayBuffer while it reconnects with
+    jittered exponential backoff. Once connected again, the hello event and
+    the buffer are replayed at the pace of replay_scheduler.
+    """
+
+    _logger = CoT_Trackserver.functions.get_logger(__name__)
+
+    def __init__(self, host: str = None, port: int = None, hello=None,
+                 replay_bytes: int = None, replay_scheduler: CoT_Trackserver.RateScheduler = None,
+                 backoff_min: float = None, backoff_max: float = None) -> None:
+        self.host: str = host or CoT_Trackserver.constants.DEFAULT_COT_IP
+        self.port: int = int(port or CoT_Trackserver.constants.DEFAULT_COT_PORT)
+        self.hello = hello
+        self.buffer = ReplayBuffer(replay_bytes)
+        self.replay_scheduler = replay_scheduler or CoT_Trackserver.RateScheduler(
+            CoT_Trackserver.constants.DEFAULT_REPLAY_RATE, 0)
+        self.backoff_min: float = float(backoff_min or CoT_Trackserver.constants.DEFAULT_BACKOFF_MIN)
+        self.backoff_max: float = float(backoff_max or CoT_Trackserver.constants.DEFAULT_BACKOFF_MAX)
+        self.reader = None
+        self.writer = None
+        self.reconnects: int = 0
+        self._connected = asyncio.Event()
+        self._reconnect_task = None
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set() and self.writer is not None and not self.writer.is_closing()
+
+    async def connect(self) -> None:
+        """Connects to the CoT server. When it is down, writes are buffered and it is retried with backoff."""
+        try:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        except OSError as error:
+            self._logger.warning("Cannot connect to CoT server %s:%s: %s", self.host, self.port, error)
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+            return
+        self._connected.set()
+        self._logger.info("Connected to CoT server %s:%s", self.host, self.port)
+
+    async def wait_connected(self) -> None:
+        await self._connected.wait()
+
+    def lost(self, reason) -> None:
+        """Marks the connection as lost and starts reconnecting."""
+        if self._reconnect_task is not None:
+            return
+        self._logger.warning("Lost connection to CoT server %s:%s: %s", self.host, self.port, reason)
+        self._connected.clear()
+        if self.writer is not None:
+            self.writer.close()
+        self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = self.backoff_min
+        while 1:
+            # Full jitter keeps many clients from reconnecting in lockstep.
+            await asyncio.sleep(random.uniform(0, delay))
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+                break
+            except OSError as error:
+                self._logger.info("Reconnect to %s:%s failed: %s", self.host, self.port, error)
+                delay = min(delay * 2, self.backoff_max)
+        self.reader, self.writer = reader, writer
+        self.reconnects += 1
+        CoT_Trackserver.metrics.RECONNECTS.labels(CoT_Trackserver.metrics.destination(self)).inc()
+        self._logger.info("Reconnected to CoT server, replaying %s buffered events", len(self.buffer))
+        data = None
+        try:
+            if self.hello is not None:
+                writer.write(self.hello())
+                await writer.drain()
+            while self.buffer:
+                data = self.buffer.pop()
+                await self.replay_scheduler.acquire(1, len(data))
+                writer.write(data)
+                await writer.drain()
+                data = None
+        except OSError as error:
+            if data is not None:
+                self.buffer.add(data)
+            self._reconnect_task = None
+            self.lost(error)
+            return
+        self._reconnect_task = None
+        self._connected.set()
+
+    def write(self, data: bytes) -> None:
+        if self.connected:
+            self.writer.write(data)
+            return
+        if self._reconnect_task is None:
+            self.lost("transport closed")
+        self.buffer.add(data)
+
+    def writelines(self, chunks: list) -> None:
+        if self.connected:
+            self.writer.writelines(chunks)
+            return
+        for data in chunks:
+            self.write(data)
+
+    async def drain(self) -> None:
+        if not self.connected:
+            return
+        try:
+            await self.writer.drain()
+        except OSError as error:
+            self.lost(error)
+
+    def close(self) -> None:
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        if self.writer is not None:
+            self.writer.close()
+
+    def stats(self) -> dict:
+        return {"connected": self.connected, "reconnects": self.reconnects, "buffered": len(self.buffer),
+                "buffered_bytes": self.buffer.size, "replaced": self.buffer.replaced,
+                "dropped": self.buffer.dropped}
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+
+    def __init__(self, owner) -> None:
+        self.owner = owner
+
+    def error_received(self, exc) -> None:
+        self.owner.errors += 1
+        self.owner._errors.inc()
+        self.owner._logger.debug("Datagram send to %s:%s failed: %s", self.owner.host, self.owner.port, exc)
+
+
+class CoTDatagram:
+
+    """
+    UDP unicast or multicast CoT transport with the StreamWriter write/drain interface.
+
+    Every event is sent in its own datagram, with pack=True writelines() packs
+    consecutive events into one datagram as long as it stays within mtu bytes.
+    Events larger than mtu are dropped.
+    """
+
+    _logger = CoT_Trackserver.functions.get_logger(__name__)
+
+    def __init__(self, host: str, port: int, mtu: int = None, pack: bool = False, ttl: int = None) -> None:
+        self.host: str = host
+        self.port: int = int(port)
+        self.mtu: int = int(mtu or CoT_Trackserver.constants.DEFAULT_UDP_MTU)
+        self.pack: bool = pack
+        self.ttl: int = int(ttl or CoT_Trackserver.constants.DEFAULT_MULTICAST_TTL)
+        self.reader = None
+        self.transport = None
+        self.datagrams: int = 0
+        self.events_sent: int = 0
+        self.bytes_sent: int = 0
+        self.errors: int = 0
+        self.dropped: int = 0
+        destination = CoT_Trackserver.metrics.destination(self)
+        self._errors = CoT_Trackserver.metrics.SEND_ERRORS.labels(destination)
+        self._dropped = CoT_Trackserver.metrics.EVENTS_DROPPED.labels(destination)
+
+    async def connect(self) -> None:
+        loop = asyncio.get_running_loop()
+        family, _type, _proto, _name, address = (await loop.getaddrinfo(
+            self.host, self.port, family=socket.AF_INET, type=socket.SOCK_DGRAM))[0]
+        sock = socket.socket(family, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        try:
+            if ipaddress.ip_address(address[0]).is_multicast:
+                sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, self.ttl)
+            sock.connect(address)
+        except OSError:
+            sock.close()
+            raise
+        self.transport, _protocol = await loop.create_datagram_endpoint(
+            lambda: _DatagramProtocol(self), sock=sock)
+        self._logger.info("Sending CoT datagrams to %s:%s", self.host, self.port)
+
+    def _send(self, datagram: bytes, events: int) -> None:
+        try:
+            self.transport.sendto(datagram)
+        except OSError as error:
+            self.errors += 1
+            self._errors.inc()
+            self._logger.debug("Datagram send to %s:%s failed: %s", self.host, self.port, error)
+            return
+        self.datagrams += 1
+        self.events_sent += events
+        self.bytes_sent += len(datagram)
+
+    def _drop(self, data: bytes) -> None:
+        self.dropped += 1
+        self._dropped.inc()
+        self._logger.debug("Dropped a %s byte event to %s:%s, the MTU is %s", len(data), self.host, self.port,
+                           self.mtu)
+
+    def write(self, data: bytes) -> None:
+        if len(data) > self.mtu:
+            self._drop(data)
+            return
+        self._send(data, 1)
+
+    def writelines(self, chunks: list) -> None:
+        if not self.pack:
+            for data in chunks:
+                self.write(data)
+            return
+        datagram = []
+        size = 0
+        for data in chunks:
+            if len(data) > self.mtu:
+                self._drop(data)
+                continue
+            if size + len(data) > self.mtu:
+                self._send(b"".join(datagram), len(datagram))
+                datagram = []
+                size = 0
+            datagram.append(data)
+            size += len(data)
+        if datagram:
+            self._send(b"".join(datagram), len(datagram))
+
+    async def drain(self) -> None:
+        """Datagrams are not flow controlled, there is nothing to wait for."""
+
+    def close(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
+
+    def stats(self) -> dict:
+        return {"datagrams": self.datagrams, "events": self.events_sent, "bytes": self.bytes_sent,
+                "errors": self.errors, "dropped": self.dropped}
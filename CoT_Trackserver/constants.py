@@ -14,7 +14,52 @@ else:
 
 DEFAULT_COT_IP: str = "127.0.0.1"
 DEFAULT_COT_PORT: int = 8087
+DEFAULT_METRICS_HOST: str = "127.0.0.1"
+DEFAULT_METRICS_PORT: int = 9108
+DEFAULT_API_URL: str = "http://mobile.trackserver.co.uk/api/api/MobileApp/"
 DEFAULT_INTERVAL: int = 60
+DEFAULT_COT_STALE: int = 600
+# Zone the Trackserver API reports LastGPSFix in. Not confirmed against the live API, set
+# fix_timezone (e.g. "Europe/London") in CoT_tracker.main when its times are local.
+DEFAULT_FIX_TIMEZONE: str = "UTC"
+DEFAULT_TRACE_SAMPLES: int = 10000
+DEFAULT_POLL_MIN: int = 10
+DEFAULT_POLL_MAX: int = 120
+DEFAULT_MOVING_INTERVAL: int = 10
+DEFAULT_STATIONARY_INTERVAL: int = 300
+DEFAULT_STALE_CADENCES: float = 2.0
+DEFAULT_DR_INTERVAL: float = 5.0
+DEFAULT_DR_CE_GROWTH: float = 0.2
+DEFAULT_DR_MAX_AGE: float = 120.0
+DEFAULT_REFRESH_MARGIN: int = 5
 DEFAULT_SLEEP: int = 5
+DEFAULT_HTTP_CONNECTIONS: int = 2
+DEFAULT_HTTP_TIMEOUT: int = 30
+DEFAULT_HTTP_CHUNK: int = 65536
+DEFAULT_JSON_MAX_PENDING: int = 1048576
+DEFAULT_SESSION_TTL: int = 3600
+DEFAULT_SNAPSHOT_CAPACITY: int = 1024
+DEFAULT_HISTORY_SEGMENT_RECORDS: int = 1048576
+DEFAULT_HISTORY_BUFFER: int = 65536
+DEFAULT_POLL_CONCURRENCY: int = 4
+DEFAULT_SERIALIZER: str = "template"
+DEFAULT_BATCH_EVENTS: int = 500
+DEFAULT_BATCH_BYTES: int = 262144
+DEFAULT_BATCH_LINGER: float = 0.05
+DEFAULT_RATE_EVENTS: float = 100.0
+DEFAULT_RATE_BYTES: float = 0.0
+DEFAULT_REPLAY_BYTES: int = 4194304
+DEFAULT_REPLAY_RATE: float = 50.0
+DEFAULT_BACKOFF_MIN: float = 1.0
+DEFAULT_BACKOFF_MAX: float = 60.0
+DEFAULT_SINK_QUEUE: int = 10000
+DEFAULT_TX_QUEUE: int = 10000
+DEFAULT_OVERFLOW: str = "drop_oldest"
+DEFAULT_RX_QUEUE: int = 10000
+DEFAULT_RX_CHUNK: int = 65536
+DEFAULT_RX_MAX_PENDING: int = 1048576
+DEFAULT_UDP_MTU: int = 1400
+DEFAULT_MULTICAST_TTL: int = 1
 accountRef: str = "USERNAME"
 accountPass: str = "PASSWORD"
+accounts: list = [(accountRef, accountPass)]
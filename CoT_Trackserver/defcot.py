@@ -1,13 +1,75 @@
 import datetime as dt
+import functools
 import re
 import xml.etree.ElementTree as ET
-from decimal import *
 
 DATETIME_FMT = "%Y-%m-%dT%H:%M:%SZ"
 
+_KEYWORDS = re.compile(r'[\w\- ]+(,[\w\- ]+)*')
+_QOS = re.compile(r'\d-\w-\w')
+_OPEX = re.compile(r"^[oes].*")
+_HOW = re.compile(r'\w(-\w+)*')
+
+# Documents shaped like the output of json_to_cot and hello_event, without
+# any escaped characters, are decoded without building an element tree.
+_FAST_EVENT = re.compile(
+    r'(?:<\?xml[^>]*\?>)?\s*<event version="([^"&]*)" type="([^"&]*)" uid="([^"&]*)" time="([^"&]*)" '
+    r'start="([^"&]*)" stale="([^"&]*)" how="([^"&]*)"><point lat="([^"&]*)" lon="([^"&]*)" hae="([^"&]*)" '
+    r'ce="([^"&]*)" le="([^"&]*)" />(?:<detail>(?:<remarks>([^<&]+)</remarks>)?'
+    r'(?:<track course="([^"&]*)" speed="([^"&]*)" />)?(?:<uid Droid="([^"&]*)" />)?'
+    r'(?:<status battery="([^"&]*)" />)?(?:<contact callsign="([^"&]*)" />)?</detail>)?</event>\s*')
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_datetime(value: str) -> dt.datetime:
+    if len(value) == 20 and value[10] == "T" and value[19] == "Z":
+        return dt.datetime(int(value[0:4]), int(value[5:7]), int(value[8:10]), int(value[11:13]),
+                           int(value[14:16]), int(value[17:19]), tzinfo=dt.timezone.utc)
+    if "T" in value:
+        # CoT timestamps, optionally with fractional seconds or an offset.
+        parsed = dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(dt.timezone.utc)
+        return parsed
+    return dt.datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
+
+
+def _to_datetime(value) -> dt.datetime:
+    if isinstance(value, str):
+        # Consecutive events mostly share their timestamps, parsing them is cached.
+        return _parse_datetime(value)
+    return value
+
+
+def _number(value: str):
+    """Parses a numeric attribute, keeping integers as int."""
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def _format_datetime(value: dt.datetime) -> str:
+    """Same output as value.strftime(DATETIME_FMT), without the strftime overhead."""
+    return "%04d-%02d-%02dT%02d:%02d:%02dZ" % (value.year, value.month, value.day,
+                                               value.hour, value.minute, value.second)
+
 
 class Event:
+
+    """
+    Cursor on Target event.
+
+    Values are stored as plain float/int/datetime in __slots__ and only
+    formatted to their CoT precision when the event is serialized.
+    """
+
+    __slots__ = ("__version", "__type", "__access", "__qos", "__opex", "__uid",
+                 "__time", "__start", "__stale", "__how", "__Point", "__Detail")
+
     class Point:
+        __slots__ = ("_lat", "_lon", "_hae", "_ce", "_le")
+
         def __init__(self, lat, lon, hae, ce, le):
             self.lat = lat
             self.lon = lon
@@ -17,11 +79,11 @@ class Event:
 
         def generate_cot(self):
             pt_attr = {
-                "lat": str(f"{self.lat:.6f}"),
-                "lon": str(f"{self.lon:.6f}"),
-                "hae": str(f"{self.hae:.0f}"),
-                "ce": str(f"{self.ce:.0f}"),
-                "le": str(f"{self.le:.0f}")
+                "lat": f"{self._lat:.6f}",
+                "lon": f"{self._lon:.6f}",
+                "hae": f"{self._hae:.0f}",
+                "ce": f"{self._ce:.0f}",
+                "le": f"{self._le:.0f}"
             }
 
             cot = ET.Element('point', attrib=pt_attr)
@@ -29,91 +91,90 @@ class Event:
 
         @property
         def lat(self):
-            return Decimal(self._lat)
+            return self._lat
 
         @lat.setter
         def lat(self, value):
+            value = float(value)
             if 90 >= value >= -90:
-                self._lat = Decimal(value)
+                self._lat = value
             elif value == 9999999.0:
-                self._lat = Decimal(value)
+                self._lat = value
             else:
                 raise Exception(
                     "Latitude based on WGS-84 ellipsoid in signed degree-decimal format (e.g. -33.350000). Range -90 -> +90.")
 
         @property
         def lon(self):
-            return Decimal(self._lon)
+            return self._lon
 
         @lon.setter
         def lon(self, value):
+            value = float(value)
             if 180 >= value >= -180:
-                self._lon = Decimal(value)
+                self._lon = value
             elif value == 9999999.0:
-                self._lon = Decimal(value)
+                self._lon = value
             else:
                 raise Exception(
                     "Longitude based on WGS-84 ellipsoid in signed degree-decimal format (e.g. 44.383333). Range -180 -> +180.")
 
         @property
         def hae(self):
-            return Decimal(self._hae)
+            return self._hae
 
         @hae.setter
         def hae(self, value):
-            self._hae = Decimal(value)
+            self._hae = float(value)
 
         @property
         def ce(self):
-            return Decimal(self._ce)
+            return self._ce
 
         @ce.setter
         def ce(self, value):
-            self._ce = Decimal(value)
+            self._ce = float(value)
 
         @property
         def le(self):
-            return Decimal(self._le)
+            return self._le
 
         @le.setter
         def le(self, value):
-            self._le = Decimal(value)
+            self._le = float(value)
 
     class Detail:
+        __slots__ = ("_remark", "_track", "_flow_Tags", "_uid", "_status", "_contact")
+
+        def __init__(self):
+            self._remark = self._track = self._flow_Tags = self._uid = self._status = self._contact = None
 
         class Remark:
+            __slots__ = ("_source", "_time", "_to", "_keywords", "_version", "_text")
+
             def __init__(self, text):
                 self.text = text
+                self._source = self._time = self._to = self._keywords = self._version = None
 
             def generate_cot(self):
                 rmrks_attr = {}
-                try:
+                if self.source is not None:
                     rmrks_attr["source"] = str(self.source)
-                except AttributeError:
-                    pass
-                try:
+                if self.time is not None:
                     rmrks_attr["time"] = str(self.time)
-                except AttributeError:
-                    pass
-                try:
+                if self.to is not None:
                     rmrks_attr["to"] = str(self.to)
-                except AttributeError:
-                    pass
-                try:
+                if self.keywords is not None:
                     rmrks_attr["keywords"] = str(self.keywords)
-                except AttributeError:
-                    pass
-                try:
+                if self.version is not None:
                     rmrks_attr["version"] = str(self.version)
-                except AttributeError:
-                    pass
                 cot = ET.Element('remarks', attrib=rmrks_attr)
                 cot.text = self.text
                 return cot
 
             @property
             def source(self):
-                return str(self._source)
+                return self._source
 
             @source.setter
             def source(self, value):
@@ -121,15 +182,16 @@ class Event:
 
             @property
             def time(self):
-                return self._time
+                if self._time is not None:
+                    return _format_datetime(self._time)
 
             @time.setter
             def time(self, value):
-                self._time = value.strftime(DATETIME_FMT)
+                self._time = _to_datetime(value)
 
             @property
             def to(self):
-                return str(self._to)
+                return self._to
 
             @to.setter
             def to(self, value):
@@ -137,25 +199,22 @@ class Event:
 
             @property
             def keywords(self):
-                return str(self._keywords)
+                return self._keywords
 
             @keywords.setter
             def keywords(self, value):
-                p = re.compile('[\w\- ]+(,[\w\- ]+)*')
-                if p.match(value):
+                if _KEYWORDS.match(value):
                     self._keywords = str(value)
                 else:
-                    raise Exception("Keywords format needs to comply with [\w\- ]+(,[\w\- ]+)*")
+                    raise Exception(r"Keywords format needs to comply with [\w\- ]+(,[\w\- ]+)*")
 
             @property
             def version(self):
-                getcontext().prec = 2
-                return Decimal(self._version)
+                return self._version
 
             @version.setter
             def version(self, value):
-                getcontext().prec = 2
-                self._version = Decimal(value)
+                self._version = value if isinstance(value, int) else float(value)
 
             @property
             def text(self):
@@ -166,41 +225,34 @@ class Event:
                 self._text = value
 
         class Track:
+            __slots__ = ("_course", "_speed", "_Speed", "_slope", "_eCourse", "_eSpeed", "_eSlope", "_version")
+
             def __init__(self, course, speed):
                 self.course = course
                 self.speed = speed
+                self._Speed = self._slope = self._eCourse = self._eSpeed = self._eSlope = self._version = None
 
             def generate_cot(self):
                 trck_attr = {
                     "course": str(self.course),
-                    "speed": str(f"{self.speed:.1f}")
+                    "speed": f"{self._speed:.1f}"
                 }
-                try:
+                if self.slope is not None:
                     trck_attr["slope"] = str(self.slope)
-                except AttributeError:
-                    pass
-                try:
-                    trck_attr["eCourse"] = str(f"{self.eCourse:.2f}")
-                except AttributeError:
-                    pass
-                try:
-                    trck_attr["eSpeed"] = str(f"{self.eSpeed:.2f}")
-                except AttributeError:
-                    pass
-                try:
-                    trck_attr["eslope"] = str(f"{self.eSlope:.2f}")
-                except AttributeError:
-                    pass
-                try:
-                    trck_attr["version"] = str(f"{self.version:.2f}")
-                except AttributeError:
-                    pass
+                if self.eCourse is not None:
+                    trck_attr["eCourse"] = f"{self.eCourse:.2f}"
+                if self.eSpeed is not None:
+                    trck_attr["eSpeed"] = f"{self.eSpeed:.2f}"
+                if self.eSlope is not None:
+                    trck_attr["eslope"] = f"{self.eSlope:.2f}"
+                if self.version is not None:
+                    trck_attr["version"] = f"{self.version:.2f}"
                 cot = ET.Element('track', attrib=trck_attr)
                 return cot
 
             @property
             def course(self):
-                return int(self._course)
+                return self._course
 
             @course.setter
             def course(self, value):
@@ -209,19 +261,25 @@ class Event:
                 else:
                     raise Exception("Course needs to be between 0 and 360")
 
+            @property
+            def speed(self):
+                return self._speed
+
+            @speed.setter
+            def speed(self, value):
+                self._speed = float(value)
+
             @property
             def Speed(self):
-                getcontext().prec = 1
-                return Decimal(self._Speed) * 1
+                return self._Speed
 
             @Speed.setter
             def Speed(self, value):
-                getcontext().prec = 1
-                self._Speed = Decimal(value) * 1
+                self._Speed = float(value)
 
             @property
             def slope(self):
-                return int(self._slope)
+                return self._slope
 
             @slope.setter
             def slope(self, value):
@@ -232,57 +290,50 @@ class Event:
 
             @property
             def eCourse(self):
-                getcontext().prec = 2
-                return Decimal(self._eCourse) * 1
+                return self._eCourse
 
             @eCourse.setter
             def eCourse(self, value):
-                getcontext().prec = 2
-                self._eCourse = Decimal(value) * 1
+                self._eCourse = float(value)
 
             @property
             def eSpeed(self):
-                getcontext().prec = 2
-                return Decimal(self._eSpeed) * 1
+                return self._eSpeed
 
             @eSpeed.setter
             def eSpeed(self, value):
-                getcontext().prec = 2
-                self._eSpeed = Decimal(value) * 1
+                self._eSpeed = float(value)
 
             @property
             def eSlope(self):
-                getcontext().prec = 2
-                return Decimal(self._eSlope) * 1
+                return self._eSlope
 
             @eSlope.setter
             def eSlope(self, value):
-                getcontext().prec = 2
-                self._eSlope = Decimal(value) * 1
+                self._eSlope = float(value)
 
             @property
             def version(self):
-                getcontext().prec = 2
-                return Decimal(self._version) * 1
+                return self._version
 
             @version.setter
             def version(self, value):
-                getcontext().prec = 2
-                self._version = Decimal(value) * 1
+                self._version = float(value)
 
         class Flow_Tags:
+            __slots__ = ("_version", "_innerXML")
+
             def __init__(self, version):
                 self.version = version
+                self._innerXML = None
 
             @property
             def version(self):
-                getcontext().prec = 2
-                return Decimal(self._version) * 1
+                return self._version
 
             @version.setter
             def version(self, value):
-                getcontext().prec = 2
-                self._version = Decimal(value) * 1
+                self._version = float(value)
 
             @property
             def innerXML(self):
@@ -294,21 +345,25 @@ class Event:
 
             def generate_cot(self):
                 fltgs_attr = {
-                    "version": str(f"{self.version:.2f}")
+                    "version": f"{self.version:.2f}"
                 }
                 cot = ET.Element('_flow-tags_', attrib=fltgs_attr)
                 cot.text = self.innerXML
                 return cot
 
         class Uid:
+            __slots__ = ("_version", "_attributes")
+
+            def __init__(self):
+                self._version = self._attributes = None
 
             @property
             def version(self):
-                return Decimal(self._version)
+                return self._version
 
             @version.setter
             def version(self, value):
-                self._version = Decimal(value)
+                self._version = float(value)
 
             @property
             def attributes(self):
@@ -320,27 +375,26 @@ class Event:
 
             def generate_cot(self):
                 uid_attr = {}
-                try:
+                if self.version is not None:
                     uid_attr = {
-                        "version": str(f"{self.version:.1f}")
+                        "version": f"{self.version:.1f}"
                     }
-                except AttributeError:
-                    pass
-                try:
+                if self.attributes is not None:
                     for key, value in self.attributes.items():
                         uid_attr[key] = str(value)
-                except AttributeError:
-                    pass
                 cot = ET.Element('uid', attrib=uid_attr)
                 return cot
 
         class Status:
+            __slots__ = ("_battery", "_readiness")
+
             def __init__(self, battery):
                 self.battery = battery
+                self._readiness = None
 
             @property
             def battery(self):
-                return int(self._battery)
+                return self._battery
 
             @battery.setter
             def battery(self, value):
@@ -348,7 +402,7 @@ class Event:
 
             @property
             def readiness(self):
-                return bool(self._readiness)
+                return self._readiness
 
             @readiness.setter
             def readiness(self, value):
@@ -358,20 +412,22 @@ class Event:
                 sts_attr = {
                     "battery": str(self.battery)
                 }
-                try:
+                if self.readiness is not None:
                     sts_attr["readiness"] = str(self.readiness)
-                except AttributeError:
-                    pass
                 cot = ET.Element('status', attrib=sts_attr)
                 return cot
 
         class Contact:
+            __slots__ = ("_callsign", "_freq", "_email", "_dsn", "_phone", "_modulation", "_hostname", "_version")
+
             def __init__(self, value):
                 self.callsign = value
+                self._freq = self._email = self._dsn = self._phone = self._modulation = self._hostname = None
+                self._version = None
 
             @property
             def callsign(self):
-                return str(self._callsign)
+                return self._callsign
 
             @callsign.setter
             def callsign(self, value):
@@ -379,15 +435,15 @@ class Event:
 
             @property
             def freq(self):
-                return Decimal(self._freq)
+                return self._freq
 
             @freq.setter
             def freq(self, value):
-                self._freq = Decimal(value)
+                self._freq = float(value)
 
             @property
             def email(self):
-                return str(self._email)
+                return self._email
 
             @email.setter
             def email(self, value):
@@ -395,7 +451,7 @@ class Event:
 
             @property
             def dsn(self):
-                return str(self._dsn)
+                return self._dsn
 
             @dsn.setter
             def dsn(self, value):
@@ -403,7 +459,7 @@ class Event:
 
             @property
             def phone(self):
-                return str(self._phone)
+                return self._phone
 
             @phone.setter
             def phone(self, value):
@@ -411,7 +467,7 @@ class Event:
 
             @property
             def modulation(self):
-                return str(self._modulation)
+                return self._modulation
 
             @modulation.setter
             def modulation(self, value):
@@ -419,7 +475,7 @@ class Event:
 
             @property
             def hostname(self):
-                return str(self._hostname)
+                return self._hostname
 
             @hostname.setter
             def hostname(self, value):
@@ -427,46 +483,30 @@ class Event:
 
             @property
             def version(self):
-                getcontext().prec = 2
-                return Decimal(self._version) * 1
+                return self._version
 
             @version.setter
             def version(self, value):
-                getcontext().prec = 2
-                self._version = Decimal(value) * 1
+                self._version = float(value)
 
             def generate_cot(self):
                 ct_attr = {
                     "callsign": str(self.callsign)
                 }
-                try:
-                    ct_attr["freq"] = str(f"{self.freq:.2f}")
-                except AttributeError:
-                    pass
-                try:
+                if self.freq is not None:
+                    ct_attr["freq"] = f"{self.freq:.2f}"
+                if self.email is not None:
                     ct_attr["email"] = str(self.email)
-                except AttributeError:
-                    pass
-                try:
+                if self.dsn is not None:
                     ct_attr["dsn"] = str(self.dsn)
-                except AttributeError:
-                    pass
-                try:
+                if self.phone is not None:
                     ct_attr["phone"] = str(self.phone)
-                except AttributeError:
-                    pass
-                try:
+                if self.modulation is not None:
                     ct_attr["modulation"] = str(self.modulation)
-                except AttributeError:
-                    pass
-                try:
+                if self.hostname is not None:
                     ct_attr["hostname"] = str(self.hostname)
-                except AttributeError:
-                    pass
-                try:
-                    ct_attr["version"] = str(f"{self.version:.2f}")
-                except AttributeError:
-                    pass
+                if self.version is not None:
+                    ct_attr["version"] = f"{self.version:.2f}"
                 cot = ET.Element('contact', attrib=ct_attr)
                 return cot
 
@@ -506,10 +546,7 @@ class Event:
 
         @property
         def remark(self):
-            try:
-                return self._remark
-            except Exception:
-                pass
+            return self._remark
 
         @remark.setter
         def remark(self, value):
@@ -520,10 +557,7 @@ class Event:
 
         @property
         def track(self):
-            try:
-                return self._track
-            except Exception:
-                pass
+            return self._track
 
         @track.setter
         def track(self, value):
@@ -534,10 +568,7 @@ class Event:
 
         @property
         def flow_tags(self):
-            try:
-                return self._flow_Tags
-            except Exception:
-                pass
+            return self._flow_Tags
 
         @flow_tags.setter
         def flow_tags(self, value):
@@ -548,10 +579,7 @@ class Event:
 
         @property
         def uid(self):
-            try:
-                return self._uid
-            except Exception:
-                pass
+            return self._uid
 
         @uid.setter
         def uid(self, value):
@@ -562,10 +590,7 @@ class Event:
 
         @property
         def status(self):
-            try:
-                return self._status
-            except Exception:
-                pass
+            return self._status
 
         @status.setter
         def status(self, value):
@@ -576,10 +601,7 @@ class Event:
 
         @property
         def contact(self):
-            try:
-                return self._contact
-            except Exception:
-                pass
+            return self._contact
 
         @contact.setter
         def contact(self, value):
@@ -589,6 +611,7 @@ class Event:
                 raise Exception("Status must be an instance of Event.Detail.Status")
 
     def __init__(self, version, event_type, uid, time, start, stale, how):
+        self.__access = self.__qos = self.__opex = self.__Point = self.__Detail = None
         self.version = version
         self.type = event_type
         self.uid = uid
@@ -597,9 +620,103 @@ class Event:
         self.stale = stale
         self.how = how
 
+    @classmethod
+    def from_xml(cls, cot) -> "Event":
+        """
+        Builds an Event from a CoT <event> element, or from the XML bytes or
+        string of one. Detail elements the model has no class for are skipped.
+        """
+        if not isinstance(cot, ET.Element):
+            cot = ET.fromstring(cot)
+        attrib = cot.attrib
+        event = cls(attrib["version"], attrib["type"], attrib["uid"], attrib["time"],
+                    attrib["start"], attrib["stale"], attrib["how"])
+        if "access" in attrib:
+            event.access = attrib["access"]
+        if "qos" in attrib:
+            event.qos = attrib["qos"]
+        if "opex" in attrib:
+            event.opex = attrib["opex"]
+        point = cot.find("point")
+        if point is not None:
+            attrib = point.attrib
+            event.point = Event.Point(attrib["lat"], attrib["lon"], attrib.get("hae", 9999999.0),
+                                      attrib.get("ce", 9999999.0), attrib.get("le", 9999999.0))
+        detail = cot.find("detail")
+        if detail is not None:
+            event.detail = Event.Detail()
+            for element in detail:
+                attrib = element.attrib
+                if element.tag == "remarks":
+                    remark = Event.Detail.Remark(element.text or "")
+                    for key in ("source", "time", "to", "keywords"):
+                        if key in attrib:
+                            setattr(remark, key, attrib[key])
+                    if "version" in attrib:
+                        remark.version = _number(attrib["version"])
+                    event.detail.remark = remark
+                elif element.tag == "track":
+                    track = Event.Detail.Track(_number(attrib.get("course", 0)), attrib.get("speed", 0))
+                    for key, name in (("slope", "slope"), ("eCourse", "eCourse"), ("eSpeed", "eSpeed"),
+                                      ("eslope", "eSlope"), ("version", "version")):
+                        if key in attrib:
+                            setattr(track, name, _number(attrib[key]))
+                    event.detail.track = track
+                elif element.tag == "uid":
+                    uid = Event.Detail.Uid()
+                    attributes = dict(attrib)
+                    if "version" in attributes:
+                        uid.version = attributes.pop("version")
+                    uid.attributes = attributes
+                    event.detail.uid = uid
+                elif element.tag == "status":
+                    status = Event.Detail.Status(_number(attrib.get("battery", 0)))
+                    if "readiness" in attrib:
+                        status.readiness = attrib["readiness"].lower() == "true"
+                    event.detail.status = status
+                elif element.tag == "contact":
+                    contact = Event.Detail.Contact(attrib.get("callsign", ""))
+                    for key in ("freq", "email", "dsn", "phone", "modulation", "hostname", "version"):
+                        if key in attrib:
+                            setattr(contact, key, attrib[key])
+                    event.detail.contact = contact
+        return event
+
+    @classmethod
+    def from_bytes(cls, data) -> "Event":
+        """
+        Decodes serialized CoT, the inverse of generate_cot. Events in the shape
+        of json_to_cot and hello_event take a regular expression fast path,
+        anything else goes through from_xml.
+        """
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            data = bytes(data).decode("utf-8")
+        match = _FAST_EVENT.fullmatch(data)
+        if match is None:
+            return cls.from_xml(data.encode("utf-8"))
+        (version, event_type, uid, time, start, stale, how, lat, lon, hae, ce, le,
+         remark, course, speed, droid, battery, callsign) = match.groups()
+        event = cls(version, event_type, uid, time, start, stale, how)
+        event.point = Event.Point(lat, lon, hae, ce, le)
+        if "<detail>" not in data:
+            return event
+        event.detail = detail = Event.Detail()
+        if remark is not None:
+            detail.remark = Event.Detail.Remark(remark)
+        if course is not None:
+            detail.track = Event.Detail.Track(_number(course), speed)
+        if droid is not None:
+            detail.uid = Event.Detail.Uid()
+            detail.uid.attributes = {"Droid": droid}
+        if battery is not None:
+            detail.status = Event.Detail.Status(battery)
+        if callsign is not None:
+            detail.contact = Event.Detail.Contact(callsign)
+        return event
+
     def generate_cot(self):
         evt_attr = {
-            "version": str(f"{self.version:.1f}"),
+            "version": f"{self.version:.1f}",
             "type": str(self.type),
             "uid": str(self.uid),
             "time": str(self.time),
@@ -607,24 +724,19 @@ class Event:
             "stale": str(self.stale),
             "how": str(self.how)
         }
-        try:
+        if self.access is not None:
             evt_attr["access"] = str(self.access)
-        except AttributeError:
-            pass
-        try:
+        if self.qos is not None:
             evt_attr["qos"] = str(self.qos)
-        except AttributeError:
-            pass
-        try:
+        if self.opex is not None:
             evt_attr["opex"] = str(self.opex)
-        except AttributeError:
-            pass
         cot = ET.Element('event', attrib=evt_attr)
-        try:
-            cot.append(self.point.generate_cot())
-        except Exception:
-            pass
-        if hasattr(self, 'detail'):
+        if self.point is not None:
+            try:
+                cot.append(self.point.generate_cot())
+            except Exception:
+                pass
+        if self.detail is not None:
             try:
                 cot.append(self.detail.generate_cot())
             except AttributeError:
@@ -634,17 +746,15 @@ class Event:
 
     @property
     def version(self):
-        getcontext().prec = 2
-        return Decimal(self.__version) * 1
+        return self.__version
 
     @version.setter
     def version(self, version):
-        getcontext().prec = 2
-        self.__version = Decimal(version) * 1
+        self.__version = float(version)
 
     @property
     def type(self):
-        return str(self.__type)
+        return self.__type
 
     @type.setter
     def type(self, value):
@@ -652,7 +762,7 @@ class Event:
 
     @property
     def access(self):
-        return str(self.__access)
+        return self.__access
 
     @access.setter
     def access(self, access):
@@ -660,31 +770,29 @@ class Event:
 
     @property
     def qos(self):
-        return str(self.__qos)
+        return self.__qos
 
     @qos.setter
     def qos(self, qos):
-        p = re.compile('\d-\w-\w')
-        if p.match(qos):
+        if _QOS.match(qos):
             self.__qos = str(qos)
         else:
-            raise Exception("qos format needs to comply with \d-\w-\w")
+            raise Exception(r"qos format needs to comply with \d-\w-\w")
 
     @property
     def opex(self):
-        return str(self.__opex)
+        return self.__opex
 
     @opex.setter
     def opex(self, opex):
-        p = re.compile("^[oes].*")
-        if p.match(opex):
+        if _OPEX.match(opex):
             self.__opex = str(opex)
         else:
             raise Exception("opex format needs to comply with ^[o,e,s].*")
 
     @property
     def uid(self):
-        return str(self.__uid)
+        return self.__uid
 
     @uid.setter
     def uid(self, uid):
@@ -692,48 +800,38 @@ class Event:
 
     @property
     def time(self):
-        return self.__time
+        return _format_datetime(self.__time)
 
     @time.setter
     def time(self, time):
-        if isinstance(time, str):
-            self.__time = dt.datetime.strptime(time, '%Y-%m-%d %H:%M:%S').strftime(DATETIME_FMT)
-        else:
-            self.__time = time.strftime(DATETIME_FMT)
+        self.__time = _to_datetime(time)
 
     @property
     def start(self):
-        return self.__start
+        return _format_datetime(self.__start)
 
     @start.setter
     def start(self, start):
-        if isinstance(start, str):
-            self.__start = dt.datetime.strptime(start, '%Y-%m-%d %H:%M:%S').strftime(DATETIME_FMT)
-        else:
-            self.__start = start.strftime(DATETIME_FMT)
+        self.__start = _to_datetime(start)
 
     @property
     def stale(self):
-        return self.__stale
+        return _format_datetime(self.__stale)
 
     @stale.setter
     def stale(self, stale):
-        if isinstance(stale, str):
-            self.__stale = dt.datetime.strptime(stale, '%Y-%m-%d %H:%M:%S').strftime(DATETIME_FMT)
-        else:
-            self.__stale = stale.strftime(DATETIME_FMT)
+        self.__stale = _to_datetime(stale)
 
     @property
     def how(self):
-        return str(self.__how)
+        return self.__how
 
     @how.setter
     def how(self, how):
-        p = re.compile('\w(-\w+)*')
-        if p.match(how):
+        if _HOW.match(how):
             self.__how = str(how)
         else:
-            raise Exception("how format needs to comply with \w(-\w+)*")
+            raise Exception(r"how format needs to comply with \w(-\w+)*")
 
     @property
     def point(self):
@@ -1,27 +1,82 @@
 import datetime as dt
+import functools
 import json
-import urllib.error
-import urllib.request
-from decimal import Decimal
+import logging
+import urllib.parse
+import zoneinfo
 
 import CoT_Trackserver
 
 
-def login() -> tuple:
-    r = urllib.request.urlopen(
-        'http://mobile.trackserver.co.uk/api/api/MobileApp/Login?AccountName=' + CoT_Trackserver.constants.accountRef + '&AccountPassword=' + CoT_Trackserver.constants.accountPass + '&SessionID=')
-    json_data = r.read()
+def get_logger(name: str) -> logging.Logger:
+    """Logger of name writing to the console at LOG_LEVEL, set up once like the Worker loggers."""
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        logger.setLevel(CoT_Trackserver.constants.LOG_LEVEL)
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(CoT_Trackserver.constants.LOG_LEVEL)
+        console_handler.setFormatter(CoT_Trackserver.constants.LOG_FORMAT)
+        logger.addHandler(console_handler)
+        logger.propagate = False
+    return logger
+
+
+async def login(http_client=None, account_ref: str = None, account_pass: str = None, api_url: str = None) -> tuple:
+    client = http_client or CoT_Trackserver.HTTPClient()
+    account_ref = CoT_Trackserver.constants.accountRef if account_ref is None else account_ref
+    account_pass = CoT_Trackserver.constants.accountPass if account_pass is None else account_pass
+    api_url = api_url or CoT_Trackserver.constants.DEFAULT_API_URL
+    try:
+        json_data = await client.get(
+            api_url + 'Login?AccountName=' + urllib.parse.quote(account_ref, safe="") + '&AccountPassword=' + urllib.parse.quote(account_pass, safe="") + '&SessionID=')
+    finally:
+        if http_client is None:
+            await client.close()
     parsed_json = (json.loads(json_data))
     sessionID = parsed_json["SessionID"]
     accountID = parsed_json["AccountID"]
     return sessionID, accountID
 
 
-def json_to_cot(device, stale) -> CoT_Trackserver.Event:
-    speed = Decimal(device["SpeedKPH"]) * Decimal(0.2777778)  # 0.2777778 is 1 kph
-    time = dt.datetime.now(dt.timezone.utc)
+def is_moving(device) -> bool:
+    return str(device["MotionStatus"]) == "1"
+
+
+@functools.lru_cache(maxsize=4096)
+def _fix_datetime(value: str, timezone: str) -> dt.datetime:
+    zone = dt.timezone.utc if timezone == "UTC" else zoneinfo.ZoneInfo(timezone)
+    return dt.datetime.strptime(value, '%Y-%m-%d %H:%M:%S').replace(tzinfo=zone).astimezone(dt.timezone.utc)
+
+
+def parse_fix(device, timezone: str = None) -> dt.datetime:
+    """
+    LastGPSFix of device as an UTC datetime, read in timezone (by default
+    DEFAULT_FIX_TIMEZONE). Raises ValueError when the device has no fix in
+    the '%Y-%m-%d %H:%M:%S' format.
+    """
+    value = device.get("LastGPSFix")
+    if not isinstance(value, str):
+        raise ValueError("LastGPSFix " + repr(value) + " is not a time")
+    # Devices of one poll share few distinct fix times, parsing them is cached.
+    return _fix_datetime(value, timezone or CoT_Trackserver.constants.DEFAULT_FIX_TIMEZONE)
+
+
+def json_to_cot(device, stale, fix_time: bool = False, fix_timezone: str = None) -> CoT_Trackserver.Event:
+    """
+    Converts a Trackserver device to a CoT event valid for stale seconds. With
+    fix_time the event time and start are the LastGPSFix of the device, read
+    in fix_timezone, or now when it has no usable LastGPSFix.
+    """
+    speed = float(device["SpeedKPH"]) * 0.2777778  # 0.2777778 is 1 kph
+    now = dt.datetime.now(dt.timezone.utc)
+    time = now
+    if fix_time:
+        try:
+            time = parse_fix(device, fix_timezone)
+        except ValueError:
+            pass
 
-    evt = CoT_Trackserver.Event(2, "a-h-G-E-V-C", device["Name"], time, time, time + dt.timedelta(seconds=stale),
+    evt = CoT_Trackserver.Event(2, "a-h-G-E-V-C", device["Name"], time, time, now + dt.timedelta(seconds=stale),
                             "m-g")
     evt.point = CoT_Trackserver.Event.Point(device["Lat"], device["Lon"], 0, 10, 10)
     evt.detail = CoT_Trackserver.Event.Detail()
@@ -29,7 +84,7 @@ def json_to_cot(device, stale) -> CoT_Trackserver.Event:
     evt.detail.uid.attributes = {"Droid": device["Name"]}
     evt.detail.track = CoT_Trackserver.Event.Detail.Track(device["Heading"], speed)
     evt.detail.status = CoT_Trackserver.Event.Detail.Status(device["BatteryLevel"])
-    if str(device["MotionStatus"]) == "1":
+    if is_moving(device):
         remark_string = "Device Moving: true"
     else:
         remark_string = "Device Moving: false"
@@ -0,0 +1,295 @@
+import array
+import bisect
+import collections
+import json
+import math
+import mmap
+import os
+import struct
+
+import CoT_Trackserver
+
+# Device index, fix time, lat, lon, speed in m/s, course, battery.
+RECORD = struct.Struct("<IdddffB3x")
+INDEX_MAGIC: bytes = b"CoTIdx01"
+# Magic, devices, records, first and last fix time.
+INDEX_HEADER = struct.Struct("<8sIIdd")
+# Device index, records of the device, position of its first record in the columns.
+INDEX_ENTRY = struct.Struct("<IIQ")
+
+Position = collections.namedtuple("Position", ("name", "time", "lat", "lon", "speed", "course", "battery"))
+
+
+class _Segment:
+
+    """
+    One records file of the history and its per device time index.
+
+    The index of the active segment is kept in arrays per device. Sealing
+    writes it to an .idx file as a directory of devices followed by a column
+    of fix times and a column of record numbers, both in device order, which
+    are then read from a memory map.
+    """
+
+    def __init__(self, directory: str, number: int) -> None:
+        self.number: int = number
+        self.path: str = os.path.join(directory, "%08d" % number)
+        self.count: int = 0
+        self.t_min: float = math.inf
+        self.t_max: float = -math.inf
+        self.index: dict = {}
+        self._fd = None
+        self._map = None
+        self._index_map = None
+        self._views: list = []
+
+    @property
+    def sealed(self) -> bool:
+        return self._fd is None
+
+    def open(self) -> None:
+        """Opens the segment for appending and indexes the records already in it."""
+        self._fd = os.open(self.path + ".trk", os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        size = os.fstat(self._fd).st_size
+        whole = size - size % RECORD.size
+        if whole != size:
+            # A record cut short by a crash.
+            os.ftruncate(self._fd, whole)
+        if whole:
+            for uid, timestamp, *_position in RECORD.iter_unpack(os.pread(self._fd, whole, 0)):
+                self.add(uid, timestamp)
+
+    def add(self, uid: int, timestamp: float) -> None:
+        series = self.index.get(uid)
+        if series is None:
+            series = self.index[uid] = (array.array("d"), array.array("I"))
+        series[0].append(timestamp)
+        series[1].append(self.count)
+        self.count += 1
+        self.t_min = min(self.t_min, timestamp)
+        self.t_max = max(self.t_max, timestamp)
+
+    def write(self, data: bytes) -> None:
+        os.write(self._fd, data)
+
+    def seal(self) -> None:
+        """Writes the index file and switches the segment to reading from memory maps."""
+        entries = []
+        times = array.array("d")
+        records = array.array("I")
+        for uid in sorted(self.index):
+            series_times, series_records = self.index[uid]
+            entries.append(INDEX_ENTRY.pack(uid, len(series_times), len(times)))
+            times.extend(series_times)
+            records.extend(series_records)
+        with open(self.path + ".idx.tmp", "wb") as file:
+            file.write(INDEX_HEADER.pack(INDEX_MAGIC, len(entries), self.count, self.t_min, self.t_max))
+            file.write(b"".join(entries))
+            file.write(times.tobytes())
+            file.write(records.tobytes())
+        os.replace(self.path + ".idx.tmp", self.path + ".idx")
+        os.close(self._fd)
+        self._fd = None
+        self.load()
+
+    def load(self) -> None:
+        """Maps a sealed segment and its index file."""
+        with open(self.path + ".trk", "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(self.path + ".idx", "rb") as file:
+            self._index_map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, devices, self.count, self.t_min, self.t_max = INDEX_HEADER.unpack_from(self._index_map)
+        if magic != INDEX_MAGIC:
+            raise Exception("Invalid history index " + self.path + ".idx")
+        offset = INDEX_HEADER.size + devices * INDEX_ENTRY.size
+        view = memoryview(self._index_map)
+        times = view[offset:offset + self.count * 8].cast("d")
+        records = view[offset + self.count * 8:offset + self.count * 12].cast("I")
+        self._views = [view, times, records]
+        self.index = {}
+        for uid, count, start in INDEX_ENTRY.iter_unpack(self._index_map[INDEX_HEADER.size:offset]):
+            self.index[uid] = (times[start:start + count], records[start:start + count])
+
+    def read(self, record: int) -> tuple:
+        if self._map is not None:
+            return RECORD.unpack_from(self._map, record * RECORD.size)
+        return RECORD.unpack(os.pread(self._fd, RECORD.size, record * RECORD.size))
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self.index = {}
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        for mapped in (self._map, self._index_map):
+            if mapped is not None:
+                mapped.close()
+        self._map = self._index_map = None
+
+
+class TrackHistory:
+
+    """
+    Append-only history of device fixes in fixed width binary records.
+
+    Records go to numbered segment files in directory, a new segment is
+    started every segment_records records and the full one is sealed with an
+    index of fix times per device. Device names are numbered in the names
+    file. A fix is only appended when it is newer than the last one of the
+    device, so fix times are ascending per device across all segments and
+    track() and at() find records by binary search instead of scanning.
+    Appends are buffered up to buffer_bytes, flush() writes them out.
+    """
+
+    _logger = CoT_Trackserver.functions.get_logger(__name__)
+
+    def __init__(self, directory: str, segment_records: int = None, buffer_bytes: int = None) -> None:
+        self.directory: str = directory
+        self.segment_records: int = int(segment_records or
+                                        CoT_Trackserver.constants.DEFAULT_HISTORY_SEGMENT_RECORDS)
+        self.buffer_bytes: int = int(buffer_bytes or CoT_Trackserver.constants.DEFAULT_HISTORY_BUFFER)
+        self.appended: int = 0
+        self.skipped: int = 0
+        self.invalid: int = 0
+        self.names: list = []
+        self._uids: dict = {}
+        self._last: dict = {}
+        self._buffer = bytearray()
+        os.makedirs(directory, exist_ok=True)
+        self._names = open(os.path.join(directory, "names"), "a+", encoding="utf-8")
+        self._names.seek(0)
+        for line in self._names:
+            name = json.loads(line)
+            self._uids[name] = len(self.names)
+            self.names.append(name)
+        numbers = sorted(int(name[:-4]) for name in os.listdir(directory) if name.endswith(".trk"))
+        self.segments: list = []
+        for number in numbers:
+            segment = _Segment(directory, number)
+            if os.path.exists(segment.path + ".idx"):
+                segment.load()
+            else:
+                # The active segment, or one whose sealing was interrupted.
+                segment.open()
+                if number != numbers[-1]:
+                    segment.seal()
+            self.segments.append(segment)
+            for uid, (times, _records) in segment.index.items():
+                self._last[uid] = times[-1]
+        if not self.segments or self.segments[-1].sealed:
+            self._start_segment()
+
+    def __len__(self) -> int:
+        return sum(segment.count for segment in self.segments)
+
+    def _start_segment(self) -> None:
+        segment = _Segment(self.directory, self.segments[-1].number + 1 if self.segments else 0)
+        segment.open()
+        self.segments.append(segment)
+
+    def _uid(self, name: str) -> int:
+        uid = self._uids.get(name)
+        if uid is None:
+            uid = self._uids[name] = len(self.names)
+            self.names.append(name)
+            # Names are on disk before any record refers to them.
+            self._names.write(json.dumps(name) + "\n")
+            self._names.flush()
+        return uid
+
+    def append(self, name: str, timestamp: float, lat: float, lon: float,
+               speed: float, course: float, battery: int) -> bool:
+        """Adds a fix of name at the epoch seconds timestamp, returns False when it is not newer than the last."""
+        uid = self._uid(name)
+        if timestamp <= self._last.get(uid, -math.inf):
+            self.skipped += 1
+            return False
+        self._last[uid] = timestamp
+        self._buffer += RECORD.pack(uid, timestamp, lat, lon, speed, course, min(max(int(float(battery)), 0), 255))
+        active = self.segments[-1]
+        active.add(uid, timestamp)
+        self.appended += 1
+        if len(self._buffer) >= self.buffer_bytes:
+            self.flush()
+        if active.count >= self.segment_records:
+            self.flush()
+            active.seal()
+            self._start_segment()
+        return True
+
+    def append_device(self, device: dict, fix_timezone: str = None) -> bool:
+        """
+        Adds the fix of a Trackserver device, LastGPSFix read in fix_timezone.
+        A device without a valid fix time or position is counted as invalid
+        and not added.
+        """
+        try:
+            timestamp = CoT_Trackserver.functions.parse_fix(device, fix_timezone).timestamp()
+            lat, lon = float(device["Lat"]), float(device["Lon"])
+            speed = float(device["SpeedKPH"]) * 0.2777778
+            course, battery = float(device["Heading"]), float(device["BatteryLevel"])
+            if not all(map(math.isfinite, (lat, lon, speed, course, battery))):
+                raise ValueError("not finite")
+        except (KeyError, TypeError, ValueError) as error:
+            self.invalid += 1
+            self._logger.debug("Not adding %s to the history: %s", device.get("Name"), error)
+            return False
+        return self.append(str(device["Name"]), timestamp, lat, lon, speed, course, battery)
+
+    def flush(self) -> None:
+        if self._buffer:
+            self.segments[-1].write(self._buffer)
+            self._buffer = bytearray()
+
+    def _position(self, record: tuple) -> Position:
+        uid, timestamp, lat, lon, speed, course, battery = record
+        return Position(self.names[uid], timestamp, lat, lon, speed, course, battery)
+
+    def track(self, name: str, start: float, end: float) -> list:
+        """Positions of name with start <= time <= end, oldest first."""
+        uid = self._uids.get(name)
+        if uid is None:
+            return []
+        self.flush()
+        out = []
+        for segment in self.segments:
+            series = segment.index.get(uid)
+            if series is None or segment.t_max < start or segment.t_min > end:
+                continue
+            times, records = series
+            for i in range(bisect.bisect_left(times, start), bisect.bisect_right(times, end)):
+                out.append(self._position(segment.read(records[i])))
+        return out
+
+    def at(self, when: float, max_age: float = None) -> dict:
+        """Last position of every device at time when, by name, leaving out fixes older than max_age seconds."""
+        oldest = when - (CoT_Trackserver.constants.DEFAULT_COT_STALE if max_age is None else max_age)
+        self.flush()
+        out = {}
+        done = set()
+        for segment in reversed(self.segments):
+            if segment.t_min > when or segment.t_max < oldest:
+                continue
+            for uid, (times, records) in segment.index.items():
+                if uid in done:
+                    continue
+                i = bisect.bisect_right(times, when) - 1
+                if i < 0:
+                    # Only later fixes here, an older segment may have one.
+                    continue
+                done.add(uid)
+                if times[i] >= oldest:
+                    out[self.names[uid]] = self._position(segment.read(records[i]))
+        return out
+
+    def close(self) -> None:
+        self.flush()
+        for segment in self.segments:
+            segment.close()
+        self._names.close()
+
+    def stats(self) -> dict:
+        return {"devices": len(self.names), "segments": len(self.segments), "records": len(self),
+                "appended": self.appended, "skipped": self.skipped, "invalid": self.invalid}
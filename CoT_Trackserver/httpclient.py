@@ -0,0 +1,213 @@
+import asyncio
+import http.client
+import ssl
+import urllib.error
+import urllib.parse
+
+import CoT_Trackserver
+
+
+class HTTPResponse:
+
+    """Response of a HTTPClient request, the body is read from the pooled connection."""
+
+    def __init__(self, client, key, url: str, status: int, reason: str,
+                 headers: http.client.HTTPMessage, reader, writer) -> None:
+        self._client = client
+        self._key = key
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self._reader = reader
+        self._writer = writer
+        self._done = False
+
+    @property
+    def keep_alive(self) -> bool:
+        return "close" not in str(self.headers.get("Connection", "")).lower()
+
+    async def _iter_body(self):
+        reader = self._reader
+        try:
+            if "chunked" in str(self.headers.get("Transfer-Encoding", "")).lower():
+                while 1:
+                    size_line = await reader.readline()
+                    size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+                    if size == 0:
+                        # Skip the optional trailers up to the closing empty line.
+                        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                            pass
+                        break
+                    yield await reader.readexactly(size)
+                    await reader.readexactly(2)
+            elif self.headers.get("Content-Length") is not None:
+                remaining = int(self.headers["Content-Length"])
+                while remaining > 0:
+                    chunk = await reader.read(min(remaining, CoT_Trackserver.constants.DEFAULT_HTTP_CHUNK))
+                    if not chunk:
+                        raise asyncio.IncompleteReadError(b"", remaining)
+                    remaining -= len(chunk)
+                    yield chunk
+            else:
+                while 1:
+                    chunk = await reader.read(CoT_Trackserver.constants.DEFAULT_HTTP_CHUNK)
+                    if not chunk:
+                        break
+                    yield chunk
+                # Body delimited by the server closing the connection.
+                del self.headers["Connection"]
+                self.headers["Connection"] = "close"
+        except BaseException:
+            self._release(reuse=False)
+            raise
+        self._release(reuse=self.keep_alive)
+
+    async def iter_chunks(self):
+        """Yields the body as it arrives, each chunk within the client timeout."""
+        chunks = self._iter_body()
+        try:
+            while 1:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), self._client.timeout)
+                except StopAsyncIteration:
+                    return
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    async def read(self) -> bytes:
+        """Reads the complete body and hands the connection back to the pool."""
+        return b"".join([chunk async for chunk in self._iter_body()])
+
+    def _release(self, reuse: bool) -> None:
+        if self._done:
+            return
+        self._done = True
+        self._client._release(self._key, self._reader, self._writer, reuse)
+
+
+class HTTPClient:
+
+    """
+    Small asyncio HTTP/1.1 client for the Trackserver API.
+
+    Connections are kept alive and pooled per host, so polling does not block
+    the event loop and does not pay the TCP setup on every request.
+    """
+
+    _logger = CoT_Trackserver.functions.get_logger(__name__)
+
+    def __init__(self, max_connections: int = None, timeout: float = None) -> None:
+        self.max_connections: int = int(max_connections or
+                                        CoT_Trackserver.constants.DEFAULT_HTTP_CONNECTIONS)
+        self.timeout: float = float(timeout or CoT_Trackserver.constants.DEFAULT_HTTP_TIMEOUT)
+        self._idle: dict = {}
+        self._limits: dict = {}
+        self.connections_opened: int = 0
+        self.connections_reused: int = 0
+
+    @staticmethod
+    def _split_url(url: str) -> tuple:
+        parts = urllib.parse.urlsplit(url)
+        secure = parts.scheme == "https"
+        port = parts.port or (443 if secure else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        return (parts.hostname, port, secure), path
+
+    def _limit(self, key) -> asyncio.Semaphore:
+        if key not in self._limits:
+            self._limits[key] = asyncio.Semaphore(self.max_connections)
+        return self._limits[key]
+
+    async def _connect(self, key) -> tuple:
+        idle = self._idle.get(key)
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                self.connections_reused += 1
+                return reader, writer, True
+            writer.close()
+        host, port, secure = key
+        # An unreachable host fails the request within the timeout instead of hanging the poll.
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(
+            host, port, ssl=ssl.create_default_context() if secure else None), self.timeout)
+        self.connections_opened += 1
+        self._logger.debug("Opened connection to %s:%s", host, port)
+        return reader, writer, False
+
+    def _release(self, key, reader, writer, reuse: bool) -> None:
+        if reuse and not writer.is_closing():
+            self._idle.setdefault(key, []).append((reader, writer))
+        else:
+            writer.close()
+        self._limit(key).release()
+
+    async def _send(self, key, path: str, reader, writer) -> tuple:
+        host, port, secure = key
+        if port == (443 if secure else 80):
+            host_header = host
+        else:
+            host_header = host + ":" + str(port)
+        writer.write(("GET " + path + " HTTP/1.1\r\n"
+                      "Host: " + host_header + "\r\n"
+                      "Accept: application/json\r\n"
+                      "Accept-Encoding: identity\r\n"
+                      "Connection: keep-alive\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by server")
+        _version, status, *reason = status_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+        headers = http.client.HTTPMessage()
+        while 1:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip()] = value.strip()
+        return int(status), (reason[0] if reason else ""), headers
+
+    async def request(self, url: str) -> HTTPResponse:
+        """Sends a GET request and returns the response once the headers are in."""
+        key, path = self._split_url(url)
+        await self._limit(key).acquire()
+        writer = None
+        try:
+            reader, writer, reused = await self._connect(key)
+            try:
+                status, reason, headers = await asyncio.wait_for(
+                    self._send(key, path, reader, writer), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if not reused:
+                    raise
+                # The server dropped idle keep-alive connections, retry on a fresh one.
+                self._logger.debug("Pooled connection went stale, reconnecting")
+                for _reader, stale_writer in self._idle.pop(key, []):
+                    stale_writer.close()
+                reader, writer, _ = await self._connect(key)
+                status, reason, headers = await asyncio.wait_for(
+                    self._send(key, path, reader, writer), self.timeout)
+        except BaseException:
+            if writer is not None:
+                writer.close()
+            self._limit(key).release()
+            raise
+        return HTTPResponse(self, key, url, status, reason, headers, reader, writer)
+
+    async def get(self, url: str) -> bytes:
+        """Returns the body of a GET request, raises urllib.error.HTTPError on error status."""
+        response = await self.request(url)
+        body = await asyncio.wait_for(response.read(), self.timeout)
+        if response.status >= 400:
+            raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, None)
+        return body
+
+    async def close(self) -> None:
+        for connections in self._idle.values():
+            for _reader, writer in connections:
+                writer.close()
+        self._idle.clear()
@@ -0,0 +1,75 @@
+import codecs
+import json
+import re
+
+import CoT_Trackserver
+
+_SPACE = re.compile(r'[ \t\n\r,]*')
+# What may still follow a number cut at the end of the window, as in "2." or "1e".
+_NUMBER_TAIL = re.compile(r'[0-9.eE+-]*')
+
+
+class JSONArrayParser:
+
+    """
+    Incrementally decodes the items of one array in a JSON document.
+
+    Data is fed in arbitrary chunks. Everything before the array under key is
+    skipped, and each item is decoded with json.JSONDecoder.raw_decode as soon
+    as it is complete. Only the unparsed window is kept, it may grow up to
+    max_pending characters for a single item.
+    """
+
+    def __init__(self, key: str, max_pending: int = None) -> None:
+        self.key: str = key
+        self.max_pending: int = int(max_pending or CoT_Trackserver.constants.DEFAULT_JSON_MAX_PENDING)
+        self.items: int = 0
+        self.done: bool = False
+        self._start = re.compile(r'"' + re.escape(key) + r'"\s*:\s*\[')
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._window = ""
+        self._in_array = False
+
+    def feed(self, data: bytes) -> list:
+        """Returns the array items completed by data."""
+        if self.done:
+            return []
+        window = self._window + self._utf8.decode(data)
+        pos = 0
+        if not self._in_array:
+            match = self._start.search(window)
+            if match is None:
+                # Keep enough of the tail for a key split across chunks.
+                self._window = window[-(len(self.key) + 64):]
+                return []
+            self._in_array = True
+            pos = match.end()
+        items = []
+        while 1:
+            pos = _SPACE.match(window, pos).end()
+            if pos == len(window):
+                break
+            if window[pos] == "]":
+                self.done = True
+                break
+            try:
+                item, end = self._decoder.raw_decode(window, pos)
+            except json.JSONDecodeError:
+                # The item is still incomplete.
+                break
+            if not isinstance(item, (dict, list)) and _NUMBER_TAIL.fullmatch(window, end):
+                # A number at the end of the window may still continue.
+                break
+            pos = end
+            items.append(item)
+        self._window = "" if self.done else window[pos:]
+        if len(self._window) > self.max_pending:
+            raise ValueError("JSON array item larger than " + str(self.max_pending) + " characters")
+        self.items += len(items)
+        return items
+
+    def close(self) -> None:
+        """Checks the array was complete."""
+        if not self.done:
+            raise ValueError("Truncated JSON, the " + self.key + " array is not complete")
@@ -0,0 +1,267 @@
+import abc
+import asyncio
+import bisect
+import math
+
+import CoT_Trackserver
+
+LATENCY_BUCKETS: tuple = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+SIZE_BUCKETS: tuple = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+COUNT_BUCKETS: tuple = (1, 10, 100, 1000, 10000, 100000)
+AGE_BUCKETS: tuple = (0.001, 0.01, 0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 3600.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class Registry:
+
+    """Collection of metrics rendered together in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        self.metrics: dict = {}
+
+    def register(self, metric) -> None:
+        if metric.name in self.metrics:
+            raise Exception("Metric " + metric.name + " is already registered")
+        self.metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.append("# HELP %s %s" % (metric.name, metric.documentation))
+            lines.append("# TYPE %s %s" % (metric.name, metric.type))
+            for suffix, labels, value in metric.samples():
+                if labels:
+                    lines.append("%s%s{%s} %s" % (metric.name, suffix, ",".join(
+                        '%s="%s"' % (key, _escape(label)) for key, label in labels), _format(value)))
+                else:
+                    lines.append("%s%s %s" % (metric.name, suffix, _format(value)))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric(abc.ABC):
+
+    """Metric family with one child value per combination of label values."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), registry: Registry = REGISTRY) -> None:
+        self.name: str = name
+        self.documentation: str = documentation
+        self.labelnames: tuple = tuple(labelnames)
+        self._children: dict = {}
+        if registry is not None:
+            registry.register(self)
+
+    def labels(self, *values):
+        """Returns the child of this metric for the given label values."""
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise Exception("Metric " + self.name + " takes labels " + ", ".join(self.labelnames))
+            child = self._children[values] = self._child()
+        return child
+
+    @abc.abstractmethod
+    def _child(self):
+        """Returns a new child value, Counter, Gauge and Histogram each have their own."""
+
+    def samples(self):
+        for values, child in self._children.items():
+            for suffix, extra, value in child.samples():
+                yield suffix, tuple(zip(self.labelnames, values)) + extra, value
+
+
+class _CounterValue:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def samples(self):
+        yield "", (), self.value
+
+
+class Counter(_Metric):
+
+    """Monotonically increasing count, exported with a _total suffix."""
+
+    type = "counter"
+
+    def _child(self):
+        return _CounterValue()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def samples(self):
+        for suffix, labels, value in super().samples():
+            yield "_total" + suffix, labels, value
+
+
+class _GaugeValue:
+    __slots__ = ("value", "function")
+
+    def __init__(self) -> None:
+        self.value = 0.0
+        self.function = None
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def track(self, function) -> None:
+        """Reads the value from function when the metric is rendered."""
+        self.function = function
+
+    def samples(self):
+        yield "", (), self.value if self.function is None else self.function()
+
+
+class Gauge(_Metric):
+
+    """Value that goes up and down, either set or read from a function on render."""
+
+    type = "gauge"
+
+    def _child(self):
+        return _GaugeValue()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self):
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            cumulative += count
+            yield "_bucket", (("le", _format(bound)),), cumulative
+        yield "_sum", (), self.sum
+        yield "_count", (), self.count
+
+
+class Histogram(_Metric):
+
+    """Distribution of observed values over cumulative buckets."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (),
+                 buckets: tuple = LATENCY_BUCKETS, registry: Registry = REGISTRY) -> None:
+        self.buckets: tuple = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+
+LOGINS = Counter("cot_trackserver_logins", "Trackserver logins.", ("account",))
+LOGIN_SECONDS = Histogram("cot_trackserver_login_seconds", "Trackserver login latency.", ("account",))
+POLL_FAILURES = Counter("cot_trackserver_poll_failures", "Failed GetDeviceData polls.", ("account",))
+FETCH_SECONDS = Histogram("cot_trackserver_fetch_seconds", "GetDeviceData latency.", ("account",))
+FETCH_BYTES = Histogram("cot_trackserver_fetch_bytes", "GetDeviceData payload size.", ("account",),
+                        buckets=SIZE_BUCKETS)
+DEVICES = Histogram("cot_trackserver_devices_per_poll", "Devices returned per poll.", ("account",),
+                    buckets=COUNT_BUCKETS)
+INVALID_DEVICES = Counter("cot_trackserver_invalid_devices", "Devices that could not be converted to CoT.",
+                          ("account",))
+CONVERT_SECONDS = Histogram("cot_trackserver_convert_seconds", "json_to_cot time per device.")
+SERIALIZE_SECONDS = Histogram("cot_trackserver_serialize_seconds", "CoT serialization time per event.")
+QUEUE_DEPTH = Gauge("cot_trackserver_queue_depth", "Events waiting in a queue.", ("queue",))
+WRITE_SECONDS = Histogram("cot_trackserver_write_seconds", "Transport write time per batch.", ("destination",))
+DRAIN_SECONDS = Histogram("cot_trackserver_drain_seconds", "Transport drain time per batch.", ("destination",))
+EVENTS_SENT = Counter("cot_trackserver_events_sent", "Events written to a destination.", ("destination",))
+BYTES_SENT = Counter("cot_trackserver_bytes_sent", "Bytes written to a destination.", ("destination",))
+TRACE_SECONDS = Histogram("cot_trackserver_trace_seconds", "Latency of new fixes by pipeline stage.", ("stage",),
+                          buckets=AGE_BUCKETS)
+SEND_ERRORS = Counter("cot_trackserver_send_errors", "Failed datagram sends to a destination.", ("destination",))
+EVENTS_DROPPED = Counter("cot_trackserver_events_dropped", "Events dropped unsent for exceeding the datagram MTU.",
+                         ("destination",))
+RECONNECTS = Counter("cot_trackserver_reconnects", "Reconnects to a CoT server.", ("destination",))
+
+
+def destination(writer) -> str:
+    """Label of the transport writer, host:port when it has them."""
+    host = getattr(writer, "host", None)
+    if host is None:
+        return "stream"
+    return "%s:%s" % (host, writer.port)
+
+
+class MetricsServer:
+
+    """Serves the registry in the Prometheus text format on GET /metrics."""
+
+    _logger = CoT_Trackserver.functions.get_logger(__name__)
+
+    def __init__(self, registry: Registry = None, host: str = None, port: int = None) -> None:
+        self.registry = registry or REGISTRY
+        self.host: str = host or CoT_Trackserver.constants.DEFAULT_METRICS_HOST
+        self.port: int = int(CoT_Trackserver.constants.DEFAULT_METRICS_PORT if port is None else port)
+        self.server = None
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self._logger.info("Serving metrics on http://%s:%s/metrics", self.host, self.port)
+
+    async def _handle(self, reader, writer) -> None:
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split(" ")
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?", 1)[0] == "/metrics":
+                status, body = "200 OK", self.registry.render().encode("utf-8")
+            else:
+                status, body = "404 Not Found", b"Not Found\n"
+            writer.write(("HTTP/1.1 %s\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                          "Content-Length: %d\r\nConnection: close\r\n\r\n" % (status, len(body))).encode("latin-1")
+                         + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def run(self) -> None:
+        if self.server is None:
+            await self.start()
+        await self.server.serve_forever()
+
+    def close(self) -> None:
+        if self.server is not None:
+            self.server.close()
@@ -0,0 +1,87 @@
+import asyncio
+import collections
+import itertools
+import re
+
+import CoT_Trackserver
+
+_UID = re.compile(rb'<event [^>]*?\buid="([^"]*)"')
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+
+def event_uid(item):
+    """Returns the uid of an Event or of serialized CoT bytes, None when it has none."""
+    if isinstance(item, CoT_Trackserver.Event):
+        return item.uid
+    match = _UID.search(item)
+    if match:
+        return match.group(1).decode("utf-8")
+    return None
+
+
+class CoalescingQueue(asyncio.Queue):
+
+    """
+    asyncio.Queue holding at most one pending event per uid.
+
+    A newer event for a uid that is still waiting replaces the pending one
+    in place, so devices keep their arrival order. Once maxsize events are
+    pending the overflow policy applies: drop_oldest discards the oldest
+    pending event, drop_newest discards the incoming one and block makes
+    put() wait (put_nowait() raises QueueFull).
+    """
+
+    def __init__(self, maxsize: int = None, overflow: str = None) -> None:
+        overflow = overflow or CoT_Trackserver.constants.DEFAULT_OVERFLOW
+        if overflow not in OVERFLOW_POLICIES:
+            raise Exception("Overflow policy must be one of " + ", ".join(OVERFLOW_POLICIES))
+        self.capacity: int = int(CoT_Trackserver.constants.DEFAULT_TX_QUEUE if maxsize is None else maxsize)
+        self.overflow: str = overflow
+        self.coalesced: int = 0
+        self.dropped: int = 0
+        super().__init__()
+
+    def _init(self, maxsize):
+        self._queue = collections.OrderedDict()
+        self._anonymous = itertools.count()
+
+    def _key(self, item):
+        uid = event_uid(item) if item else None
+        return next(self._anonymous) if uid is None else uid
+
+    def _put(self, item):
+        self._queue[self._key(item)] = item
+
+    def _get(self):
+        return self._queue.popitem(last=False)[1]
+
+    def full(self) -> bool:
+        return 0 < self.capacity <= len(self._queue)
+
+    def put_nowait(self, item) -> None:
+        key = self._key(item)
+        if key in self._queue:
+            self._queue[key] = item
+            self.coalesced += 1
+            return
+        if self.full():
+            if self.overflow == "block":
+                raise asyncio.QueueFull
+            self.dropped += 1
+            if self.overflow == "drop_newest":
+                return
+            self._queue.popitem(last=False)
+            self.task_done()
+        self._queue[key] = item
+        self._unfinished_tasks += 1
+        self._finished.clear()
+        self._wakeup_next(self._getters)
+
+    async def put(self, item) -> None:
+        if self.overflow != "block" or self._key(item) in self._queue:
+            return self.put_nowait(item)
+        return await super().put(item)
+
+    def stats(self) -> dict:
+        return {"pending": len(self._queue), "coalesced": self.coalesced, "dropped": self.dropped}
@@ -0,0 +1,96 @@
+import array
+import datetime as dt
+import math
+import time
+
+import CoT_Trackserver
+
+EARTH_RADIUS: float = 6371000.0
+
+
+class DeadReckoner:
+
+    """
+    Projects moving devices forward along course and speed between polls.
+
+    update() takes the events converted from a poll. Moving devices keep their
+    latest real fix as the projection base until the next real fix replaces
+    it, devices that stopped are dropped. project() extrapolates all bases at
+    once from float columns and emits "m-p" events whose ce grows by
+    ce_growth metres per metre travelled since the fix. Bases older than
+    max_age seconds are no longer projected.
+    """
+
+    def __init__(self, interval: float = None, ce_growth: float = None, max_age: float = None) -> None:
+        self.interval: float = float(interval or CoT_Trackserver.constants.DEFAULT_DR_INTERVAL)
+        self.ce_growth: float = float(CoT_Trackserver.constants.DEFAULT_DR_CE_GROWTH
+                                      if ce_growth is None else ce_growth)
+        self.max_age: float = float(max_age or CoT_Trackserver.constants.DEFAULT_DR_MAX_AGE)
+        self.stale: int = int(self.interval * CoT_Trackserver.constants.DEFAULT_STALE_CADENCES)
+        self.projected: int = 0
+        self._bases: dict = {}
+        self._dirty: bool = False
+        self._events: list = []
+        self._lat = array.array("d")
+        self._lon = array.array("d")
+        self._ce = array.array("d")
+        self._fixed = array.array("d")
+        self._vlat = array.array("d")
+        self._vlon = array.array("d")
+        self._speed = array.array("d")
+
+    def __len__(self) -> int:
+        return len(self._bases)
+
+    def __contains__(self, uid: str) -> bool:
+        base = self._bases.get(uid)
+        return base is not None and time.monotonic() - base[1] < self.max_age
+
+    def update(self, event: CoT_Trackserver.Event, moving: bool, now: float = None) -> None:
+        """Takes a real fix as the new base of a moving device, or drops a device that stopped."""
+        if moving:
+            self._bases[event.uid] = (event, time.monotonic() if now is None else now)
+        elif self._bases.pop(event.uid, None) is None:
+            return
+        self._dirty = True
+
+    def _columns(self) -> None:
+        self._dirty = False
+        events = self._events = [event for event, _fixed in self._bases.values()]
+        self._lat = array.array("d", (event.point.lat for event in events))
+        self._lon = array.array("d", (event.point.lon for event in events))
+        self._ce = array.array("d", (event.point.ce for event in events))
+        self._fixed = array.array("d", (fixed for _event, fixed in self._bases.values()))
+        self._speed = array.array("d", (event.detail.track.speed for event in events))
+        course = [math.radians(event.detail.track.course) for event in events]
+        # Degrees per second north and east, on a sphere and for short distances.
+        scale = math.degrees(1.0) / EARTH_RADIUS
+        self._vlat = array.array("d", (speed * math.cos(c) * scale for speed, c in zip(self._speed, course)))
+        self._vlon = array.array("d", (speed * math.sin(c) * scale / max(math.cos(math.radians(lat)), 0.01)
+                                       for speed, c, lat in zip(self._speed, course, self._lat)))
+
+    def project(self, now: float = None) -> list:
+        """Returns an extrapolated event for every base younger than max_age."""
+        now = time.monotonic() if now is None else now
+        if self._dirty:
+            self._columns()
+        age = [now - fixed for fixed in self._fixed]
+        lat = [min(max(lat + v * t, -90.0), 90.0) for lat, v, t in zip(self._lat, self._vlat, age)]
+        lon = [(lon + v * t + 180.0) % 360.0 - 180.0 for lon, v, t in zip(self._lon, self._vlon, age)]
+        ce = [ce + self.ce_growth * speed * t for ce, speed, t in zip(self._ce, self._speed, age)]
+        stamp = dt.datetime.now(dt.timezone.utc)
+        stale = stamp + dt.timedelta(seconds=self.stale)
+        Event = CoT_Trackserver.Event
+        out = []
+        for i, base in enumerate(self._events):
+            if age[i] >= self.max_age:
+                continue
+            event = Event(base.version, base.type, base.uid, stamp, stamp, stale, "m-p")
+            event.point = Event.Point(lat[i], lon[i], base.point.hae, ce[i], base.point.le)
+            event.detail = base.detail
+            out.append(event)
+        self.projected += len(out)
+        return out
+
+    def stats(self) -> dict:
+        return {"bases": len(self._bases), "projected": self.projected}
@@ -0,0 +1,210 @@
+import asyncio
+import struct
+import time
+
+import CoT_Trackserver
+
+# Wall clock time, kind, source and payload length of a frame.
+FRAME = struct.Struct("<dBHI")
+SOURCE: int = 0
+RESPONSE: int = 1
+RESPONSE_END: int = 2
+SENT: int = 3
+RESPONSE_ABORT: int = 4
+
+
+class Recorder:
+
+    """
+    Records GetDeviceData responses and outbound CoT to one file.
+
+    The file is a sequence of frames, each a FRAME header followed by the
+    payload. Responses are recorded chunk by chunk as they arrive and closed
+    by a RESPONSE_END frame, or a RESPONSE_ABORT frame when the download
+    failed part way, every written CoT event is a SENT frame. Frames
+    belong to a source, an account or a destination, named once in a SOURCE
+    frame, so concurrent polls of several accounts can be told apart.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self.frames: int = 0
+        self.bytes: int = 0
+        self._sources: dict = {}
+        self._file = open(path, "ab")
+
+    def source(self, name: str) -> int:
+        """Returns the source number of name, recording it on first use."""
+        number = self._sources.get(name)
+        if number is None:
+            number = self._sources[name] = len(self._sources)
+            self._write(SOURCE, number, str(name).encode("utf-8"))
+        return number
+
+    def _write(self, kind: int, source: int, data: bytes, now: float = None) -> None:
+        self._file.write(FRAME.pack(time.time() if now is None else now, kind, source, len(data)))
+        self._file.write(data)
+        self.frames += 1
+        self.bytes += FRAME.size + len(data)
+
+    def response(self, source: int, data: bytes) -> None:
+        """Records a chunk of a GetDeviceData response body."""
+        self._write(RESPONSE, source, data)
+
+    def response_end(self, source: int) -> None:
+        self._write(RESPONSE_END, source, b"")
+
+    def response_abort(self, source: int) -> None:
+        """Closes a response that stopped before it was complete."""
+        self._write(RESPONSE_ABORT, source, b"")
+
+    def sent(self, source: int, chunks: list) -> None:
+        """Records the serialized events of one write."""
+        now = time.time()
+        for data in chunks:
+            self._write(SENT, source, data, now)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def stats(self) -> dict:
+        return {"frames": self.frames, "bytes": self.bytes}
+
+
+class Replayer:
+
+    """
+    Plays a Recorder file back at speed times the recorded pace.
+
+    Response chunks are parsed as they are read and the devices handed to
+    worker.handle_message, recorded CoT events are put on queue, for example
+    the queue of an EventTransmitter. While replaying, the emit cadences of
+    the worker run on the recorded clock, so every speed emits the events
+    the recorded session did. A response that was aborted or turns out to
+    be malformed is dropped after the devices already handed over and
+    counted as truncated. The file is read frame by frame, so a recording of
+    any length is replayed in constant memory. A speed of 0 or None replays
+    as fast as possible. sources limits the replay to the named sources.
+    """
+
+    _logger = CoT_Trackserver.functions.get_logger(__name__)
+
+    def __init__(self, path: str, speed: float = 1.0, sources: tuple = None) -> None:
+        self.path: str = path
+        self.speed: float = float(speed or 0)
+        self.sources = None if sources is None else set(sources)
+        self.frames: int = 0
+        self.responses: int = 0
+        self.truncated: int = 0
+        self.devices: int = 0
+        self.events: int = 0
+        self.bytes: int = 0
+        self.recorded: float = 0.0
+        self.elapsed: float = 0.0
+        self.lag_max: float = 0.0
+        self.clock: float = 0.0
+
+    def read(self):
+        """Yields (timestamp, kind, source name, payload) of every frame."""
+        names = {}
+        with open(self.path, "rb") as file:
+            while 1:
+                header = file.read(FRAME.size)
+                if len(header) < FRAME.size:
+                    return
+                timestamp, kind, source, length = FRAME.unpack(header)
+                data = file.read(length)
+                if len(data) < length:
+                    # The last frame of a recording that was cut off.
+                    return
+                if kind == SOURCE:
+                    names[source] = data.decode("utf-8")
+                    continue
+                yield timestamp, kind, names.get(source, str(source)), data
+
+    async def run(self, worker=None, queue: asyncio.Queue = None) -> dict:
+        """Replays into worker and queue, returns stats() when the recording is done."""
+        if worker is None:
+            return await self._run(worker, queue)
+        clock = worker.device_state.clock
+        worker.device_state.clock = lambda: self.clock
+        try:
+            return await self._run(worker, queue)
+        finally:
+            worker.device_state.clock = clock
+
+    def _truncated(self, source: str, error) -> None:
+        self.truncated += 1
+        self._logger.error("Dropping the rest of a response of %s: %s", source, error)
+
+    async def _run(self, worker, queue: asyncio.Queue) -> dict:
+        parsers = {}
+        # Sources whose current response failed to parse, skipped up to its end.
+        failed = set()
+        first = None
+        started = time.monotonic()
+        for timestamp, kind, source, data in self.read():
+            if self.sources is not None and source not in self.sources:
+                continue
+            if first is None:
+                first = timestamp
+            self.clock = timestamp
+            self.recorded = timestamp - first
+            if self.speed:
+                delay = self.recorded / self.speed - (time.monotonic() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    self.lag_max = max(self.lag_max, -delay)
+            elif self.frames % 100 == 0:
+                # Lets the consumers of the queues run.
+                await asyncio.sleep(0)
+            self.frames += 1
+            self.bytes += len(data)
+            if kind == RESPONSE and worker is not None and source not in failed:
+                parser = parsers.get(source)
+                if parser is None:
+                    parser = parsers[source] = CoT_Trackserver.JSONArrayParser("Devices")
+                try:
+                    devices = parser.feed(data)
+                except ValueError as error:
+                    del parsers[source]
+                    failed.add(source)
+                    self._truncated(source, error)
+                    continue
+                if devices:
+                    self.devices += len(devices)
+                    await worker.handle_message(devices)
+            elif kind == RESPONSE_END and source in parsers:
+                try:
+                    parsers.pop(source).close()
+                except ValueError as error:
+                    self._truncated(source, error)
+                else:
+                    self.responses += 1
+            elif kind == RESPONSE_ABORT and source in parsers:
+                del parsers[source]
+                self._truncated(source, "the download was aborted")
+            if kind in (RESPONSE_END, RESPONSE_ABORT):
+                failed.discard(source)
+            elif kind == SENT and queue is not None:
+                await queue.put(data)
+                self.events += 1
+        for source in parsers:
+            self._truncated(source, "the recording ends in the response")
+        self.elapsed = time.monotonic() - started
+        self._logger.info("Replayed %(frames)s frames, %(responses)s responses with %(devices)s devices and "
+                          "%(events)s events in %(elapsed).2fs, %(speedup).1fx real time", self.stats())
+        return self.stats()
+
+    def stats(self) -> dict:
+        return {"frames": self.frames, "responses": self.responses, "truncated": self.truncated,
+                "devices": self.devices,
+                "events": self.events, "bytes": self.bytes, "recorded": self.recorded,
+                "elapsed": self.elapsed, "speedup": self.recorded / self.elapsed if self.elapsed else 0.0,
+                "lag_max": self.lag_max,
+                "devices_per_second": self.devices / self.elapsed if self.elapsed else 0.0,
+                "events_per_second": self.events / self.elapsed if self.elapsed else 0.0}
@@ -0,0 +1,112 @@
+import asyncio
+import collections
+import time
+
+import CoT_Trackserver
+
+
+class TokenBucket:
+
+    """Token bucket refilled at rate tokens per second, holding at most burst tokens."""
+
+    def __init__(self, rate: float, burst: float = None) -> None:
+        self.rate: float = float(rate)
+        self.burst: float = float(burst or max(self.rate, 1.0))
+        self.tokens: float = self.burst
+        self._updated: float = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, amount: float, now: float) -> float:
+        """Seconds to wait before amount tokens can be taken, 0 when they are available."""
+        self._refill(now)
+        # Requests larger than the bucket only wait for a full bucket and leave it in debt.
+        needed = min(amount, self.burst)
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.tokens -= amount
+
+
+class RateScheduler:
+
+    """
+    Paces outbound CoT to at most rate_events events and rate_bytes bytes per
+    second, allowing bursts of burst_events/burst_bytes. A rate of 0 means no
+    limit on that dimension.
+    """
+
+    def __init__(self, rate_events: float = None, rate_bytes: float = None,
+                 burst_events: float = None, burst_bytes: float = None, window: float = 5.0) -> None:
+        rate_events = CoT_Trackserver.constants.DEFAULT_RATE_EVENTS if rate_events is None else rate_events
+        rate_bytes = CoT_Trackserver.constants.DEFAULT_RATE_BYTES if rate_bytes is None else rate_bytes
+        self.events = TokenBucket(rate_events, burst_events) if rate_events else None
+        self.bytes = TokenBucket(rate_bytes, burst_bytes) if rate_bytes else None
+        self.window: float = window
+        self.waiting_events: int = 0
+        self.waiting_bytes: int = 0
+        self._sent = collections.deque()
+        self._sent_events: int = 0
+        self._sent_bytes: int = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def burst_events(self) -> float:
+        return self.events.burst if self.events else float("inf")
+
+    @property
+    def burst_bytes(self) -> float:
+        return self.bytes.burst if self.bytes else float("inf")
+
+    async def acquire(self, events: int = 1, nbytes: int = 0) -> None:
+        """Waits until events events of nbytes bytes in total may be sent."""
+        self.waiting_events += events
+        self.waiting_bytes += nbytes
+        try:
+            async with self._lock:
+                while 1:
+                    now = time.monotonic()
+                    delay = max(self.events.delay(events, now) if self.events else 0.0,
+                                self.bytes.delay(nbytes, now) if self.bytes else 0.0)
+                    if delay <= 0:
+                        break
+                    await asyncio.sleep(delay)
+                if self.events:
+                    self.events.take(events)
+                if self.bytes:
+                    self.bytes.take(nbytes)
+                self._sent.append((now, events, nbytes))
+                self._sent_events += events
+                self._sent_bytes += nbytes
+                self._trim(now)
+        finally:
+            self.waiting_events -= events
+            self.waiting_bytes -= nbytes
+
+    def _trim(self, now: float) -> None:
+        """Forgets the sends older than the window, so the history stays bounded under a backlog."""
+        horizon = now - self.window
+        while self._sent and self._sent[0][0] < horizon:
+            _sent, events, nbytes = self._sent.popleft()
+            self._sent_events -= events
+            self._sent_bytes -= nbytes
+
+    @property
+    def rate(self) -> tuple:
+        """Measured (events/s, bytes/s) over the last window seconds."""
+        self._trim(time.monotonic())
+        return self._sent_events / self.window, self._sent_bytes / self.window
+
+    @property
+    def backlog(self) -> tuple:
+        """(events, bytes) waiting for tokens."""
+        return self.waiting_events, self.waiting_bytes
+
+    def stats(self) -> dict:
+        events_rate, bytes_rate = self.rate
+        return {"events_per_second": events_rate, "bytes_per_second": bytes_rate,
+                "backlog_events": self.waiting_events, "backlog_bytes": self.waiting_bytes}
@@ -0,0 +1,198 @@
+import array
+import datetime as dt
+import itertools
+import re
+import xml.etree.ElementTree as ET
+
+import CoT_Trackserver
+
+XML_HEADER = '<?xml version="1.0"  encoding="UTF-8" standalone="yes"?>'
+
+_ATTRIB_SPECIAL = re.compile('[&<>"\r\n\t]')
+_CDATA_SPECIAL = re.compile('[&<>]')
+
+_EVENT = '<event version="%.1f" type="%s" uid="%s" time="%s" start="%s" stale="%s" how="%s"'
+_POINT = '<point lat="%.6f" lon="%.6f" hae="%.0f" ce="%.0f" le="%.0f" />'
+_TRACK = '<track course="%d" speed="%.1f"'
+_STATUS = '<status battery="%d"'
+# json_to_cot output for one device, see serialize_devices.
+_DEVICE = (XML_HEADER + '<event version="2.0" type="a-h-G-E-V-C" uid="%s" time="%s" start="%s" stale="%s" how="m-g">'
+           '<point lat="%.6f" lon="%.6f" hae="0" ce="10" le="10" /><detail><remarks>%s</remarks>'
+           '<track course="%d" speed="%.1f" /><uid Droid="%s" /><status battery="%d" /></detail></event>')
+
+
+def _escape_attrib(value) -> str:
+    """Escapes an attribute value exactly like xml.etree.ElementTree does."""
+    value = str(value)
+    if _ATTRIB_SPECIAL.search(value) is None:
+        return value
+    return (value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace("\"", "&quot;")
+            .replace("\r", "&#13;").replace("\n", "&#10;").replace("\t", "&#09;"))
+
+
+def _escape_cdata(value: str) -> str:
+    if _CDATA_SPECIAL.search(value) is None:
+        return value
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _optional(obj, attributes: tuple) -> str:
+    """Renders the optional attributes of obj that are set, in the given order."""
+    out = ""
+    for name, key, fmt in attributes:
+        value = getattr(obj, name)
+        if value is None:
+            continue
+        out += ' ' + key + '="' + (_escape_attrib(value) if fmt is None else format(value, fmt)) + '"'
+    return out
+
+
+_EVENT_OPTIONAL = (("access", "access", None), ("qos", "qos", None), ("opex", "opex", None))
+_REMARK_OPTIONAL = (("source", "source", None), ("time", "time", None), ("to", "to", None),
+                    ("keywords", "keywords", None), ("version", "version", None))
+_TRACK_OPTIONAL = (("slope", "slope", None), ("eCourse", "eCourse", ".2f"), ("eSpeed", "eSpeed", ".2f"),
+                   ("eSlope", "eslope", ".2f"), ("version", "version", ".2f"))
+_CONTACT_OPTIONAL = (("freq", "freq", ".2f"), ("email", "email", None), ("dsn", "dsn", None),
+                     ("phone", "phone", None), ("modulation", "modulation", None),
+                     ("hostname", "hostname", None), ("version", "version", ".2f"))
+
+
+def _remark(remark) -> str:
+    text = remark.text
+    if text:
+        return '<remarks' + _optional(remark, _REMARK_OPTIONAL) + '>' + _escape_cdata(text) + '</remarks>'
+    return '<remarks' + _optional(remark, _REMARK_OPTIONAL) + ' />'
+
+
+def _track(track) -> str:
+    return _TRACK % (track.course, track.speed) + _optional(track, _TRACK_OPTIONAL) + ' />'
+
+
+def _uid(uid) -> str:
+    out = '<uid'
+    if uid.version is not None:
+        out += ' version="%.1f"' % uid.version
+    if uid.attributes is not None:
+        for key, value in uid.attributes.items():
+            out += ' ' + key + '="' + _escape_attrib(value) + '"'
+    return out + ' />'
+
+
+def _status(status) -> str:
+    if status.readiness is None:
+        return _STATUS % status.battery + ' />'
+    return _STATUS % status.battery + ' readiness="' + str(status.readiness) + '" />'
+
+
+def _contact(contact) -> str:
+    return '<contact callsign="' + _escape_attrib(contact.callsign) + '"' + _optional(contact, _CONTACT_OPTIONAL) + ' />'
+
+
+def _flow_tags(flow_tags) -> str:
+    return ET.tostring(flow_tags.generate_cot(), encoding="unicode")
+
+
+def _detail(detail) -> str:
+    Detail = CoT_Trackserver.Event.Detail
+    out = ""
+    for child, cls, render in ((detail.remark, Detail.Remark, _remark),
+                               (detail.track, Detail.Track, _track),
+                               (detail.flow_tags, Detail.Flow_Tags, _flow_tags),
+                               (detail.uid, Detail.Uid, _uid),
+                               (detail.status, Detail.Status, _status),
+                               (detail.contact, Detail.Contact, _contact)):
+        if isinstance(child, cls):
+            try:
+                out += render(child)
+            except AttributeError:
+                pass
+    if out:
+        return '<detail>' + out + '</detail>'
+    return '<detail />'
+
+
+def serialize_etree(event: CoT_Trackserver.Event) -> bytes:
+    """Serializes event through xml.etree.ElementTree, see Event.generate_cot."""
+    return event.generate_cot()
+
+
+def serialize_template(event: CoT_Trackserver.Event) -> bytes:
+    """Serializes event from string templates, byte for byte identical to Event.generate_cot."""
+    out = _EVENT % (event.version, _escape_attrib(event.type), _escape_attrib(event.uid),
+                    _escape_attrib(event.time), _escape_attrib(event.start), _escape_attrib(event.stale),
+                    _escape_attrib(event.how))
+    out += _optional(event, _EVENT_OPTIONAL)
+    body = ""
+    point = event.point
+    if point is not None:
+        body += _POINT % (point.lat, point.lon, point.hae, point.ce, point.le)
+    detail = event.detail
+    if detail is not None:
+        body += _detail(detail)
+    if body:
+        out += '>' + body + '</event>'
+    else:
+        out += ' />'
+    return (XML_HEADER + out).encode('utf-8')
+
+
+def serialize_devices(devices: list, stale: int, views: bool = False, now: dt.datetime = None):
+    """
+    Serializes a GetDeviceData Devices list in one pass, byte for byte what
+    serialize_template(json_to_cot(device, stale)) gives for every device.
+
+    Fields are converted column by column and the timestamps are formatted
+    once for the whole batch, at now or the current time. Returns one
+    contiguous bytes buffer, or with views=True a memoryview into that buffer
+    per device.
+
+    Unlike the TrackerReceiverWorker it has no fix_time, every event is
+    stamped at now, and all devices share one stale, so callers wanting the
+    cadence based stale of DeviceStateTable.stale batch moving and
+    stationary devices apart. tests/test_batch.py keeps it equal to
+    json_to_cot.
+    """
+    stamp = now or dt.datetime.now(dt.timezone.utc)
+    time = itertools.repeat(stamp.strftime(CoT_Trackserver.defcot.DATETIME_FMT))
+    stale_time = itertools.repeat((stamp + dt.timedelta(seconds=stale)).strftime(CoT_Trackserver.defcot.DATETIME_FMT))
+    lat = array.array("d", [float(device["Lat"]) for device in devices])
+    lon = array.array("d", [float(device["Lon"]) for device in devices])
+    # 9999999.0 is the unknown position json_to_cot accepts too.
+    if lat and (min(lat) < -90 or max(lat) > 90) and any(not -90 <= v <= 90 and v != 9999999.0 for v in lat):
+        raise Exception("Latitude based on WGS-84 ellipsoid in signed degree-decimal format (e.g. -33.350000). Range -90 -> +90.")
+    if lon and (min(lon) < -180 or max(lon) > 180) and any(not -180 <= v <= 180 and v != 9999999.0 for v in lon):
+        raise Exception("Longitude based on WGS-84 ellipsoid in signed degree-decimal format (e.g. 44.383333). Range -180 -> +180.")
+    course = array.array("q", [int(device["Heading"]) for device in devices])
+    speed = array.array("d", [float(device["SpeedKPH"]) * 0.2777778 for device in devices])
+    battery = array.array("q", [int(device["BatteryLevel"]) for device in devices])
+    names = [_escape_attrib(device["Name"]) for device in devices]
+    remarks = [_escape_cdata(("Device Moving: true" if CoT_Trackserver.functions.is_moving(device) else
+                              "Device Moving: false") + " Last Comm: " + str(device["LastCommTime"]) +
+                             " Last GPS Fix: " + str(device["LastGPSFix"])) for device in devices]
+    chunks = [(_DEVICE % row).encode("utf-8") for row in zip(
+        names, time, time, stale_time, lat, lon, remarks, course, speed, names, battery)]
+    buffer = b"".join(chunks)
+    if not views:
+        return buffer
+    view = memoryview(buffer)
+    out = []
+    offset = 0
+    for chunk in chunks:
+        out.append(view[offset:offset + len(chunk)])
+        offset += len(chunk)
+    return out
+
+
+SERIALIZERS: dict = {
+    "etree": serialize_etree,
+    "template": serialize_template,
+}
+
+
+def get_serializer(name: str = None):
+    """Returns the serializer function registered under name."""
+    name = name or CoT_Trackserver.constants.DEFAULT_SERIALIZER
+    try:
+        return SERIALIZERS[name]
+    except KeyError:
+        raise Exception("Unknown serializer " + str(name) + ", choose one of " + ", ".join(SERIALIZERS))
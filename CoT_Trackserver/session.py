@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+import CoT_Trackserver
+
+
+class Session:
+
+    """
+    Caches the Trackserver SessionID/AccountID pair across polls.
+
+    A new login is only done when no session exists yet, the TTL expired or a
+    request failed with the current session. Concurrent failures share a
+    single login.
+    """
+
+    _logger = CoT_Trackserver.functions.get_logger(__name__)
+
+    def __init__(self, http_client: CoT_Trackserver.HTTPClient = None, ttl: int = None,
+                 account_ref: str = None, account_pass: str = None, api_url: str = None) -> None:
+        self.http_client = http_client or CoT_Trackserver.HTTPClient()
+        self.account_ref: str = CoT_Trackserver.constants.accountRef if account_ref is None else account_ref
+        self.account_pass: str = CoT_Trackserver.constants.accountPass if account_pass is None else account_pass
+        self.api_url: str = api_url or CoT_Trackserver.constants.DEFAULT_API_URL
+        self.ttl: int = int(ttl or CoT_Trackserver.constants.DEFAULT_SESSION_TTL)
+        self.sessionID = ""
+        self.accountID = ""
+        self.logins: int = 0
+        self.logins_avoided: int = 0
+        self._expires: float = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def valid(self) -> bool:
+        return bool(self.sessionID) and time.monotonic() < self._expires
+
+    async def _login(self) -> tuple:
+        self._logger.debug("Logging in to %s", self.account_ref)
+        started = time.monotonic()
+        self.sessionID, self.accountID = await CoT_Trackserver.functions.login(
+            self.http_client, self.account_ref, self.account_pass, self.api_url)
+        CoT_Trackserver.metrics.LOGIN_SECONDS.labels(self.account_ref).observe(time.monotonic() - started)
+        CoT_Trackserver.metrics.LOGINS.labels(self.account_ref).inc()
+        self._expires = time.monotonic() + self.ttl
+        self.logins += 1
+        self._logger.debug("Retreived sessinID=" + str(self.sessionID) + " and accountID=" + str(self.accountID))
+        return self.sessionID, self.accountID
+
+    async def get(self) -> tuple:
+        """Returns the cached session, logging in when it is missing or expired."""
+        if self.valid:
+            self.logins_avoided += 1
+            return self.sessionID, self.accountID
+        async with self._lock:
+            if self.valid:
+                self.logins_avoided += 1
+                return self.sessionID, self.accountID
+            return await self._login()
+
+    async def renew(self, failed_session_id: str) -> tuple:
+        """Logs in again after failed_session_id got rejected, unless another request already did."""
+        async with self._lock:
+            if self.sessionID != failed_session_id and self.valid:
+                self.logins_avoided += 1
+                return self.sessionID, self.accountID
+            return await self._login()
+
+    def stats(self) -> dict:
+        return {"logins": self.logins, "logins_avoided": self.logins_avoided}
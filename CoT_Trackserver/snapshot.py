@@ -0,0 +1,127 @@
+import mmap
+import os
+import struct
+
+import CoT_Trackserver
+
+MAGIC: bytes = b"CoTSnap1"
+NAME_BYTES: int = 64
+# Magic, record size and records in use.
+HEADER = struct.Struct("<8sII")
+# Name, LastGPSFix, LastCommTime, Lat, Lon, Heading, SpeedKPH, BatteryLevel, moving, emitted, expires.
+RECORD = struct.Struct("<%ds32s32sdddddBdd" % NAME_BYTES)
+# The emitted and expires fields at the end of a record.
+TIMES = struct.Struct("<dd")
+
+
+class DeviceSnapshot:
+
+    """
+    Last known state of every device in a file of fixed size records.
+
+    The file is memory mapped and every save() overwrites the record of the
+    device in place, so the snapshot is current up to the last conversion
+    even when the process is killed. emitted and expires are the wall clock
+    times the event was last sent and goes stale. load() returns what is
+    needed to send the still valid events again on start and to seed the
+    DeviceStateTable. Names longer than NAME_BYTES are not kept, nor are
+    devices with a position that is not a number.
+    """
+
+    _logger = CoT_Trackserver.functions.get_logger(__name__)
+
+    def __init__(self, path: str, capacity: int = None) -> None:
+        self.path: str = path
+        self.capacity: int = int(capacity or CoT_Trackserver.constants.DEFAULT_SNAPSHOT_CAPACITY)
+        self.count: int = 0
+        self.skipped: int = 0
+        self._slots: dict = {}
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        size = os.fstat(self._fd).st_size
+        if size >= HEADER.size:
+            header = os.pread(self._fd, HEADER.size, 0)
+            magic, record_size, count = HEADER.unpack(header)
+            if magic == MAGIC and record_size == RECORD.size and size >= HEADER.size + count * RECORD.size:
+                self.count = count
+                self.capacity = max(self.capacity, (size - HEADER.size) // RECORD.size)
+            else:
+                self._logger.warning("Ignoring invalid device snapshot %s", path)
+        self._map = self._mmap()
+        HEADER.pack_into(self._map, 0, MAGIC, RECORD.size, self.count)
+        for slot in range(self.count):
+            name = RECORD.unpack_from(self._map, HEADER.size + slot * RECORD.size)[0]
+            self._slots[name.rstrip(b"\0").decode("utf-8")] = slot
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _mmap(self) -> mmap.mmap:
+        size = HEADER.size + self.capacity * RECORD.size
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        return mmap.mmap(self._fd, size)
+
+    def _grow(self) -> None:
+        self._map.close()
+        self.capacity *= 2
+        self._map = self._mmap()
+
+    def save(self, device: dict, emitted: float, expires: float) -> None:
+        """Writes the state of device, sent at emitted and valid until expires."""
+        name = str(device["Name"])
+        try:
+            position = (float(device["Lat"]), float(device["Lon"]), float(device["Heading"]),
+                        float(device["SpeedKPH"]), float(device["BatteryLevel"]))
+        except (KeyError, TypeError, ValueError):
+            self.skipped += 1
+            self._logger.debug("Not saving %s, invalid position", name)
+            return
+        encoded = name.encode("utf-8")
+        slot = self._slots.get(name)
+        if slot is None:
+            if len(encoded) > NAME_BYTES:
+                self.skipped += 1
+                return
+            slot = self.count
+            if slot >= self.capacity:
+                self._grow()
+        RECORD.pack_into(self._map, HEADER.size + slot * RECORD.size, encoded,
+                         str(device["LastGPSFix"]).encode("utf-8"), str(device["LastCommTime"]).encode("utf-8"),
+                         *position, CoT_Trackserver.functions.is_moving(device), emitted, expires)
+        if slot == self.count:
+            # The record is complete before the header counts it.
+            self._slots[name] = slot
+            self.count += 1
+            HEADER.pack_into(self._map, 0, MAGIC, RECORD.size, self.count)
+
+    def touch(self, name: str, emitted: float, expires: float) -> None:
+        """Updates the send and stale times of a saved device whose event was re-sent."""
+        slot = self._slots.get(str(name))
+        if slot is not None:
+            TIMES.pack_into(self._map, HEADER.size + (slot + 1) * RECORD.size - TIMES.size, emitted, expires)
+
+    def load(self) -> list:
+        """Returns (device, emitted, expires) of every saved device, device as GetDeviceData reports it."""
+        out = []
+        for slot in range(self.count):
+            (name, fix, comm, lat, lon, heading, speed, battery, moving, emitted,
+             expires) = RECORD.unpack_from(self._map, HEADER.size + slot * RECORD.size)
+            device = {"Name": name.rstrip(b"\0").decode("utf-8"), "Lat": lat, "Lon": lon, "Heading": heading,
+                      "SpeedKPH": speed, "BatteryLevel": battery, "MotionStatus": moving,
+                      "LastCommTime": comm.rstrip(b"\0").decode("utf-8"),
+                      "LastGPSFix": fix.rstrip(b"\0").decode("utf-8")}
+            out.append((device, emitted, expires))
+        return out
+
+    def flush(self) -> None:
+        self._map.flush()
+
+    def close(self) -> None:
+        if self._map.closed:
+            return
+        self._map.flush()
+        self._map.close()
+        os.close(self._fd)
+
+    def stats(self) -> dict:
+        return {"devices": self.count, "skipped": self.skipped, "bytes": HEADER.size + self.count * RECORD.size}
@@ -0,0 +1,121 @@
+import datetime as dt
+import time
+
+import CoT_Trackserver
+
+
+class DeviceState:
+    __slots__ = ("last_fix", "last_comm", "event", "emitted", "moving")
+
+    def __init__(self, last_fix, last_comm, event, emitted: float, moving: bool) -> None:
+        self.last_fix = last_fix
+        self.last_comm = last_comm
+        self.event = event
+        self.emitted = emitted
+        self.moving = moving
+
+
+class DeviceStateTable:
+
+    """
+    Remembers the last reported fix of every device, keyed by device Name.
+
+    Moving devices are emitted every moving_interval seconds and stationary
+    ones every stationary_interval seconds as a keepalive. Devices with a new
+    LastGPSFix or LastCommTime get a full conversion once they are due,
+    unchanged devices are re-stamped from their last event. Events stay valid
+    for stale_cadences emission intervals, never longer than cot_stale. With
+    fix_time re-stamping keeps the event time at the fix and only moves stale.
+    Cadences are measured on clock, time.monotonic unless a replay runs them
+    on recorded time.
+    """
+
+    def __init__(self, cot_stale: int, refresh_margin: int = None,
+                 moving_interval: float = None, stationary_interval: float = None,
+                 stale_cadences: float = None, fix_time: bool = False) -> None:
+        self.cot_stale: int = int(cot_stale)
+        self.refresh_margin: int = int(CoT_Trackserver.constants.DEFAULT_REFRESH_MARGIN
+                                       if refresh_margin is None else refresh_margin)
+        self.moving_interval: float = float(moving_interval or
+                                            CoT_Trackserver.constants.DEFAULT_MOVING_INTERVAL)
+        self.stationary_interval: float = float(stationary_interval or
+                                                CoT_Trackserver.constants.DEFAULT_STATIONARY_INTERVAL)
+        self.stale_cadences: float = float(stale_cadences or
+                                           CoT_Trackserver.constants.DEFAULT_STALE_CADENCES)
+        self.fix_time: bool = fix_time
+        self.clock = time.monotonic
+        self.devices: dict = {}
+        self.changed_count: int = 0
+        self.refreshed_count: int = 0
+        self.skipped_count: int = 0
+        self.restored_count: int = 0
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def cadence(self, moving: bool) -> float:
+        return self.moving_interval if moving else self.stationary_interval
+
+    def stale(self, moving: bool, horizon: float = 0) -> int:
+        """Stale seconds for an event emitted every cadence, or every horizon when polls are slower."""
+        return int(min(max(self.cadence(moving), horizon) * self.stale_cadences, self.cot_stale))
+
+    def changed(self, device: dict) -> bool:
+        state = self.devices.get(device["Name"])
+        return (state is None or state.last_fix != device["LastGPSFix"] or state.last_comm != device["LastCommTime"]
+                or state.moving != CoT_Trackserver.functions.is_moving(device))
+
+    def _due(self, state: DeviceState, horizon: float, now: float) -> bool:
+        return now + horizon + self.refresh_margin >= state.emitted + self.cadence(state.moving)
+
+    def due(self, device: dict, horizon: float = 0, now: float = None) -> bool:
+        """
+        Returns whether device should be emitted before the next poll in
+        horizon seconds. New devices and devices that started or stopped
+        moving are always due.
+        """
+        state = self.devices.get(device["Name"])
+        if state is None or state.moving != CoT_Trackserver.functions.is_moving(device):
+            return True
+        if self._due(state, horizon, self.clock() if now is None else now):
+            return True
+        self.skipped_count += 1
+        return False
+
+    def store(self, device: dict, event: CoT_Trackserver.Event, now: float = None) -> None:
+        """Records event as the latest emitted state of device."""
+        self.devices[device["Name"]] = DeviceState(device["LastGPSFix"], device["LastCommTime"], event,
+                                                   self.clock() if now is None else now,
+                                                   CoT_Trackserver.functions.is_moving(device))
+        self.changed_count += 1
+
+    def restore(self, device: dict, event: CoT_Trackserver.Event, emitted: float) -> None:
+        """Records event of device as emitted at the monotonic time emitted, as on a warm start."""
+        self.devices[device["Name"]] = DeviceState(device["LastGPSFix"], device["LastCommTime"], event, emitted,
+                                                   CoT_Trackserver.functions.is_moving(device))
+        self.restored_count += 1
+
+    def refresh(self, name: str, horizon: float = 0, now: float = None):
+        """
+        Returns the last event of name re-stamped with a new stale time when it
+        is due within horizon seconds, None otherwise.
+        """
+        state = self.devices[name]
+        now = self.clock() if now is None else now
+        if not self._due(state, horizon, now):
+            self.skipped_count += 1
+            return None
+        stamp = dt.datetime.now(dt.timezone.utc)
+        event = state.event
+        if not self.fix_time:
+            event.time = stamp
+            event.start = stamp
+        event.stale = stamp + dt.timedelta(seconds=self.stale(state.moving, horizon))
+        state.emitted = now
+        self.refreshed_count += 1
+        return event
+
+    def stats(self) -> dict:
+        return {"devices": len(self.devices), "moving": sum(state.moving for state in self.devices.values()),
+                "changed": self.changed_count, "refreshed": self.refreshed_count, "skipped": self.skipped_count,
+                "restored": self.restored_count}
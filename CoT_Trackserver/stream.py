@@ -0,0 +1,103 @@
+import xml.etree.ElementTree as ET
+
+import CoT_Trackserver
+
+_ROOT = b"<cot-stream>"
+_STARTS = (b"<?xml", b"<event")
+
+
+class CoTStreamParser:
+
+    """
+    Splits a byte stream of concatenated CoT documents into Event objects.
+
+    Data is fed to an incremental XMLPullParser under a synthetic root, each
+    <event> is converted with Event.from_xml and dropped from the tree as soon
+    as it is complete, so only the event being received is kept in memory.
+    """
+
+    _logger = CoT_Trackserver.functions.get_logger(__name__)
+
+    def __init__(self, max_pending: int = None) -> None:
+        self.max_pending: int = int(max_pending or CoT_Trackserver.constants.DEFAULT_RX_MAX_PENDING)
+        self.events: int = 0
+        self.errors: int = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Starts over on a new stream, keeping the counters."""
+        self._resync = False
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._parser.feed(_ROOT)
+        self._root = None
+        self._depth = 0
+        self._tail = b""
+
+    def _feed(self, data: bytes) -> None:
+        if data:
+            self._parser.feed(data)
+
+    def _strip_declarations(self, data: bytes) -> None:
+        """Feeds data without the <?xml ...?> declarations, which may not appear inside the root."""
+        pos = 0
+        while 1:
+            start = data.find(b"<?", pos)
+            if start < 0:
+                if data.endswith(b"<"):
+                    self._feed(data[pos:-1])
+                    self._tail = b"<"
+                else:
+                    self._feed(data[pos:])
+                return
+            self._feed(data[pos:start])
+            end = data.find(b"?>", start)
+            if end < 0:
+                self._tail = data[start:]
+                return
+            pos = end + 2
+
+    def _skip_to_document(self, data: bytes) -> bytes:
+        """After a parse error, drops data up to the start of the next document."""
+        starts = [index for index in (data.find(start) for start in _STARTS) if index >= 0]
+        if not starts:
+            self._tail = data[-len(_STARTS[-1]):]
+            return b""
+        self._resync = False
+        return data[min(starts):]
+
+    def feed(self, data: bytes) -> list:
+        """Feeds the next chunk of the stream, returns the events it completed."""
+        data = self._tail + data
+        self._tail = b""
+        events = []
+        if self._resync:
+            data = self._skip_to_document(data)
+            if not data:
+                return events
+        try:
+            self._strip_declarations(data)
+            if len(self._tail) > self.max_pending:
+                raise ET.ParseError("unterminated processing instruction")
+            for kind, element in self._parser.read_events():
+                if kind == "start":
+                    if self._root is None:
+                        self._root = element
+                    self._depth += 1
+                    continue
+                self._depth -= 1
+                if self._depth != 1:
+                    continue
+                if element.tag == "event":
+                    try:
+                        events.append(CoT_Trackserver.Event.from_xml(element))
+                    except Exception as error:
+                        self.errors += 1
+                        self._logger.debug("Skipping undecodable event: %s", error)
+                self._root.remove(element)
+        except ET.ParseError as error:
+            self.errors += 1
+            self._logger.debug("Resetting CoT stream parser: %s", error)
+            self.reset()
+            self._resync = True
+        self.events += len(events)
+        return events
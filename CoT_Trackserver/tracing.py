@@ -0,0 +1,81 @@
+import collections
+import heapq
+import operator
+import time
+
+import CoT_Trackserver
+
+STAGES: tuple = ("fix_to_fetch", "fetch_to_convert", "convert_to_enqueue", "enqueue_to_write", "fix_to_write")
+
+
+class Trace:
+    __slots__ = ("fix", "fetched", "converted", "enqueued")
+
+    def __init__(self, fix: float, fetched: float, converted: float) -> None:
+        self.fix = fix
+        self.fetched = fetched
+        self.converted = converted
+        self.enqueued = converted
+
+
+class LatencyTracer:
+
+    """
+    Follows each new fix from the GPS fix time to the socket write.
+
+    The poller starts a Trace per converted fix, keyed by uid, and the
+    transmitter completes it when the event is written. A trace replaced
+    before it is written belongs to a fix that was coalesced away. With
+    several destinations the first write completes the trace. All times are
+    wall clock seconds, stage durations go to the trace_seconds histogram and
+    the last samples_per_stage of them are kept for percentiles.
+    """
+
+    def __init__(self, samples_per_stage: int = None) -> None:
+        samples = int(samples_per_stage or CoT_Trackserver.constants.DEFAULT_TRACE_SAMPLES)
+        self.pending: dict = {}
+        self.latency: dict = {}
+        self.traced: int = 0
+        self._samples = {stage: collections.deque(maxlen=samples) for stage in STAGES}
+        self._histograms = {stage: CoT_Trackserver.metrics.TRACE_SECONDS.labels(stage) for stage in STAGES}
+
+    def start(self, uid: str, fix: float, fetched: float, converted: float) -> Trace:
+        trace = self.pending[uid] = Trace(fix, fetched, converted)
+        return trace
+
+    def _observe(self, stage: str, seconds: float) -> None:
+        self._samples[stage].append(seconds)
+        self._histograms[stage].observe(seconds)
+
+    def written(self, chunks: list, now: float = None) -> None:
+        """Completes the traces of the serialized events in chunks."""
+        if not self.pending:
+            return
+        now = time.time() if now is None else now
+        for data in chunks:
+            uid = CoT_Trackserver.queues.event_uid(data)
+            trace = self.pending.pop(uid, None)
+            if trace is None:
+                continue
+            self._observe("fix_to_fetch", trace.fetched - trace.fix)
+            self._observe("fetch_to_convert", trace.converted - trace.fetched)
+            self._observe("convert_to_enqueue", trace.enqueued - trace.converted)
+            self._observe("enqueue_to_write", now - trace.enqueued)
+            self._observe("fix_to_write", now - trace.fix)
+            self.latency[uid] = now - trace.fix
+            self.traced += 1
+
+    def summary(self) -> dict:
+        """p50/p90/p99/max seconds of every stage over the kept samples."""
+        out = {}
+        for stage, samples in self._samples.items():
+            values = sorted(samples)
+            if not values:
+                continue
+            out[stage] = {"p50": values[len(values) // 2], "p90": values[int(len(values) * 0.9)],
+                          "p99": values[min(int(len(values) * 0.99), len(values) - 1)], "max": values[-1]}
+        return out
+
+    def slowest(self, n: int = 10) -> list:
+        """(uid, seconds) of the n devices whose last fix took longest to reach the wire."""
+        return heapq.nlargest(n, self.latency.items(), key=operator.itemgetter(1))
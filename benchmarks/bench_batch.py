@@ -0,0 +1,35 @@
+"""
+Compares per-device conversion with the batch API.
+
+The per-device path is json_to_cot followed by the template serializer for
+every device, the batch path one serialize_devices call over the Devices
+list. tests/test_batch.py checks that both give the same bytes.
+
+    python -m benchmarks.bench_batch [devices ...]
+"""
+import sys
+import timeit
+
+import CoT_Trackserver
+from benchmarks import synthetic
+
+STALE = 60
+
+
+def per_device(devices: list) -> list:
+    serialize = CoT_Trackserver.SERIALIZERS["template"]
+    return [serialize(CoT_Trackserver.json_to_cot(device, STALE)) for device in devices]
+
+
+def main(*sizes: int) -> None:
+    for n in sizes or (1000, 10000, 100000):
+        devices = synthetic.make_devices(n)
+        repeat = 3 if n <= 10000 else 1
+        loop = min(timeit.repeat(lambda: per_device(devices), number=1, repeat=repeat))
+        batch = min(timeit.repeat(lambda: CoT_Trackserver.serialize_devices(devices, STALE), number=1, repeat=repeat))
+        print("%7d devices  per-device %7.3f s %9.0f/s  batch %7.3f s %9.0f/s  %5.2fx"
+              % (n, loop, n / loop, batch, n / batch, loop / batch))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
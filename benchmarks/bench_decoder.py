@@ -0,0 +1,30 @@
+"""
+Throughput of Event.from_bytes against Event.from_xml.
+
+Decodes a large batch of json_to_cot events with both. The round trip
+of from_bytes is tested in tests/test_decoder.py.
+
+    python -m benchmarks.bench_decoder [events] [seed]
+"""
+import sys
+import time
+
+import CoT_Trackserver
+from benchmarks import synthetic
+
+Event = CoT_Trackserver.Event
+
+
+def main(n: int = 100000, seed: int = 1) -> None:
+    serialize = CoT_Trackserver.get_serializer()
+    batch = [serialize(event) for event in synthetic.make_events(n, seed)]
+    for name, decode in (("from_bytes", Event.from_bytes), ("from_xml", Event.from_xml)):
+        started = time.perf_counter()
+        for data in batch:
+            decode(data)
+        elapsed = time.perf_counter() - started
+        print("%-11s %d events  %.0f events/s" % (name, len(batch), len(batch) / elapsed))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
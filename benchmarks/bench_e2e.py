@@ -0,0 +1,69 @@
+"""
+End-to-end load benchmark of the CoT_tracker.main pipeline.
+
+Starts the mock Trackserver and a CoT sink in this process, runs
+CoT_tracker.main against them in a child process for the given number of
+seconds, then reports delivered events/sec, p50/p99 fix-to-socket latency
+(from the first response carrying a fix to its arrival at the sink), and the
+CPU time and peak RSS of the tracker process.
+
+    python -m benchmarks.bench_e2e [devices] [seconds] [poll_interval]
+"""
+import asyncio
+import os
+import resource
+import signal
+import sys
+
+from benchmarks.cot_sink import CoTSink
+from benchmarks.mock_trackserver import MockTrackserver
+
+TRACKER = """
+import asyncio
+from CoT_Trackserver import CoT_tracker
+asyncio.run(CoT_tracker.main(rate_events=0, destinations=[("127.0.0.1", {port})], api_url={api_url!r},
+                             poll_interval={poll_interval}))
+"""
+
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+async def run(devices: int = 1000, seconds: float = 30, poll_interval: int = 10, latency: float = 0.05) -> dict:
+    server = MockTrackserver(devices, latency=latency)
+    sink = CoTSink()
+    await server.start()
+    await sink.start()
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    tracker = await asyncio.create_subprocess_exec(
+        sys.executable, "-c", TRACKER.format(port=sink.port, api_url=server.api_url, poll_interval=poll_interval),
+        env=env, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL)
+    await asyncio.sleep(seconds)
+    tracker.send_signal(signal.SIGTERM)
+    await tracker.wait()
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    server.close()
+    sink.close()
+    latencies = [arrived - server.served[key] for key, arrived in sink.arrivals.items() if key in server.served]
+    cpu = usage.ru_utime + usage.ru_stime
+    return {"devices": devices, "seconds": seconds, "events": sink.events,
+            "events_per_second": sink.events / seconds, "fixes": len(latencies),
+            "latency_p50": percentile(latencies, 0.50), "latency_p99": percentile(latencies, 0.99),
+            "cpu_seconds": cpu, "cpu_percent": 100.0 * cpu / seconds, "max_rss_mb": usage.ru_maxrss / 1024.0,
+            "api": server.stats()}
+
+
+def main(devices: int = 1000, seconds: float = 30, poll_interval: int = 10) -> None:
+    result = asyncio.run(run(int(devices), float(seconds), int(poll_interval)))
+    print("%(devices)d devices for %(seconds).0fs: %(events)d events, %(events_per_second).0f events/s" % result)
+    print("fix-to-socket latency over %(fixes)d fixes: p50 %(latency_p50).3fs  p99 %(latency_p99).3fs" % result)
+    print("tracker CPU %(cpu_seconds).2fs (%(cpu_percent).1f%%), max RSS %(max_rss_mb).1f MB" % result)
+    print("API %s" % result["api"])
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,90 @@
+"""
+Ingest and query benchmark of the TrackHistory store.
+
+Appends polls of a synthetic fleet in which every device reports a new fix,
+then times track() of one device over a time range and at() of the whole
+fleet at one time, and checks both against a scan of all records. Segments
+are kept small so that queries span several sealed segments and the active
+one.
+
+    python -m benchmarks.bench_history [devices] [polls] [segment_records]
+"""
+import sys
+import tempfile
+import time
+
+import CoT_Trackserver
+from benchmarks import synthetic
+
+START = 1617876000.0
+INTERVAL = 10.0
+
+
+def ingest(history: CoT_Trackserver.TrackHistory, devices: list, polls: int) -> float:
+    """Appends polls fixes of every device, INTERVAL seconds apart, returns the seconds taken."""
+    took = 0.0
+    for poll in range(polls):
+        timestamp = START + poll * INTERVAL
+        started = time.perf_counter()
+        for device in devices:
+            history.append(device["Name"], timestamp, device["Lat"], device["Lon"], device["SpeedKPH"] / 3.6,
+                           device["Heading"], device["BatteryLevel"])
+        history.flush()
+        took += time.perf_counter() - started
+    return took
+
+
+def scan(history: CoT_Trackserver.TrackHistory) -> list:
+    """Every record of the history, read without the index."""
+    history.flush()
+    out = []
+    for segment in history.segments:
+        out.extend(history._position(segment.read(record)) for record in range(segment.count))
+    return out
+
+
+def main(devices: int = 5000, polls: int = 100, segment_records: int = 100000) -> None:
+    fleet = synthetic.make_devices(devices)
+    with tempfile.TemporaryDirectory() as directory:
+        history = CoT_Trackserver.TrackHistory(directory, segment_records)
+        took = ingest(history, fleet, polls)
+        records = devices * polls
+        print("ingest %d records in %.3fs, %.0f records/s, %.1f us per fix, %s"
+              % (records, took, records / took, took / records * 1e6, history.stats()))
+
+        name = fleet[devices // 2]["Name"]
+        start, end = START + polls * INTERVAL * 0.25, START + polls * INTERVAL * 0.75
+        when = START + polls * INTERVAL * 0.5 + INTERVAL / 2
+
+        started = time.perf_counter()
+        track = history.track(name, start, end)
+        track_took = time.perf_counter() - started
+        started = time.perf_counter()
+        fleet_at = history.at(when, INTERVAL * 2)
+        at_took = time.perf_counter() - started
+
+        started = time.perf_counter()
+        everything = scan(history)
+        scan_took = time.perf_counter() - started
+        expected_track = [p for p in everything if p.name == name and start <= p.time <= end]
+        expected_at = {}
+        for position in everything:
+            if when - INTERVAL * 2 <= position.time <= when:
+                if position.name not in expected_at or expected_at[position.name].time < position.time:
+                    expected_at[position.name] = position
+        if track != expected_track or fleet_at != expected_at:
+            raise AssertionError("indexed queries differ from the full scan")
+        print("track: %d positions in %.3f ms   at: %d devices in %.1f ms   full scan %.1f ms"
+              % (len(track), track_took * 1e3, len(fleet_at), at_took * 1e3, scan_took * 1e3))
+        history.close()
+
+        started = time.perf_counter()
+        reopened = CoT_Trackserver.TrackHistory(directory, segment_records)
+        print("reopen %.3fs, %s" % (time.perf_counter() - started, reopened.stats()))
+        if reopened.track(name, start, end) != track:
+            raise AssertionError("reopened history differs")
+        reopened.close()
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
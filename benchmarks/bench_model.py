@@ -0,0 +1,124 @@
+"""
+Micro-benchmarks of the CoT model and serializers, with a regression gate.
+
+Times Event construction (json_to_cot, hello_event), generate_cot of every
+sub-element, full-event serialization with each engine and bulk conversion
+of a synthetic device list. Results are compared with the baseline file and
+the run fails when a case got slower than the baseline by more than the
+threshold. Cases are compared by their cost relative to a calibration
+workload timed alongside, which evens out load on the host, but a new
+baseline should still be recorded with --save when changing machines.
+
+    python -m benchmarks.bench_model [--save] [--threshold 0.25] [--baseline FILE]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import timeit
+
+import CoT_Trackserver
+from benchmarks import synthetic
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+THRESHOLD = 0.25
+BULK = 1000
+
+
+def calibration() -> str:
+    """Fixed pure Python workload, timings are compared relative to it."""
+    parts = {}
+    for i in range(200):
+        parts["k%d" % i] = "%.6f" % (i * 0.5)
+    return ",".join(parts.values())
+
+
+def cases() -> dict:
+    """Returns the benchmarked callables by name."""
+    devices = synthetic.make_devices(BULK)
+    device = devices[0]
+    event = CoT_Trackserver.json_to_cot(device, 60)
+    edge = synthetic.make_edge_events()[1]
+    detail = edge.detail
+    template = CoT_Trackserver.SERIALIZERS["template"]
+    return {
+        "json_to_cot": lambda: CoT_Trackserver.json_to_cot(device, 60),
+        "hello_event": CoT_Trackserver.hello_event,
+        "point.generate_cot": edge.point.generate_cot,
+        "track.generate_cot": detail.track.generate_cot,
+        "status.generate_cot": detail.status.generate_cot,
+        "remark.generate_cot": detail.remark.generate_cot,
+        "uid.generate_cot": detail.uid.generate_cot,
+        "contact.generate_cot": detail.contact.generate_cot,
+        "event.serialize_etree": event.generate_cot,
+        "event.serialize_template": lambda: template(event),
+        "edge.serialize_template": lambda: template(edge),
+        "bulk.per_device": lambda: [template(CoT_Trackserver.json_to_cot(d, 60)) for d in devices],
+        "bulk.serialize_devices": lambda: CoT_Trackserver.serialize_devices(devices, 60),
+    }
+
+
+def measure(functions: dict, rounds: int = 7) -> dict:
+    """
+    Times every function right after the calibration workload, round-robin,
+    and returns (seconds per call, cost relative to the calibration) by name.
+    The median ratio of each pair of neighbouring timings is stable against
+    load changes on the host, which hit both timings alike.
+    """
+    reference = timeit.Timer(calibration)
+    reference_number = reference.autorange()[0]
+    timers = {name: timeit.Timer(function) for name, function in functions.items()}
+    numbers = {name: timer.autorange()[0] for name, timer in timers.items()}
+    seconds = {name: [] for name in timers}
+    ratios = {name: [] for name in timers}
+    for _round in range(rounds):
+        for name, timer in timers.items():
+            base = reference.timeit(reference_number) / reference_number
+            took = timer.timeit(numbers[name]) / numbers[name]
+            seconds[name].append(took)
+            ratios[name].append(took / base)
+    return {name: (min(seconds[name]), statistics.median(ratios[name])) for name in timers}
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--save", action="store_true", help="record the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="allowed slowdown against the baseline, 0.25 is 25%%")
+    parser.add_argument("--baseline", default=BASELINE)
+    args = parser.parse_args(argv)
+
+    results = measure(cases())
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    failed = []
+    for name, (seconds, relative) in results.items():
+        line = "%-26s %12.2f us %10.4f" % (name, seconds * 1e6, relative)
+        if name in baseline:
+            change = relative / baseline[name] - 1
+            line += "  %+7.1f%%" % (change * 100)
+            if change > args.threshold:
+                failed.append(name)
+                line += "  REGRESSION"
+        print(line)
+
+    if args.save:
+        with open(args.baseline, "w") as file:
+            json.dump({name: relative for name, (_seconds, relative) in results.items()}, file,
+                      indent=2, sort_keys=True)
+            file.write("\n")
+        print("Saved baseline to %s" % args.baseline)
+        return 0
+    if failed:
+        print("%d case(s) slower than the baseline by more than %.0f%%: %s"
+              % (len(failed), args.threshold * 100, ", ".join(failed)))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,35 @@
+"""
+Measures CoTStreamParser throughput on a synthetic CoT stream.
+
+The stream is the concatenation of serialized events, as a TAK server sends
+it, and is fed to the parser in fixed size chunks.
+
+    python -m benchmarks.bench_parser [events] [chunk_size]
+"""
+import sys
+import time
+
+import CoT_Trackserver
+from benchmarks import synthetic
+
+
+def make_stream(n: int) -> bytes:
+    serialize = CoT_Trackserver.get_serializer()
+    return b"".join(serialize(event) for event in synthetic.make_events(n) + synthetic.make_edge_events())
+
+
+def main(n: int = 20000, chunk_size: int = 65536) -> None:
+    stream = make_stream(n)
+    parser = CoT_Trackserver.CoTStreamParser()
+    decoded = 0
+    started = time.perf_counter()
+    for offset in range(0, len(stream), chunk_size):
+        decoded += len(parser.feed(stream[offset:offset + chunk_size]))
+    elapsed = time.perf_counter() - started
+    print("stream      %d bytes in %d byte chunks" % (len(stream), chunk_size))
+    print("parsed      %d events, %d errors" % (decoded, parser.errors))
+    print("throughput  %.0f events/s  %.1f MB/s" % (decoded / elapsed, len(stream) / elapsed / 1e6))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,101 @@
+"""
+Records a session against the mock Trackserver, then replays it at rising speeds.
+
+The recording run polls the mock every poll_interval seconds for the given
+number of seconds and writes the events to a CoT sink, with the responses
+and the sent CoT going to one Recorder file. Each replay then feeds the
+responses through a fresh TrackerReceiverWorker and a batched
+EventTransmitter into a new sink, and reports how far replay fell behind
+the recorded pace and the devices and events handled per second. Emit
+cadences run on the recorded clock, so every speed delivers the same
+events. The recorded CoT stream is finally replayed as fast as possible on
+its own.
+
+    python -m benchmarks.bench_replay [devices] [seconds] [poll_interval]
+"""
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+
+import CoT_Trackserver
+from benchmarks.cot_sink import CoTSink
+from benchmarks.mock_trackserver import MockTrackserver
+
+SPEEDS = (1, 4, 16, 64, 0)
+
+
+async def pipeline(recorder: CoT_Trackserver.Recorder = None) -> tuple:
+    sink = CoTSink()
+    await sink.start()
+    connection = CoT_Trackserver.CoTConnection("127.0.0.1", sink.port)
+    await connection.connect()
+    transmitter = CoT_Trackserver.EventTransmitter(CoT_Trackserver.CoalescingQueue(), connection, batch=True,
+                                                   recorder=recorder)
+    return sink, transmitter, asyncio.create_task(transmitter.run())
+
+
+async def drain(sink: CoTSink, transmitter: CoT_Trackserver.EventTransmitter, task: asyncio.Task) -> None:
+    while not transmitter.event_queue.empty() or sink.events < transmitter.events_sent:
+        await asyncio.sleep(0.05)
+    task.cancel()
+    transmitter.writer.close()
+    sink.close()
+
+
+async def record(path: str, devices: int, seconds: float, poll_interval: int) -> dict:
+    server = MockTrackserver(devices, latency=0.05)
+    await server.start()
+    recorder = CoT_Trackserver.Recorder(path)
+    sink, transmitter, task = await pipeline(recorder)
+    worker = CoT_Trackserver.TrackerReceiverWorker(transmitter.event_queue, poll_interval=poll_interval,
+                                                   api_url=server.api_url, stream=True, recorder=recorder)
+    polling = asyncio.create_task(worker.run())
+    await asyncio.sleep(seconds)
+    polling.cancel()
+    await drain(sink, transmitter, task)
+    await worker.http_client.close()
+    recorder.close()
+    server.close()
+    return {"polls": worker.polls, "sent": transmitter.events_sent, **recorder.stats()}
+
+
+async def replay(path: str, speed: float, poll_interval: int = None, responses: bool = True) -> dict:
+    sink, transmitter, task = await pipeline()
+    replayer = CoT_Trackserver.Replayer(path, speed)
+    if responses:
+        worker = CoT_Trackserver.TrackerReceiverWorker(transmitter.event_queue, poll_interval=poll_interval)
+        result = await replayer.run(worker=worker)
+    else:
+        result = await replayer.run(queue=transmitter.event_queue)
+    await drain(sink, transmitter, task)
+    result["delivered"] = sink.events
+    return result
+
+
+async def run(devices: int = 2000, seconds: float = 20, poll_interval: int = 1) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.rec")
+        result = await record(path, devices, seconds, poll_interval)
+        print("recorded %(polls)d polls, %(sent)d events sent, %(frames)d frames, %(bytes)d bytes" % result)
+        print("%7s %9s %9s %9s %12s %12s %10s" % ("speed", "recorded", "elapsed", "lag max", "devices/s",
+                                                  "events/s", "delivered"))
+        for speed in SPEEDS:
+            result = await replay(path, speed, poll_interval)
+            print("%7s %8.1fs %8.2fs %8.3fs %12.0f %12.0f %10d"
+                  % ("%dx" % speed if speed else "max", result["recorded"], result["elapsed"], result["lag_max"],
+                     result["devices_per_second"], result["events_per_second"] or
+                     result["delivered"] / result["elapsed"], result["delivered"]))
+        result = await replay(path, 0, responses=False)
+        print("CoT stream at max speed: %(events)d events in %(elapsed).2fs, %(events_per_second).0f events/s, "
+              "%(delivered)d delivered" % result)
+
+
+def main(devices: int = 2000, seconds: float = 20, poll_interval: int = 1) -> None:
+    logging.disable(logging.INFO)
+    asyncio.run(run(int(devices), float(seconds), int(poll_interval)))
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
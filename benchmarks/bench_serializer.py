@@ -0,0 +1,26 @@
+"""
+Times the etree and template CoT serializers.
+
+That both produce identical bytes is tested in tests/test_serializer.py.
+
+    python -m benchmarks.bench_serializer [events]
+"""
+import sys
+import timeit
+
+import CoT_Trackserver
+from benchmarks import synthetic
+
+
+def main(n: int = 10000) -> None:
+    events = synthetic.make_events(n) + synthetic.make_edge_events()
+    timings = {}
+    for name, serialize in CoT_Trackserver.SERIALIZERS.items():
+        seconds = min(timeit.repeat(lambda: [serialize(e) for e in events], number=1, repeat=3))
+        timings[name] = seconds
+        print("%-9s %8.3f s  %10.0f events/s" % (name, seconds, len(events) / seconds))
+    print("speedup   %8.2fx" % (timings["etree"] / timings["template"]))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,76 @@
+"""
+Local TCP CoT server that counts what the tracker delivers.
+
+Every received event is timestamped on arrival. When it carries the
+"Last GPS Fix" remark of json_to_cot, the arrival is recorded against that
+(uid, fix) pair so a runner can compute fix-to-socket latencies.
+
+    python -m benchmarks.cot_sink [port]
+"""
+import asyncio
+import re
+import sys
+import time
+
+_EVENT_END = b"</event>"
+_FIX = re.compile(rb'<event [^>]*?\buid="([^"]*)"[^>]*?how="m-g".*?Last GPS Fix: ([^<]*)</remarks>')
+
+
+class CoTSink:
+
+    def __init__(self) -> None:
+        self.events = 0
+        self.bytes = 0
+        self.connections = 0
+        # Arrival wall clock time of the first event for each (uid, LastGPSFix).
+        self.arrivals: dict = {}
+        self.server = None
+        self.port = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.server = await asyncio.start_server(self._handle, host, port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    def close(self) -> None:
+        self.server.close()
+
+    async def _handle(self, reader, writer) -> None:
+        self.connections += 1
+        pending = b""
+        try:
+            while 1:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                arrived = time.time()
+                self.bytes += len(data)
+                pending += data
+                end = pending.rfind(_EVENT_END)
+                if end < 0:
+                    continue
+                end += len(_EVENT_END)
+                complete, pending = pending[:end], pending[end:]
+                self.events += complete.count(_EVENT_END)
+                for match in _FIX.finditer(complete):
+                    key = (match.group(1).decode(), match.group(2).decode())
+                    self.arrivals.setdefault(key, arrived)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def stats(self) -> dict:
+        return {"events": self.events, "bytes": self.bytes, "connections": self.connections}
+
+
+async def main(port: int = 8087) -> None:
+    sink = CoTSink()
+    await sink.start(port=port)
+    print("CoT sink listening on port %d" % sink.port)
+    while 1:
+        await asyncio.sleep(5)
+        print(sink.stats())
+
+
+if __name__ == '__main__':
+    asyncio.run(main(*map(int, sys.argv[1:])))
@@ -0,0 +1,172 @@
+"""
+Local stand-in for the Trackserver MobileApp API.
+
+Serves Login and GetDeviceData for a simulated fleet of N devices. Moving
+devices drive along a slowly wandering heading and start or stop now and
+then, every device reports a new LastCommTime on each request. Times are
+local time of the host, run the tracker with a matching fix_timezone when
+that is not UTC. Responses can be delayed, sessions expire after session_ttl seconds
+(GetDeviceData then answers 401) and error_rate of the device requests fail
+with a 500.
+
+    python -m benchmarks.mock_trackserver [devices] [port]
+
+Point the tracker at it with api_url="http://127.0.0.1:<port>/api/api/MobileApp/".
+"""
+import asyncio
+import datetime as dt
+import json
+import math
+import random
+import sys
+import time
+import urllib.parse
+import uuid
+
+from benchmarks import synthetic
+
+CHUNK = 65536
+
+
+class MockTrackserver:
+
+    def __init__(self, devices: int = 1000, latency: float = 0.0, session_ttl: float = 3600.0,
+                 error_rate: float = 0.0, moving_share: float = 0.3, seed: int = 1) -> None:
+        self.latency = latency
+        self.session_ttl = session_ttl
+        self.error_rate = error_rate
+        self.moving_share = moving_share
+        self.random = random.Random(seed)
+        self.devices = synthetic.make_devices(devices, seed)
+        stamp = dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        for device in self.devices:
+            device["LastCommTime"] = device["LastGPSFix"] = stamp
+            moving = self.random.random() < moving_share
+            device["MotionStatus"] = int(moving)
+            device["SpeedKPH"] = self.random.randrange(20, 120) if moving else 0
+        self.sessions: dict = {}
+        # First wall clock time each (Name, LastGPSFix) was served, for latency measurements.
+        self.served: dict = {}
+        self.logins = 0
+        self.requests = 0
+        self.errors = 0
+        self.server = None
+        self.port = None
+        self._moved = time.monotonic()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.server = await asyncio.start_server(self._handle, host, port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    def close(self) -> None:
+        self.server.close()
+
+    @property
+    def api_url(self) -> str:
+        return "http://127.0.0.1:%d/api/api/MobileApp/" % self.port
+
+    def _move(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._moved
+        self._moved = now
+        stamp = dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        served = time.time()
+        rnd = self.random
+        for device in self.devices:
+            device["LastCommTime"] = stamp
+            if rnd.random() < 0.01 * elapsed:
+                moving = not device["MotionStatus"]
+                device["MotionStatus"] = int(moving)
+                device["SpeedKPH"] = rnd.randrange(20, 120) if moving else 0
+            if not device["MotionStatus"]:
+                continue
+            heading = (device["Heading"] + rnd.uniform(-10, 10)) % 360
+            distance = device["SpeedKPH"] / 3.6 * elapsed
+            lat = device["Lat"] + math.degrees(distance * math.cos(math.radians(heading)) / 6371000.0)
+            lon = device["Lon"] + math.degrees(distance * math.sin(math.radians(heading)) / 6371000.0) / max(
+                math.cos(math.radians(lat)), 0.01)
+            device["Lat"] = round(min(max(lat, -89.9), 89.9), 6)
+            device["Lon"] = round((lon + 180.0) % 360.0 - 180.0, 6)
+            device["Heading"] = int(heading)
+            if device["LastGPSFix"] != stamp:
+                device["LastGPSFix"] = stamp
+                self.served.setdefault((device["Name"], stamp), served)
+
+    async def _handle(self, reader, writer) -> None:
+        try:
+            while 1:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                _method, target, _version = request_line.decode("latin-1").split(" ", 2)
+                url = urllib.parse.urlsplit(target)
+                await self._respond(url.path.rsplit("/", 1)[-1], urllib.parse.parse_qs(url.query), writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _send(self, writer, status: str, body: bytes) -> None:
+        writer.write(("HTTP/1.1 %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n"
+                      % (status, len(body))).encode("latin-1") + body)
+
+    async def _respond(self, endpoint: str, query: dict, writer) -> None:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency * self.random.uniform(0.5, 1.5))
+        if endpoint == "Login":
+            self.logins += 1
+            session = uuid.uuid4().hex
+            self.sessions[session] = time.monotonic() + self.session_ttl
+            self._send(writer, "200 OK", json.dumps({"SessionID": session, "AccountID": 1}).encode())
+        elif endpoint == "GetDeviceData":
+            expires = self.sessions.get(query.get("SessionID", [""])[0])
+            if expires is None or expires < time.monotonic():
+                self.errors += 1
+                self._send(writer, "401 Unauthorized", b'{"Message": "Session expired"}')
+            elif self.random.random() < self.error_rate:
+                self.errors += 1
+                self._send(writer, "500 Internal Server Error", b'{"Message": "Simulated failure"}')
+            else:
+                self._move()
+                await self._send_devices(writer)
+        else:
+            self._send(writer, "404 Not Found", b"{}")
+        await writer.drain()
+
+    async def _send_devices(self, writer) -> None:
+        """Sends the fleet as a chunked response, the way a large PullAll reply arrives."""
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nTransfer-Encoding: chunked\r\n\r\n")
+        parts = ['{"Devices": [']
+        size = 0
+        for i, device in enumerate(self.devices):
+            part = (", " if i else "") + json.dumps(device)
+            parts.append(part)
+            size += len(part)
+            if size >= CHUNK:
+                self._chunk(writer, "".join(parts).encode())
+                parts, size = [], 0
+                await writer.drain()
+        parts.append("]}")
+        self._chunk(writer, "".join(parts).encode())
+        writer.write(b"0\r\n\r\n")
+
+    @staticmethod
+    def _chunk(writer, data: bytes) -> None:
+        writer.write(b"%x\r\n" % len(data) + data + b"\r\n")
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "logins": self.logins, "errors": self.errors}
+
+
+async def main(devices: int = 1000, port: int = 8080) -> None:
+    server = MockTrackserver(devices)
+    await server.start(port=port)
+    print("Serving %d devices on %s" % (devices, server.api_url))
+    await server.server.serve_forever()
+
+
+if __name__ == '__main__':
+    asyncio.run(main(*map(int, sys.argv[1:])))
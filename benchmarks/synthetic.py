@@ -0,0 +1,80 @@
+"""Synthetic Trackserver devices and CoT events shared by the benchmarks."""
+import datetime as dt
+import random
+
+import CoT_Trackserver
+
+
+def make_device(i: int, rnd: random.Random) -> dict:
+    fix = (dt.datetime(2021, 4, 8, 10, 0, 0) + dt.timedelta(seconds=rnd.randrange(86400))).strftime("%Y-%m-%d %H:%M:%S")
+    return {
+        "Name": "Tracker %05d" % i,
+        "Lat": round(rnd.uniform(-89.9, 89.9), 6),
+        "Lon": round(rnd.uniform(-179.9, 179.9), 6),
+        "Heading": rnd.randrange(360),
+        "SpeedKPH": rnd.choice((0, 0, 0, rnd.randrange(1, 130))),
+        "BatteryLevel": rnd.randrange(101),
+        "MotionStatus": rnd.choice((0, 1)),
+        "LastCommTime": fix,
+        "LastGPSFix": fix,
+    }
+
+
+def make_devices(n: int, seed: int = 1) -> list:
+    rnd = random.Random(seed)
+    return [make_device(i, rnd) for i in range(n)]
+
+
+def make_events(n: int, seed: int = 1) -> list:
+    return [CoT_Trackserver.json_to_cot(device, 60) for device in make_devices(n, seed)]
+
+
+def make_edge_events() -> list:
+    """Events exercising the optional attributes and XML escaping."""
+    Event = CoT_Trackserver.Event
+    now = dt.datetime(2021, 4, 8, 10, 0, 0, tzinfo=dt.timezone.utc)
+    events = [CoT_Trackserver.hello_event()]
+
+    evt = Event(2, "a-f-G", 'Quote "&" <Tag>', now, now, now + dt.timedelta(seconds=30), "m-g")
+    evt.access = "Unrestricted & open"
+    evt.qos = "1-r-c"
+    evt.opex = "e-exercise"
+    evt.point = Event.Point(-33.35, 44.383333, 12.5, 7.49, 3)
+    evt.detail = Event.Detail()
+    evt.detail.remark = Event.Detail.Remark("line1\nline2 <b>&amp;</b>")
+    evt.detail.remark.source = "src\t1"
+    evt.detail.remark.time = now
+    evt.detail.remark.to = 'x"y'
+    evt.detail.remark.keywords = "a,b-c"
+    evt.detail.remark.version = 2
+    evt.detail.track = Event.Detail.Track(359, 0.05)
+    evt.detail.track.slope = 3
+    evt.detail.track.eCourse = 1.25
+    evt.detail.track.eSpeed = 0.5
+    evt.detail.track.eSlope = 0.1
+    evt.detail.track.version = 1
+    evt.detail.uid = Event.Detail.Uid()
+    evt.detail.uid.version = 1
+    evt.detail.uid.attributes = {"Droid": "a<b", "Other": "c\rd"}
+    evt.detail.status = Event.Detail.Status(55)
+    evt.detail.status.readiness = True
+    evt.detail.contact = Event.Detail.Contact("Call & Sign")
+    evt.detail.contact.freq = 145.5
+    evt.detail.contact.email = "a@b.c"
+    evt.detail.contact.phone = "+32 1"
+    evt.detail.contact.version = 2
+    events.append(evt)
+
+    empty = Event(2, "a-u-G", "empty", now, now, now, "h-e")
+    events.append(empty)
+
+    blank = Event(2, "a-u-G", "blank", now, now, now, "h-e")
+    blank.detail = Event.Detail()
+    blank.detail.remark = Event.Detail.Remark("")
+    events.append(blank)
+
+    bare_detail = Event(2, "a-u-G", "bare", now, now, now, "h-e")
+    bare_detail.point = Event.Point(0, 0, 0, 0, 0)
+    bare_detail.detail = Event.Detail()
+    events.append(bare_detail)
+    return events
@@ -0,0 +1,114 @@
+"""Fixtures shared by the tests."""
+import datetime as dt
+import random
+import string
+
+import pytest
+
+import CoT_Trackserver
+from benchmarks import synthetic
+
+Event = CoT_Trackserver.Event
+
+
+class Writer:
+
+    """Stands in for the StreamWriter of an EventTransmitter and keeps what is written."""
+
+    def __init__(self) -> None:
+        self.data = []
+
+    def writelines(self, chunks) -> None:
+        self.data.extend(chunks)
+
+    def write(self, data) -> None:
+        self.data.append(data)
+
+    async def drain(self) -> None:
+        pass
+
+
+def _random_text(rnd: random.Random, alphabet: str = string.ascii_letters + string.digits + " -_&<>\"'\n\t") -> str:
+    return "".join(rnd.choice(alphabet) for _ in range(rnd.randrange(1, 24)))
+
+
+def _random_event(rnd: random.Random) -> Event:
+    now = dt.datetime(2021, 1, 1, tzinfo=dt.timezone.utc) + dt.timedelta(seconds=rnd.randrange(10 ** 8))
+    event = Event(rnd.choice((2, 2.0, 2.1)), rnd.choice(("a-f-G", "a-h-G-E-V-C", "b-m-p-s-p-i")),
+                  _random_text(rnd), now, now, now + dt.timedelta(seconds=rnd.randrange(3600)),
+                  rnd.choice(("m-g", "h-e", "h-g-i-g-o", "m-p")))
+    if rnd.random() < 0.2:
+        event.access = _random_text(rnd)
+    if rnd.random() < 0.2:
+        event.qos = "%d-%s-%s" % (rnd.randrange(10), rnd.choice("rfi"), rnd.choice("cgd"))
+    event.point = Event.Point(round(rnd.uniform(-90, 90), 6), round(rnd.uniform(-180, 180), 6),
+                              rnd.randrange(10000), rnd.randrange(100), rnd.randrange(100))
+    if rnd.random() < 0.1:
+        return event
+    event.detail = Event.Detail()
+    if rnd.random() < 0.8:
+        event.detail.remark = Event.Detail.Remark(_random_text(rnd))
+        if rnd.random() < 0.2:
+            event.detail.remark.source = _random_text(rnd)
+    if rnd.random() < 0.8:
+        event.detail.track = Event.Detail.Track(rnd.randrange(360), round(rnd.uniform(0, 50), 1))
+        if rnd.random() < 0.2:
+            event.detail.track.eSpeed = round(rnd.uniform(0, 5), 2)
+    if rnd.random() < 0.9:
+        event.detail.uid = Event.Detail.Uid()
+        event.detail.uid.attributes = {"Droid": _random_text(rnd)}
+    if rnd.random() < 0.8:
+        event.detail.status = Event.Detail.Status(rnd.randrange(101))
+    if rnd.random() < 0.3:
+        event.detail.contact = Event.Detail.Contact(_random_text(rnd))
+    return event
+
+
+def pytest_generate_tests(metafunc):
+    if "edge_event" in metafunc.fixturenames:
+        metafunc.parametrize("edge_event", synthetic.make_edge_events(), ids=lambda event: event.uid)
+
+
+@pytest.fixture
+def make_writer():
+    """Factory of Writer stubs."""
+    return Writer
+
+
+@pytest.fixture
+def make_device():
+    """Factory of a GetDeviceData device, the first synthetic device with the given fields replaced."""
+    base = synthetic.make_devices(1)[0]
+
+    def make(**fields) -> dict:
+        return dict(base, **fields)
+    return make
+
+
+@pytest.fixture
+def make_devices():
+    """Factory of n synthetic GetDeviceData devices."""
+    return synthetic.make_devices
+
+
+@pytest.fixture
+def make_events():
+    """Factory of the json_to_cot events of n synthetic devices."""
+    return synthetic.make_events
+
+
+@pytest.fixture
+def device_event(make_device):
+    """Factory of the json_to_cot event of make_device(**fields), stale after 60 seconds."""
+    def make(**fields) -> Event:
+        return CoT_Trackserver.json_to_cot(make_device(**fields), 60)
+    return make
+
+
+@pytest.fixture
+def random_events():
+    """Factory of n events with random optional fields and escape characters, the same on every run."""
+    def make(n: int, seed: int = 1) -> list:
+        rnd = random.Random(seed)
+        return [_random_event(rnd) for _ in range(n)]
+    return make
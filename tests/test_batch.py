@@ -0,0 +1,79 @@
+"""serialize_devices must produce the bytes of json_to_cot and the template serializer for every device."""
+import datetime as dt
+
+import pytest
+
+import CoT_Trackserver
+from tests.test_serializer import SPECIAL
+
+template = CoT_Trackserver.SERIALIZERS["template"]
+
+NOW = dt.datetime(2021, 4, 8, 10, 0, 0, tzinfo=dt.timezone.utc)
+STALE = 60
+
+
+def per_device(devices: list, stale: int = STALE) -> list:
+    out = []
+    for device in devices:
+        event = CoT_Trackserver.json_to_cot(device, stale)
+        event.time = event.start = NOW
+        event.stale = NOW + dt.timedelta(seconds=stale)
+        out.append(template(event))
+    return out
+
+
+def check(devices: list, stale: int = STALE) -> None:
+    expected = per_device(devices, stale)
+    assert [bytes(view) for view in CoT_Trackserver.serialize_devices(devices, stale, views=True, now=NOW)] == expected
+    assert CoT_Trackserver.serialize_devices(devices, stale, now=NOW) == b"".join(expected)
+
+
+def test_synthetic_devices(make_devices):
+    check(make_devices(500))
+
+
+def test_empty():
+    assert CoT_Trackserver.serialize_devices([], STALE, now=NOW) == b""
+    assert CoT_Trackserver.serialize_devices([], STALE, views=True, now=NOW) == []
+
+
+@pytest.mark.parametrize("stale", [0, 20, 600, 86400])
+def test_stale(make_device, stale):
+    check([make_device(), make_device(Name="other", MotionStatus=0)], stale)
+
+
+@pytest.mark.parametrize("text", SPECIAL)
+def test_escaped_name(make_device, text):
+    check([make_device(Name="a" + text + "b")])
+
+
+@pytest.mark.parametrize("text", SPECIAL)
+def test_escaped_remark(make_device, text):
+    check([make_device(LastCommTime=text, LastGPSFix=text)])
+
+
+@pytest.mark.parametrize("fields", [
+    {"Lat": 0, "Lon": 0, "Heading": 0, "SpeedKPH": 0, "BatteryLevel": 0},
+    {"Lat": -90, "Lon": -180, "Heading": 359, "SpeedKPH": 0.04, "BatteryLevel": 100},
+    {"Lat": 90, "Lon": 180, "Heading": 360, "SpeedKPH": 1e6, "BatteryLevel": 255},
+    {"Lat": "12.5", "Lon": "-3.25", "Heading": "90", "SpeedKPH": "7.5", "BatteryLevel": "50"},
+    {"Lat": 9999999.0, "Lon": 9999999.0},
+    {"MotionStatus": "1"},
+    {"MotionStatus": 0},
+])
+def test_field_values(make_device, fields):
+    check([make_device(**fields)])
+
+
+@pytest.mark.parametrize("fields", [{"Lat": 90.5}, {"Lon": -180.5}])
+def test_out_of_range(make_device, fields):
+    with pytest.raises(Exception):
+        CoT_Trackserver.json_to_cot(make_device(**fields), STALE)
+    with pytest.raises(Exception):
+        CoT_Trackserver.serialize_devices([make_device(), make_device(**fields)], STALE, now=NOW)
+
+
+def test_stamped_at_now(make_device):
+    """Unlike json_to_cot with fix_time, every event is stamped at now."""
+    buffer = CoT_Trackserver.serialize_devices([make_device()], STALE, now=NOW)
+    assert b'time="2021-04-08T10:00:00Z" start="2021-04-08T10:00:00Z" stale="2021-04-08T10:01:00Z"' in buffer
@@ -0,0 +1,80 @@
+"""CoTConnection buffering and reconnecting while the CoT server is down."""
+import asyncio
+import datetime as dt
+import socket
+
+import CoT_Trackserver
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_server_down_at_startup():
+    async def main():
+        port = free_port()
+        connection = CoT_Trackserver.CoTConnection("127.0.0.1", port, backoff_min=0.01, backoff_max=0.05)
+        await connection.connect()
+        assert not connection.connected
+        connection.write(b'<event uid="a" />')
+        connection.write(b'<event uid="b" />')
+        received = []
+        done = asyncio.Event()
+
+        async def handle(reader, writer):
+            received.append(await reader.readexactly(34))
+            writer.close()
+            done.set()
+        server = await asyncio.start_server(handle, "127.0.0.1", port)
+        await asyncio.wait_for(connection.wait_connected(), 5)
+        await asyncio.wait_for(done.wait(), 5)
+        connection.close()
+        server.close()
+        return connection, received
+
+    connection, received = asyncio.run(main())
+    assert received == [b'<event uid="a" /><event uid="b" />']
+    assert connection.stats()["buffered"] == 0
+
+
+def send_once(uid: str):
+    """Server callback sending an event on the first connection, every connection is closed gracefully."""
+    now = dt.datetime.now(dt.timezone.utc)
+    data = CoT_Trackserver.Event(2, "a-f-G", uid, now, now, now, "m-g").generate_cot()
+    served = []
+
+    async def handle(reader, writer):
+        if not served:
+            served.append(writer)
+            writer.write(data)
+            await writer.drain()
+        writer.close()
+    return handle
+
+
+def test_receivers_read_every_connection():
+    async def main():
+        rx_queue = CoT_Trackserver.CoalescingQueue()
+        servers, connections = [], []
+        for uid in ("one", "two"):
+            server = await asyncio.start_server(send_once(uid), "127.0.0.1", 0)
+            connection = CoT_Trackserver.CoTConnection("127.0.0.1", server.sockets[0].getsockname()[1],
+                                                       backoff_min=0.01, backoff_max=0.05)
+            await connection.connect()
+            servers.append(server)
+            connections.append(connection)
+        tasks = [asyncio.create_task(CoT_Trackserver.EventReceiver(rx_queue, connection).run())
+                 for connection in connections]
+        received = sorted([(await asyncio.wait_for(rx_queue.get(), 5)).uid for _ in range(2)])
+        while not all(connection.reconnects for connection in connections):
+            await asyncio.sleep(0.01)
+        for task in tasks:
+            task.cancel()
+        for server, connection in zip(servers, connections):
+            connection.close()
+            server.close()
+        return received
+
+    assert asyncio.run(asyncio.wait_for(main(), 10)) == ["one", "two"]
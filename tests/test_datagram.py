@@ -0,0 +1,75 @@
+"""CoTDatagram packing, MTU drops and send errors as counted by EventTransmitter."""
+import asyncio
+
+import CoT_Trackserver
+
+
+class Receiver(asyncio.DatagramProtocol):
+
+    def __init__(self) -> None:
+        self.datagrams = []
+
+    def datagram_received(self, data, addr) -> None:
+        self.datagrams.append(data)
+
+
+class FailingTransport:
+
+    def sendto(self, data) -> None:
+        raise OSError("network is unreachable")
+
+
+def event(uid: str, size: int = 40) -> bytes:
+    data = b'<event uid="%s">' % uid.encode()
+    return data + b"x" * (size - len(data) - 8) + b"</event>"
+
+
+async def datagram_sink(mtu: int, pack: bool) -> tuple:
+    loop = asyncio.get_running_loop()
+    transport, receiver = await loop.create_datagram_endpoint(Receiver, local_addr=("127.0.0.1", 0))
+    connection = CoT_Trackserver.CoTDatagram("127.0.0.1", transport.get_extra_info("sockname")[1], mtu=mtu,
+                                             pack=pack)
+    await connection.connect()
+    return transport, receiver, connection
+
+
+def test_packing_and_mtu_drops():
+    async def main():
+        transport, receiver, connection = await datagram_sink(100, pack=True)
+        transmitter = CoT_Trackserver.EventTransmitter(asyncio.Queue(), connection, batch=True)
+        await transmitter._flush([event("a"), event("b"), event("big", 150), event("c"), event("d"), event("e")])
+        await asyncio.sleep(0.05)
+        connection.close()
+        transport.close()
+        return receiver, connection, transmitter
+
+    receiver, connection, transmitter = asyncio.run(main())
+    assert receiver.datagrams == [event("a") + event("b"), event("c") + event("d"), event("e")]
+    assert connection.stats()["dropped"] == 1
+    stats = transmitter.stats()
+    assert stats["events"] == 5 and stats["bytes"] == 200
+    assert stats["mtu_dropped"] == 1 and stats["send_errors"] == 0
+
+
+def test_failed_sends_are_not_counted_as_sent():
+    async def main():
+        transport, _receiver, connection = await datagram_sink(100, pack=False)
+        transport.close()
+        connection.transport.close()
+        connection.transport = FailingTransport()
+        transmitter = CoT_Trackserver.EventTransmitter(asyncio.Queue(), connection, batch=True)
+        await transmitter._flush([event("a"), event("b")])
+        return transmitter
+
+    stats = asyncio.run(main()).stats()
+    assert stats["events"] == 0 and stats["bytes"] == 0 and stats["send_errors"] == 2
+
+
+def test_stream_transport_counts_every_event(make_writer):
+    async def main():
+        transmitter = CoT_Trackserver.EventTransmitter(asyncio.Queue(), make_writer(), batch=True)
+        await transmitter._flush([event("a"), event("b")])
+        return transmitter
+
+    stats = asyncio.run(main()).stats()
+    assert stats["events"] == 2 and "send_errors" not in stats
@@ -0,0 +1,23 @@
+import datetime as dt
+
+import pytest
+
+import CoT_Trackserver
+
+
+@pytest.mark.parametrize("value", ["", None, "2021-04-08T10:00:00"])
+def test_bad_fix_time(make_device, value):
+    device = make_device(LastGPSFix=value)
+    with pytest.raises(ValueError):
+        CoT_Trackserver.functions.parse_fix(device)
+    before = dt.datetime.now(dt.timezone.utc)
+    event = CoT_Trackserver.functions.json_to_cot(device, 60, fix_time=True)
+    assert event.time >= before.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def test_fix_timezone(make_device):
+    device = make_device(LastGPSFix="2021-07-01 12:00:00")
+    utc = CoT_Trackserver.functions.parse_fix(device)
+    london = CoT_Trackserver.functions.parse_fix(device, "Europe/London")
+    assert utc == dt.datetime(2021, 7, 1, 12, tzinfo=dt.timezone.utc)
+    assert utc - london == dt.timedelta(hours=1)
@@ -0,0 +1,22 @@
+import pytest
+
+import CoT_Trackserver
+
+
+@pytest.mark.parametrize("field, value", [("LastGPSFix", ""), ("LastGPSFix", None),
+                                          ("LastGPSFix", "2021-04-08T10:00:00"), ("Lat", "nan"), ("Lon", None)])
+def test_invalid_device_is_counted(tmp_path, make_device, field, value):
+    history = CoT_Trackserver.TrackHistory(str(tmp_path))
+    device = make_device(**{field: value})
+    assert not history.append_device(device)
+    assert history.stats()["invalid"] == 1 and len(history) == 0
+    history.close()
+
+
+def test_fractional_battery(tmp_path, make_device):
+    history = CoT_Trackserver.TrackHistory(str(tmp_path))
+    device = make_device(LastGPSFix="2021-04-08 10:00:00", BatteryLevel="85.5")
+    assert history.append_device(device)
+    position, = history.track(device["Name"], 0, 2e9)
+    assert position.battery == 85
+    history.close()
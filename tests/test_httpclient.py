@@ -0,0 +1,150 @@
+"""HTTPClient body framing, keep-alive pooling and timeouts against local servers."""
+import asyncio
+import json
+import urllib.error
+
+import pytest
+
+import CoT_Trackserver
+from benchmarks.mock_trackserver import MockTrackserver
+
+
+class Server:
+
+    """Answers every request on a connection with the next of responses, closing after close_after of them."""
+
+    def __init__(self, responses: list, close_after: int = None, delay: float = 0.0) -> None:
+        self.responses = responses
+        self.close_after = close_after
+        self.delay = delay
+        self.connections = 0
+        self.active = 0
+        self.active_max = 0
+        self.requests = 0
+        self.server = None
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return "http://127.0.0.1:%d/path?q=1" % self.server.sockets[0].getsockname()[1]
+
+    async def _handle(self, reader, writer) -> None:
+        self.connections += 1
+        self.active += 1
+        self.active_max = max(self.active_max, self.active)
+        served = 0
+        try:
+            while self.close_after is None or served < self.close_after:
+                if not await reader.readline():
+                    break
+                while (await reader.readline()) not in (b"\r\n", b""):
+                    pass
+                await asyncio.sleep(self.delay)
+                response = self.responses[self.requests % len(self.responses)]
+                self.requests += 1
+                served += 1
+                writer.write(response)
+                await writer.drain()
+                if b"Content-Length" not in response and b"chunked" not in response:
+                    break
+        finally:
+            self.active -= 1
+            writer.close()
+
+    def close(self) -> None:
+        self.server.close()
+
+
+def run(responses: list, requests: int = 1, client: CoT_Trackserver.HTTPClient = None, **server_args):
+    async def main():
+        server = Server(responses, **server_args)
+        url = await server.start()
+        http_client = client or CoT_Trackserver.HTTPClient()
+        try:
+            bodies = [await http_client.get(url) for _ in range(requests)]
+        finally:
+            await http_client.close()
+            server.close()
+        return bodies, server, http_client
+    return asyncio.run(main())
+
+
+def test_content_length_keep_alive():
+    bodies, server, client = run([b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nhello"], requests=3)
+    assert bodies == [b"hello"] * 3
+    assert server.connections == 1 and client.connections_opened == 1 and client.connections_reused == 2
+
+
+def test_chunked_with_extension_and_trailer():
+    response = (b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+                b"5;ext=1\r\nhello\r\n6\r\n world\r\n0\r\nX-Trailer: 1\r\n\r\n")
+    bodies, server, _client = run([response], requests=2)
+    assert bodies == [b"hello world"] * 2
+    assert server.connections == 1
+
+
+def test_close_delimited_body():
+    bodies, server, client = run([b"HTTP/1.1 200 OK\r\n\r\nuntil the end"], requests=2)
+    assert bodies == [b"until the end"] * 2
+    assert server.connections == 2 and client.connections_reused == 0
+
+
+def test_stale_keep_alive_connection_is_retried():
+    # The server drops every connection after one response, as when its keep-alive timeout passed.
+    bodies, server, client = run([b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok"], requests=3, close_after=1)
+    assert bodies == [b"ok"] * 3
+    assert server.connections == 3 and server.requests == 3
+
+
+def test_error_status():
+    with pytest.raises(urllib.error.HTTPError) as error:
+        run([b"HTTP/1.1 401 Unauthorized\r\nContent-Length: 2\r\n\r\n{}"])
+    assert error.value.code == 401
+
+
+def test_pool_limits_connections():
+    async def main():
+        server = Server([b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok"], delay=0.02)
+        url = await server.start()
+        client = CoT_Trackserver.HTTPClient(max_connections=2)
+        bodies = await asyncio.gather(*(client.get(url) for _ in range(8)))
+        await client.close()
+        server.close()
+        return bodies, server
+
+    bodies, server = asyncio.run(main())
+    assert bodies == [b"ok"] * 8
+    assert server.active_max == 2 and server.connections == 2
+
+
+def test_connect_timeout(monkeypatch):
+    async def unreachable(*args, **kwargs):
+        await asyncio.sleep(3600)
+
+    async def main():
+        client = CoT_Trackserver.HTTPClient(timeout=0.05)
+        with pytest.raises(asyncio.TimeoutError):
+            await client.get("http://192.0.2.1/api")
+        # The pool slot of the failed request is free again.
+        assert not client._limit(("192.0.2.1", 80, False)).locked()
+
+    monkeypatch.setattr(asyncio, "open_connection", unreachable)
+    asyncio.run(main())
+
+
+def test_mock_trackserver_devices():
+    async def main():
+        server = MockTrackserver(50)
+        await server.start()
+        client = CoT_Trackserver.HTTPClient()
+        login = json.loads(await client.get(server.api_url + "Login"))
+        response = await client.request(server.api_url + "GetDeviceData?SessionID=" + login["SessionID"])
+        parser = CoT_Trackserver.JSONArrayParser("Devices")
+        async for chunk in response.iter_chunks():
+            parser.feed(chunk)
+        parser.close()
+        await client.close()
+        server.close()
+        return parser.items, client
+
+    devices, client = asyncio.run(main())
+    assert devices == 50 and client.connections_opened == 1
@@ -0,0 +1,72 @@
+"""JSONArrayParser decoding of GetDeviceData responses fed in arbitrary chunks."""
+import json
+
+import pytest
+
+import CoT_Trackserver
+
+
+def parse(chunks) -> list:
+    parser = CoT_Trackserver.JSONArrayParser("Devices")
+    items = []
+    for chunk in chunks:
+        items.extend(parser.feed(chunk))
+    parser.close()
+    assert parser.items == len(items)
+    return items
+
+
+@pytest.fixture
+def devices(make_devices, make_device):
+    return make_devices(5) + [make_device(Name="Café ☃", Lat=-0.5, Lon=1e-07, SpeedKPH=2.5e3, Heading=-1)]
+
+
+@pytest.fixture
+def payload(devices) -> bytes:
+    return json.dumps({"Result": "ok", "Devices": devices, "Count": len(devices)}, ensure_ascii=False).encode()
+
+
+def test_whole(payload, devices):
+    assert parse([payload]) == devices
+
+
+def test_split_at_every_offset(payload, devices):
+    for i in range(len(payload) + 1):
+        assert parse([payload[:i], payload[i:]]) == devices, i
+
+
+def test_byte_by_byte(payload, devices):
+    assert parse([payload[i:i + 1] for i in range(len(payload))]) == devices
+
+
+@pytest.mark.parametrize("items", [
+    [2.5, -3, 1e-07, 12.442857, 0, -0.0, 6.02e23],
+    [True, False, None, "2.5", 10],
+    [[1, 2.5], {"a": 1.5}, 7],
+])
+def test_scalars_split_at_every_offset(items):
+    data = json.dumps({"Devices": items}).encode()
+    for i in range(len(data) + 1):
+        for j in range(i, len(data) + 1):
+            assert parse([data[:i], data[i:j], data[j:]]) == items, (i, j)
+
+
+def test_number_cut_after_point():
+    parser = CoT_Trackserver.JSONArrayParser("Devices")
+    assert parser.feed(b'{"Devices": [1, 2.') == [1]
+    assert parser.feed(b'5, 3e') == [2.5]
+    assert parser.feed(b'2]}') == [300.0]
+    parser.close()
+
+
+def test_truncated(payload):
+    parser = CoT_Trackserver.JSONArrayParser("Devices")
+    parser.feed(payload[:len(payload) // 2])
+    with pytest.raises(ValueError):
+        parser.close()
+
+
+def test_max_pending(payload):
+    parser = CoT_Trackserver.JSONArrayParser("Devices", max_pending=16)
+    with pytest.raises(ValueError):
+        parser.feed(payload[:payload.index(b"}")])
@@ -0,0 +1,43 @@
+"""Prometheus text rendering of the metrics registry."""
+import pytest
+
+import CoT_Trackserver
+from CoT_Trackserver import metrics
+
+
+def test_metric_base_is_abstract():
+    with pytest.raises(TypeError):
+        metrics._Metric("abstract", "Abstract.", registry=None)
+
+
+def test_render():
+    registry = metrics.Registry()
+    counter = CoT_Trackserver.Counter("test_events", "Events.", ("destination",), registry=registry)
+    gauge = CoT_Trackserver.Gauge("test_depth", "Depth.", registry=registry)
+    histogram = CoT_Trackserver.Histogram("test_seconds", "Seconds.", buckets=(0.1, 1.0), registry=registry)
+    counter.labels('a"b').inc(2)
+    gauge.labels().track(lambda: 7)
+    histogram.observe(0.5)
+    histogram.observe(5)
+    assert registry.render().splitlines() == [
+        "# HELP test_events Events.",
+        "# TYPE test_events counter",
+        'test_events_total{destination="a\\"b"} 2',
+        "# HELP test_depth Depth.",
+        "# TYPE test_depth gauge",
+        "test_depth 7",
+        "# HELP test_seconds Seconds.",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{le="0.1"} 0',
+        'test_seconds_bucket{le="1"} 1',
+        'test_seconds_bucket{le="+Inf"} 2',
+        "test_seconds_sum 5.5",
+        "test_seconds_count 2",
+    ]
+
+
+def test_duplicate_registration():
+    registry = metrics.Registry()
+    CoT_Trackserver.Counter("test_once", "Once.", registry=registry)
+    with pytest.raises(Exception):
+        CoT_Trackserver.Counter("test_once", "Once.", registry=registry)
@@ -0,0 +1,99 @@
+"""CoalescingQueue coalescing by uid and its overflow policies."""
+import asyncio
+
+import pytest
+
+import CoT_Trackserver
+
+
+def cot(uid: str, version: int = 0) -> bytes:
+    return b'<event version="2.0" uid="%s" how="m-g"><detail remarks="%d" /></event>' % (uid.encode(), version)
+
+
+def drain(queue: CoT_Trackserver.CoalescingQueue) -> list:
+    return [queue.get_nowait() for _ in range(queue.qsize())]
+
+
+def test_event_uid(device_event):
+    assert CoT_Trackserver.event_uid(cot("a-1")) == "a-1"
+    assert CoT_Trackserver.event_uid(device_event(Name="device")) == "device"
+    assert CoT_Trackserver.event_uid(b"<event version='2.0'/>") is None
+
+
+def test_coalesces_by_uid_in_arrival_order():
+    queue = CoT_Trackserver.CoalescingQueue(10)
+    for item in (cot("a"), cot("b"), cot("a", 1), cot("c"), cot("b", 1), cot("a", 2)):
+        queue.put_nowait(item)
+    assert drain(queue) == [cot("a", 2), cot("b", 1), cot("c")]
+    assert queue.stats() == {"pending": 0, "coalesced": 3, "dropped": 0}
+
+
+def test_events_without_uid_are_never_coalesced():
+    queue = CoT_Trackserver.CoalescingQueue(10)
+    for _ in range(3):
+        queue.put_nowait(b"<event />")
+    assert queue.qsize() == 3 and queue.coalesced == 0
+
+
+def test_drop_oldest():
+    queue = CoT_Trackserver.CoalescingQueue(2, "drop_oldest")
+    for uid in "abcd":
+        queue.put_nowait(cot(uid))
+    # A pending uid is replaced in place, even when the queue is full.
+    queue.put_nowait(cot("c", 1))
+    assert drain(queue) == [cot("c", 1), cot("d")]
+    assert queue.stats() == {"pending": 0, "coalesced": 1, "dropped": 2}
+
+
+def test_drop_newest():
+    queue = CoT_Trackserver.CoalescingQueue(2, "drop_newest")
+    for uid in "abcd":
+        queue.put_nowait(cot(uid))
+    assert drain(queue) == [cot("a"), cot("b")]
+    assert queue.stats()["dropped"] == 2
+
+
+def test_block():
+    async def main():
+        queue = CoT_Trackserver.CoalescingQueue(2, "block")
+        await queue.put(cot("a"))
+        await queue.put(cot("b"))
+        with pytest.raises(asyncio.QueueFull):
+            queue.put_nowait(cot("c"))
+        # Coalescing needs no room and does not block.
+        await asyncio.wait_for(queue.put(cot("a", 1)), 1)
+        blocked = asyncio.ensure_future(queue.put(cot("c")))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        first = await queue.get()
+        await asyncio.wait_for(blocked, 1)
+        return first, drain(queue), queue.stats()
+
+    first, rest, stats = asyncio.run(main())
+    assert [first] + rest == [cot("a", 1), cot("b"), cot("c")]
+    assert stats == {"pending": 0, "coalesced": 1, "dropped": 0}
+
+
+def test_unbounded():
+    queue = CoT_Trackserver.CoalescingQueue(0)
+    for i in range(1000):
+        queue.put_nowait(cot(str(i)))
+    assert queue.qsize() == 1000 and not queue.full()
+
+
+def test_join_counts_dropped_events():
+    async def main():
+        queue = CoT_Trackserver.CoalescingQueue(2, "drop_oldest")
+        for uid in "abc":
+            queue.put_nowait(cot(uid))
+        for _ in range(queue.qsize()):
+            await queue.get()
+            queue.task_done()
+        await asyncio.wait_for(queue.join(), 1)
+
+    asyncio.run(main())
+
+
+def test_invalid_policy():
+    with pytest.raises(Exception, match="Overflow policy"):
+        CoT_Trackserver.CoalescingQueue(2, "drop_random")
@@ -0,0 +1,123 @@
+"""DeadReckoner projection of moving devices between polls."""
+import datetime as dt
+import math
+import time
+
+import pytest
+
+import CoT_Trackserver
+
+Event = CoT_Trackserver.Event
+
+# Degrees of latitude per metre.
+DEGREES = math.degrees(1.0) / CoT_Trackserver.reckoning.EARTH_RADIUS
+
+
+def fix(uid: str = "tracker", lat: float = 0.0, lon: float = 0.0, course: float = 0, speed: float = 10,
+        ce: float = 10) -> Event:
+    now = dt.datetime.now(dt.timezone.utc)
+    event = Event(2.0, "a-f-G", uid, now, now, now + dt.timedelta(seconds=60), "m-g")
+    event.point = Event.Point(lat, lon, 100, ce, 5)
+    event.detail = Event.Detail()
+    event.detail.track = Event.Detail.Track(course, speed)
+    return event
+
+
+def project_one(reckoner, now: float) -> Event:
+    events = reckoner.project(now)
+    assert len(events) == 1
+    return events[0]
+
+
+@pytest.fixture
+def reckoner():
+    return CoT_Trackserver.DeadReckoner(interval=5, ce_growth=0.2, max_age=120)
+
+
+def test_projects_north(reckoner):
+    reckoner.update(fix(lat=10.0, lon=20.0), True, now=0)
+    event = project_one(reckoner, 100)
+    assert event.point.lat == pytest.approx(10.0 + 1000 * DEGREES)
+    assert event.point.lon == pytest.approx(20.0)
+
+
+@pytest.mark.parametrize("lat", [0.0, 60.0])
+def test_projects_east(reckoner, lat):
+    reckoner.update(fix(lat=lat, course=90), True, now=0)
+    event = project_one(reckoner, 100)
+    assert event.point.lat == pytest.approx(lat)
+    # A degree of longitude shrinks with the cosine of the latitude.
+    assert event.point.lon == pytest.approx(1000 * DEGREES / math.cos(math.radians(lat)))
+
+
+def test_projects_from_fix_time(reckoner):
+    reckoner.update(fix(lat=10.0, course=180), True, now=50)
+    assert project_one(reckoner, 50).point.lat == pytest.approx(10.0)
+    assert project_one(reckoner, 150).point.lat == pytest.approx(10.0 - 1000 * DEGREES)
+
+
+def test_wraps_and_clamps(reckoner):
+    reckoner.update(fix("east", lon=179.999, course=90, speed=100), True, now=0)
+    reckoner.update(fix("north", lat=89.999, speed=100), True, now=0)
+    east, north = reckoner.project(100)
+    assert east.point.lon == pytest.approx(179.999 + 10000 * DEGREES - 360)
+    assert north.point.lat == 90.0
+
+
+@pytest.mark.parametrize("age", [0, 10, 100])
+def test_error_grows_with_distance(reckoner, age):
+    reckoner.update(fix(ce=10, speed=10), True, now=0)
+    assert project_one(reckoner, age).point.ce == pytest.approx(10 + 0.2 * 10 * age)
+
+
+def test_no_growth_when_still():
+    reckoner = CoT_Trackserver.DeadReckoner(ce_growth=0)
+    reckoner.update(fix(ce=10), True, now=0)
+    assert project_one(reckoner, 100).point.ce == 10
+
+
+def test_max_age(reckoner):
+    reckoner.update(fix(), True, now=0)
+    assert len(reckoner.project(119.9)) == 1
+    assert reckoner.project(120) == []
+    # A new fix restarts the age.
+    reckoner.update(fix(), True, now=100)
+    assert len(reckoner.project(200)) == 1
+
+
+def test_contains_max_age(reckoner):
+    reckoner.update(fix("recent"), True)
+    reckoner.update(fix("old"), True, now=time.monotonic() - 120)
+    assert "recent" in reckoner
+    assert "old" not in reckoner
+    assert "unknown" not in reckoner
+
+
+def test_stopped_device_is_dropped(reckoner):
+    reckoner.update(fix("a"), True, now=0)
+    reckoner.update(fix("b"), True, now=0)
+    reckoner.update(fix("a"), False, now=10)
+    assert [event.uid for event in reckoner.project(20)] == ["b"]
+    assert len(reckoner) == 1
+    reckoner.update(fix("never"), False)
+    assert len(reckoner) == 1
+
+
+def test_new_fix_replaces_base(reckoner):
+    reckoner.update(fix(lat=10.0), True, now=0)
+    reckoner.project(50)
+    reckoner.update(fix(lat=20.0, course=180), True, now=50)
+    assert project_one(reckoner, 150).point.lat == pytest.approx(20.0 - 1000 * DEGREES)
+
+
+def test_projected_event(reckoner):
+    base = fix(ce=10)
+    reckoner.update(base, True, now=0)
+    event = project_one(reckoner, 10)
+    assert (event.uid, event.type, event.how) == (base.uid, base.type, "m-p")
+    assert event.detail is base.detail
+    assert (event.point.hae, event.point.le) == (base.point.hae, base.point.le)
+    stale = dt.datetime.strptime(event.stale, CoT_Trackserver.defcot.DATETIME_FMT)
+    start = dt.datetime.strptime(event.start, CoT_Trackserver.defcot.DATETIME_FMT)
+    assert stale - start == dt.timedelta(seconds=10)
+    assert reckoner.stats() == {"bases": 1, "projected": 1}
@@ -0,0 +1,58 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+import CoT_Trackserver
+from CoT_Trackserver import recording
+
+START = 1617876000.0
+
+
+@pytest.fixture
+def device(make_device):
+    """Factory of a moving device that last reported comm seconds after 10:00."""
+    def make(comm: int) -> dict:
+        return make_device(MotionStatus=1, LastCommTime="2021-04-08 10:00:%02d" % comm)
+    return make
+
+
+def write(path: str, frames: list) -> None:
+    recorder = CoT_Trackserver.Recorder(path)
+    source = recorder.source("account")
+    for timestamp, kind, data in frames:
+        recorder._write(kind, source, data, START + timestamp)
+    recorder.close()
+
+
+def replay(path: str) -> tuple:
+    queue = CoT_Trackserver.CoalescingQueue()
+    worker = CoT_Trackserver.TrackerReceiverWorker(queue, poll_interval=1)
+    result = asyncio.run(CoT_Trackserver.Replayer(path, 0).run(worker=worker))
+    return result, worker
+
+
+def test_truncated_responses(tmp_path, device):
+    path = str(tmp_path / "session.rec")
+    body = json.dumps({"Devices": [device(0), device(1)]}).encode()
+    write(path, [(0, recording.RESPONSE, body[:len(body) // 2]), (0, recording.RESPONSE_ABORT, b""),
+                 (1, recording.RESPONSE, body[:len(body) // 2]), (1, recording.RESPONSE_END, b""),
+                 (2, recording.RESPONSE, b'{"Devices": [{"Name": }'), (2, recording.RESPONSE, body[10:]),
+                 (2, recording.RESPONSE_END, b""),
+                 (3, recording.RESPONSE, body), (3, recording.RESPONSE_END, b""),
+                 (4, recording.RESPONSE, body[:len(body) // 2])])
+    result, _worker = replay(path)
+    assert result["responses"] == 1 and result["truncated"] == 4
+
+
+def test_cadence_follows_recorded_time(tmp_path, device):
+    path = str(tmp_path / "session.rec")
+    frames = []
+    for poll in range(5):
+        frames.append((poll * 20, recording.RESPONSE, json.dumps({"Devices": [device(poll)]}).encode()))
+        frames.append((poll * 20, recording.RESPONSE_END, b""))
+    write(path, frames)
+    _result, worker = replay(path)
+    assert worker.device_state.stats()["changed"] == 5 and worker.device_state.stats()["skipped"] == 0
+    assert worker.device_state.clock is time.monotonic
@@ -0,0 +1,43 @@
+"""RateScheduler pacing and its use by the batching EventTransmitter."""
+import asyncio
+
+import CoT_Trackserver
+
+
+def test_unlimited_events_batch(make_writer):
+    async def run():
+        queue = asyncio.Queue()
+        scheduler = CoT_Trackserver.RateScheduler(rate_events=0, rate_bytes=0)
+        transmitter = CoT_Trackserver.EventTransmitter(queue, make_writer(), batch=True, batch_events=10,
+                                                       batch_linger=0, scheduler=scheduler)
+        for i in range(25):
+            queue.put_nowait(b"event %d" % i)
+        return [len(await transmitter._next_batch()) for _ in range(3)]
+
+    assert asyncio.run(run()) == [10, 10, 5]
+
+
+def test_history_is_trimmed_while_sending():
+    async def run():
+        scheduler = CoT_Trackserver.RateScheduler(rate_events=0, rate_bytes=0, window=0.01)
+        for _ in range(50):
+            await scheduler.acquire(2, 100)
+            await asyncio.sleep(0.001)
+        return scheduler
+
+    scheduler = asyncio.run(run())
+    assert len(scheduler._sent) < 50
+    assert scheduler._sent_events == sum(sent[1] for sent in scheduler._sent)
+    assert scheduler._sent_bytes == sum(sent[2] for sent in scheduler._sent)
+
+
+def test_rate_limits_events():
+    async def run():
+        scheduler = CoT_Trackserver.RateScheduler(rate_events=1000, burst_events=10)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for _ in range(60):
+            await scheduler.acquire(1)
+        return loop.time() - started
+
+    assert asyncio.run(run()) >= 0.04
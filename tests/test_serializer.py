@@ -0,0 +1,69 @@
+"""The template serializer must produce the bytes of Event.generate_cot for every event."""
+import datetime as dt
+
+import pytest
+
+import CoT_Trackserver
+
+Event = CoT_Trackserver.Event
+etree = CoT_Trackserver.SERIALIZERS["etree"]
+template = CoT_Trackserver.SERIALIZERS["template"]
+
+NOW = dt.datetime(2021, 4, 8, 10, 0, 0, tzinfo=dt.timezone.utc)
+SPECIAL = ('&', '<', '>', '"', "'", '\r', '\n', '\t', '&amp;', ']]>', 'caf\u00e9 \u2603', '')
+
+
+def test_synthetic_devices(make_events):
+    for event in make_events(500):
+        assert template(event) == etree(event)
+
+
+def test_hello_event():
+    event = CoT_Trackserver.hello_event()
+    assert template(event) == etree(event)
+
+
+def test_edge_events(edge_event):
+    assert template(edge_event) == etree(edge_event)
+
+
+@pytest.mark.parametrize("text", SPECIAL)
+def test_escaped_name(device_event, text):
+    event = device_event(Name="a" + text + "b")
+    assert template(event) == etree(event)
+
+
+@pytest.mark.parametrize("text", SPECIAL)
+def test_escaped_remark(device_event, text):
+    event = device_event(LastCommTime=text)
+    assert template(event) == etree(event)
+
+
+@pytest.mark.parametrize("text", SPECIAL)
+def test_escaped_optional_attributes(device_event, text):
+    event = device_event()
+    event.access = text
+    event.detail.remark.source = text
+    event.detail.contact = Event.Detail.Contact(text)
+    event.detail.contact.email = text
+    assert template(event) == etree(event)
+
+
+@pytest.mark.parametrize("lat, lon, course, speed, battery", [
+    (0, 0, 0, 0, 0),
+    (-90, -180, 359, 0.04, 100),
+    (90, 180, 360, 1e6, 255),
+    (1e-9, -1e-9, 0.5, 0.05, 1),
+])
+def test_extreme_values(device_event, lat, lon, course, speed, battery):
+    event = device_event(Lat=lat, Lon=lon, Heading=course, SpeedKPH=speed, BatteryLevel=battery)
+    assert template(event) == etree(event)
+
+
+def test_without_detail_and_point():
+    event = Event(2, "a-u-G", "bare", NOW, NOW, NOW, "h-e")
+    assert template(event) == etree(event)
+    event.point = Event.Point(0, 0, 0, 0, 0)
+    assert template(event) == etree(event)
+    event.detail = Event.Detail()
+    assert template(event) == etree(event)
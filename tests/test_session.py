@@ -0,0 +1,71 @@
+"""Session caching and the single login shared by concurrent failures."""
+import asyncio
+
+import CoT_Trackserver
+
+
+def stub_login(monkeypatch, delay: float = 0.01) -> list:
+    """Replaces the Trackserver login with one handing out numbered sessions, returns the calls."""
+    calls = []
+
+    async def login(http_client, account_ref, account_pass, api_url):
+        calls.append(account_ref)
+        await asyncio.sleep(delay)
+        return "session %d" % len(calls), 7
+    monkeypatch.setattr(CoT_Trackserver.functions, "login", login)
+    return calls
+
+
+def test_cached_session(monkeypatch):
+    calls = stub_login(monkeypatch)
+
+    async def main():
+        session = CoT_Trackserver.Session(account_ref="account", account_pass="secret")
+        sessions = await asyncio.gather(*(session.get() for _ in range(5)))
+        sessions.append(await session.get())
+        return session, sessions
+
+    session, sessions = asyncio.run(main())
+    assert sessions == [("session 1", 7)] * 6
+    assert len(calls) == 1 and session.stats() == {"logins": 1, "logins_avoided": 5}
+
+
+def test_concurrent_rejections_share_one_login(monkeypatch):
+    calls = stub_login(monkeypatch)
+
+    async def main():
+        session = CoT_Trackserver.Session(account_ref="account", account_pass="secret")
+        failed, _account = await session.get()
+        renewed = await asyncio.gather(*(session.renew(failed) for _ in range(10)))
+        return session, renewed
+
+    session, renewed = asyncio.run(main())
+    assert renewed == [("session 2", 7)] * 10
+    assert len(calls) == 2 and session.stats() == {"logins": 2, "logins_avoided": 9}
+
+
+def test_renew_after_rejection_of_the_current_session(monkeypatch):
+    calls = stub_login(monkeypatch)
+
+    async def main():
+        session = CoT_Trackserver.Session(account_ref="account", account_pass="secret")
+        first, _account = await session.get()
+        second, _account = await session.renew(first)
+        third, _account = await session.renew(second)
+        return first, second, third
+
+    assert asyncio.run(main()) == ("session 1", "session 2", "session 3")
+    assert len(calls) == 3
+
+
+def test_expired_session(monkeypatch):
+    calls = stub_login(monkeypatch, delay=0)
+
+    async def main():
+        session = CoT_Trackserver.Session(account_ref="account", account_pass="secret", ttl=1)
+        await session.get()
+        session._expires = 0.0
+        return await session.get()
+
+    assert asyncio.run(main()) == ("session 2", 7)
+    assert len(calls) == 2
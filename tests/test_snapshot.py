@@ -0,0 +1,25 @@
+import CoT_Trackserver
+
+
+def test_invalid_position_is_skipped(tmp_path, make_device):
+    snapshot = CoT_Trackserver.DeviceSnapshot(str(tmp_path / "account.snapshot"))
+    device = make_device(Lat="", BatteryLevel=None)
+    snapshot.save(device, 1.0, 2.0)
+    assert len(snapshot) == 0 and snapshot.stats()["skipped"] == 1
+    snapshot.close()
+
+
+def test_numeric_name(tmp_path, make_device):
+    path = str(tmp_path / "account.snapshot")
+    snapshot = CoT_Trackserver.DeviceSnapshot(path)
+    device = make_device(Name=1234)
+    snapshot.save(device, 1.0, 2.0)
+    snapshot.save(device, 3.0, 4.0)
+    snapshot.touch(1234, 5.0, 6.0)
+    snapshot.close()
+    reopened = CoT_Trackserver.DeviceSnapshot(path)
+    (saved, emitted, expires), = reopened.load()
+    assert saved["Name"] == "1234" and (emitted, expires) == (5.0, 6.0)
+    reopened.save(device, 7.0, 8.0)
+    assert len(reopened) == 1
+    reopened.close()
@@ -0,0 +1,113 @@
+"""DeviceStateTable emit cadence and stale times."""
+import datetime as dt
+
+import pytest
+
+import CoT_Trackserver
+
+
+def parse(value: str) -> dt.datetime:
+    return dt.datetime.strptime(value, CoT_Trackserver.defcot.DATETIME_FMT).replace(tzinfo=dt.timezone.utc)
+
+
+@pytest.fixture
+def table():
+    return CoT_Trackserver.DeviceStateTable(600, refresh_margin=0, moving_interval=10, stationary_interval=300)
+
+
+@pytest.fixture
+def stored(table, device_event, make_device):
+    """Stores a moving and a stationary device as emitted at 1000."""
+    for name, motion in (("moving", 1), ("parked", 0)):
+        device = make_device(Name=name, MotionStatus=motion)
+        table.store(device, device_event(Name=name, MotionStatus=motion), now=1000)
+    return table
+
+
+def test_new_device_is_due(table, make_device):
+    assert table.due(make_device(), now=0)
+    assert table.skipped_count == 0
+
+
+@pytest.mark.parametrize("name, motion, cadence", [("moving", 1, 10), ("parked", 0, 300)])
+def test_due_after_cadence(stored, make_device, name, motion, cadence):
+    device = make_device(Name=name, MotionStatus=motion)
+    assert not stored.due(device, now=1000 + cadence - 1)
+    assert stored.skipped_count == 1
+    assert stored.due(device, now=1000 + cadence)
+
+
+def test_due_within_horizon(stored, make_device):
+    device = make_device(Name="parked", MotionStatus=0)
+    # The next poll in 60s comes too late for the 300s cadence.
+    assert not stored.due(device, horizon=60, now=1000 + 239)
+    assert stored.due(device, horizon=60, now=1000 + 240)
+
+
+def test_refresh_margin(make_device, device_event):
+    table = CoT_Trackserver.DeviceStateTable(600, refresh_margin=5, moving_interval=10)
+    table.store(make_device(), device_event(), now=1000)
+    assert not table.due(make_device(), now=1004)
+    assert table.due(make_device(), now=1005)
+
+
+def test_motion_change_is_due(stored, make_device):
+    assert stored.due(make_device(Name="parked", MotionStatus=1), now=1000)
+    assert stored.due(make_device(Name="moving", MotionStatus=0), now=1000)
+
+
+def test_clock(stored, make_device):
+    stored.clock = lambda: 1009
+    assert not stored.due(make_device(Name="moving"))
+    stored.clock = lambda: 1010
+    assert stored.due(make_device(Name="moving"))
+
+
+@pytest.mark.parametrize("moving, horizon, stale", [(True, 0, 20), (False, 0, 600), (True, 60, 120),
+                                                    (True, 400, 600), (False, 60, 600)])
+def test_stale(table, moving, horizon, stale):
+    assert table.stale(moving, horizon) == stale
+
+
+def test_stale_cadences():
+    table = CoT_Trackserver.DeviceStateTable(600, moving_interval=10, stationary_interval=100, stale_cadences=3)
+    assert table.stale(True) == 30
+    assert table.stale(False) == 300
+
+
+def test_refresh_before_cadence(stored):
+    assert stored.refresh("moving", now=1009) is None
+    assert stored.skipped_count == 1
+    assert stored.devices["moving"].emitted == 1000
+
+
+def test_refresh_restamps(stored):
+    event = stored.devices["moving"].event
+    before = dt.datetime.now(dt.timezone.utc).replace(microsecond=0)
+    assert stored.refresh("moving", horizon=30, now=1010) is event
+    assert event.time == event.start
+    assert before <= parse(event.start) <= dt.datetime.now(dt.timezone.utc)
+    assert parse(event.stale) - parse(event.start) == dt.timedelta(seconds=60)
+    assert stored.devices["moving"].emitted == 1010
+    assert stored.refreshed_count == 1
+    # The next refresh is one cadence after this one.
+    assert stored.refresh("moving", now=1019) is None
+    assert stored.refresh("moving", now=1020) is event
+
+
+def test_refresh_keeps_fix_time(make_device, device_event):
+    table = CoT_Trackserver.DeviceStateTable(600, refresh_margin=0, moving_interval=10, fix_time=True)
+    event = device_event()
+    time, start = event.time, event.start
+    table.store(make_device(), event, now=1000)
+    assert table.refresh(make_device()["Name"], now=1010) is event
+    assert (event.time, event.start) == (time, start)
+    assert parse(event.stale) > parse(event.time)
+
+
+def test_changed(stored, make_device):
+    assert not stored.changed(make_device(Name="moving"))
+    assert stored.changed(make_device(Name="moving", LastGPSFix="2021-04-08 14:54:31"))
+    assert stored.changed(make_device(Name="moving", LastCommTime="2021-04-08 14:54:31"))
+    assert stored.changed(make_device(Name="moving", MotionStatus=0))
+    assert stored.changed(make_device(Name="new"))
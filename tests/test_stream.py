@@ -0,0 +1,78 @@
+"""CoTStreamParser splitting, resyncing and error counting on the CoT server stream."""
+import CoT_Trackserver
+
+
+def stream(events: list) -> bytes:
+    return b"".join(event.generate_cot() for event in events)
+
+
+def uids(events: list) -> list:
+    return [event.uid for event in events]
+
+
+def test_split_at_every_offset(make_events):
+    events = make_events(2) + [CoT_Trackserver.hello_event()]
+    data = stream(events)
+    for offset in range(len(data) + 1):
+        parser = CoT_Trackserver.CoTStreamParser()
+        decoded = parser.feed(data[:offset]) + parser.feed(data[offset:])
+        assert uids(decoded) == uids(events), offset
+        assert parser.errors == 0 and parser.events == 3
+
+
+def test_byte_by_byte(make_events):
+    events = make_events(3)
+    parser = CoT_Trackserver.CoTStreamParser()
+    decoded = []
+    for byte in stream(events):
+        decoded.extend(parser.feed(bytes((byte,))))
+    assert uids(decoded) == uids(events)
+
+
+def test_resync_after_garbage(make_events):
+    first, second, third = make_events(3)
+    parser = CoT_Trackserver.CoTStreamParser()
+    assert uids(parser.feed(first.generate_cot())) == [first.uid]
+    assert parser.feed(b"\x00 not xml </detail>") == []
+    assert parser.errors == 1
+    # Garbage up to the next document is skipped, also when its start is split over chunks.
+    data = b"more garbage" + second.generate_cot() + third.generate_cot()
+    start = data.index(b"<?xml")
+    decoded = parser.feed(data[:start + 3]) + parser.feed(data[start + 3:])
+    assert uids(decoded) == [second.uid, third.uid]
+    assert parser.errors == 1 and parser.events == 3
+
+
+def test_resync_inside_an_event(make_events):
+    first, second = make_events(2)
+    data = first.generate_cot()
+    parser = CoT_Trackserver.CoTStreamParser()
+    # The server drops the connection within an event and the next one starts over.
+    assert parser.feed(data[:len(data) // 2] + b"<<") == []
+    assert uids(parser.feed(second.generate_cot())) == [second.uid]
+    assert parser.errors == 1
+
+
+def test_undecodable_event_is_counted(make_events):
+    event, = make_events(1)
+    parser = CoT_Trackserver.CoTStreamParser()
+    decoded = parser.feed(b'<event uid="only-a-uid"/>' + event.generate_cot())
+    assert uids(decoded) == [event.uid]
+    assert parser.errors == 1 and parser.events == 1
+
+
+def test_unterminated_declaration():
+    parser = CoT_Trackserver.CoTStreamParser(max_pending=64)
+    assert parser.feed(b"<?xml " + b"a" * 100) == []
+    assert parser.errors == 1
+
+
+def test_reset_keeps_counters(make_events):
+    event, = make_events(1)
+    data = event.generate_cot()
+    parser = CoT_Trackserver.CoTStreamParser()
+    parser.feed(data)
+    parser.feed(data[:20])
+    parser.reset()
+    assert uids(parser.feed(data)) == [event.uid]
+    assert parser.events == 2 and parser.errors == 0
@@ -0,0 +1,39 @@
+"""EventTransmitter batching."""
+import asyncio
+
+import CoT_Trackserver
+
+
+def test_item_arriving_at_the_linger_deadline_is_kept(make_writer):
+    async def run():
+        queue = asyncio.Queue()
+        transmitter = CoT_Trackserver.EventTransmitter(queue, make_writer(), batch=True, batch_linger=0.01)
+        received = []
+        for i in range(50):
+            queue.put_nowait(b"first %d" % i)
+            loop = asyncio.get_running_loop()
+            # Lands on the loop iteration in which the linger timeout fires.
+            loop.call_later(0.01, queue.put_nowait, b"late %d" % i)
+            received.extend(await transmitter._next_batch())
+            await asyncio.sleep(0.02)
+            while not queue.empty():
+                received.extend(await transmitter._next_batch())
+        return received
+
+    received = asyncio.run(run())
+    assert len(received) == 100
+    assert len(set(received)) == 100
+
+
+def test_fan_out_reports_sink_queue_drops(make_writer):
+    async def run():
+        sinks = [CoT_Trackserver.EventTransmitter(CoT_Trackserver.CoalescingQueue(2), make_writer(), batch=True)
+                 for _ in range(2)]
+        fan_out = CoT_Trackserver.FanOut(asyncio.Queue(), sinks)
+        for i in range(5):
+            fan_out._deliver(b'<event uid="%d" />' % i)
+        return fan_out.stats()
+
+    for stats in asyncio.run(run()):
+        assert stats["pending"] == 2
+        assert stats["dropped"] == 3
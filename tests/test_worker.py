@@ -0,0 +1,72 @@
+"""TrackerReceiverWorker conversion of polled devices."""
+import asyncio
+import datetime as dt
+import json
+
+import pytest
+
+import CoT_Trackserver
+
+
+@pytest.mark.parametrize("field, value", [("Lat", "abc"), ("Lon", None), ("Heading", "n/a"), ("SpeedKPH", "")])
+def test_invalid_device_does_not_abort_the_poll(make_device, field, value):
+    queue = CoT_Trackserver.CoalescingQueue()
+    worker = CoT_Trackserver.TrackerReceiverWorker(queue, poll_interval=10, account_ref="account")
+    devices = [make_device(Name="before"), make_device(Name="bad", **{field: value}), make_device(Name="after")]
+    assert asyncio.run(worker._emit(devices)) == 2
+    assert sorted(queue.get_nowait().uid for _ in range(2)) == ["after", "before"]
+    assert worker.stats()["invalid"] == 1
+
+
+@pytest.mark.parametrize("moving, total, interval", [(0, 0, 120), (0, 4, 120), (1, 4, 92), (2, 4, 65), (4, 4, 10)])
+def test_adapt_interval(moving, total, interval):
+    worker = CoT_Trackserver.TrackerReceiverWorker(asyncio.Queue(), poll_min=10, poll_max=120, account_ref="account")
+    assert worker._adapt_interval(moving, total) == interval
+
+
+def test_fixed_interval(make_device):
+    worker = CoT_Trackserver.TrackerReceiverWorker(asyncio.Queue(), poll_interval=30, account_ref="account")
+    assert worker.adapt_interval([make_device(MotionStatus=1)]) == 30
+    assert worker.adapt_interval([make_device(MotionStatus=0)]) == 30
+
+
+def parse(value: str) -> dt.datetime:
+    return dt.datetime.strptime(value, CoT_Trackserver.defcot.DATETIME_FMT)
+
+
+class Response:
+
+    """Stands in for the HTTPResponse of a streamed GetDeviceData request."""
+
+    def __init__(self, body: bytes, size: int) -> None:
+        self.chunks = [body[i:i + size] for i in range(0, len(body), size)]
+
+    async def iter_chunks(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_emit_uses_the_adapted_interval(make_device, stream):
+    """Both poll paths emit with the interval of the devices just polled, not of the previous poll."""
+    devices = [make_device(Name="tracker %s" % i, MotionStatus=1) for i in range(4)]
+    queue = asyncio.Queue()
+    worker = CoT_Trackserver.TrackerReceiverWorker(queue, poll_min=10, poll_max=120, stream=stream,
+                                                   moving_interval=10, account_ref="account")
+
+    async def fetch_devices():
+        return devices
+
+    async def open_devices():
+        return Response(json.dumps({"Devices": devices}).encode(), 100)
+
+    worker._fetch_devices = fetch_devices
+    worker._open_devices = open_devices
+    assert worker.poll_interval == 60
+    asyncio.run(worker._poll_devices())
+    assert worker.poll_interval == 10
+    assert queue.qsize() == 4
+    while not queue.empty():
+        event = queue.get_nowait()
+        # Two moving cadences of 10s, a 60s interval would make it 120s.
+        assert parse(event.stale) - parse(event.start) == dt.timedelta(seconds=20)